@@ -5047,6 +5047,8 @@ class Worker():
             import atomize.general_modules.csv_opener_saver as openfile
 
             file_handler = openfile.Saver_Opener()
+            # crash-safe per-scan journal of the accumulated data (scan_writer)
+            writer = file_handler.create_scan_writer(exp_name)
             pb = pb_pro.Insys_FPGA()
             pb.awg_time_resolution(f'{self.awg_grid_cur} ns')
             bh15 = bh.BH_15()
@@ -5251,6 +5253,8 @@ class Worker():
 
             pb.pulser_open()
             pb.digitizer_number_of_averages(AVERAGES)
+            # compile the next points' programs while the card runs the current one
+            pb.pulser_precompile_sweep(POINTS, PHASES, increment = (increment == 1))
             data = np.zeros( ( 2, points_window, POINTS ) )
 
             dec_calc = 0.4 * DEC_COEF / 1e9
@@ -5408,6 +5412,10 @@ class Worker():
                             and not script_test and self.command != 'exit':
                         conn.send( ('ScanData', (k, data_x.copy(), data_y.copy())) )
 
+                    # journal the completed scan; a crash keeps everything up to here
+                    if self.command != 'exit':
+                        writer.append(k, (data_x, data_y) if iq_cor == 1 else data)
+
                 self.command = 'exit'
 
             if self.command == 'exit':
@@ -5549,6 +5557,9 @@ class Worker():
                                 mode = 'w'
                         )
 
+                    # the run is saved: drop its journal
+                    if writer.finish() is not None:
+                        conn.send( ('Message', f'Autosave journal failed: {writer.error}') )
                     conn.send( ('', f'Experiment {EXP_NAME} finished') )
 
         except BaseException as e:
@@ -5562,6 +5573,11 @@ class Worker():
                 pb.pulser_close()
             except Exception:
                 pass
+            # flush the journal of an interrupted run (a no-op after finish())
+            try:
+                writer.close()
+            except Exception:
+                pass
 
     def exp_eseem(self, conn, decimation, num_ave, scans, points,
             exp_name, curve_name, rect1, rect2,
@@ -5625,6 +5641,8 @@ class Worker():
             import atomize.general_modules.csv_opener_saver as openfile
 
             file_handler = openfile.Saver_Opener()
+            # crash-safe per-scan journal of the accumulated data (scan_writer)
+            writer = file_handler.create_scan_writer(exp_name)
             pb = pb_pro.Insys_FPGA()
             pb.awg_time_resolution(f'{self.awg_grid_cur} ns')
             bh15 = bh.BH_15()
@@ -6037,6 +6055,10 @@ class Worker():
                         conn.send( ('ScanData',
                             (cycle * SCANS + k, data_x.copy(), data_y.copy())) )
 
+                    # journal the completed scan; a crash keeps everything up to here
+                    if self.command != 'exit':
+                        writer.append(cycle * SCANS + k, (data_x, data_y) if iq_cor == 1 else data)
+
                 # Interrupted mid-cycle: `data` still holds a valid cumulative
                 # average (including the partial cycle), but it is not a complete
                 # cycle boundary, so don't record it as a snapshot.
@@ -6240,6 +6262,9 @@ class Worker():
                                 cdx, cdy = pb.digitizer_demodulate(cdat[0], cdat[1], iq_freq, zp, first_order, sec_order, integral = True)
                                 file_handler.save_data(cpath, np.c_[x_axis_plot, cdx, cdy], header = header2, mode = 'w')
 
+                    # the run is saved: drop its journal
+                    if writer.finish() is not None:
+                        conn.send( ('Message', f'Autosave journal failed: {writer.error}') )
                     conn.send( ('', f'Experiment {EXP_NAME} finished') )
 
         except BaseException as e:
@@ -6253,6 +6278,11 @@ class Worker():
                 pb.pulser_close()
             except Exception:
                 pass
+            # flush the journal of an interrupted run (a no-op after finish())
+            try:
+                writer.close()
+            except Exception:
+                pass
 
     def exp_field(self, conn, decimation, num_ave, scans, start_field,
             end_field, step_field, exp_name,
@@ -6287,6 +6317,8 @@ class Worker():
             import atomize.general_modules.csv_opener_saver as openfile
 
             file_handler = openfile.Saver_Opener()
+            # crash-safe per-scan journal of the accumulated data (scan_writer)
+            writer = file_handler.create_scan_writer(exp_name)
             pb = pb_pro.Insys_FPGA()
             pb.awg_time_resolution(f'{self.awg_grid_cur} ns')
             bh15 = bh.BH_15()
@@ -6586,6 +6618,10 @@ class Worker():
                             and not script_test and self.command != 'exit':
                         conn.send( ('ScanData', (k, data_x.copy(), data_y.copy())) )
 
+                    # journal the completed scan; a crash keeps everything up to here
+                    if self.command != 'exit':
+                        writer.append(k, (data_x, data_y) if iq_cor == 1 else data)
+
                     general.wait('1000 ms')
 
                     while field > START_FIELD:
@@ -6717,6 +6753,9 @@ class Worker():
                                 mode = 'w'
                             )
 
+                    # the run is saved: drop its journal
+                    if writer.finish() is not None:
+                        conn.send( ('Message', f'Autosave journal failed: {writer.error}') )
                     conn.send( ('', f'Experiment {EXP_NAME} finished') )
 
         except BaseException as e:
@@ -6730,6 +6769,11 @@ class Worker():
                 pb.pulser_close()
             except Exception:
                 pass
+            # flush the journal of an interrupted run (a no-op after finish())
+            try:
+                writer.close()
+            except Exception:
+                pass
 
     def exp_log(self, conn, decimation, num_ave, scans, points,
             log_start, log_end, exp_name,
@@ -6777,6 +6821,8 @@ class Worker():
             x_axis = original_time[:-1]
 
             file_handler = openfile.Saver_Opener()
+            # crash-safe per-scan journal of the accumulated data (scan_writer)
+            writer = file_handler.create_scan_writer(exp_name)
             pb = pb_pro.Insys_FPGA()
             pb.awg_time_resolution(f'{self.awg_grid_cur} ns')
             bh15 = bh.BH_15()
@@ -7137,6 +7183,10 @@ class Worker():
                             and not script_test and self.command != 'exit':
                         conn.send( ('ScanData', (k, data_x.copy(), data_y.copy())) )
 
+                    # journal the completed scan; a crash keeps everything up to here
+                    if self.command != 'exit':
+                        writer.append(k, (data_x, data_y) if iq_cor == 1 else data)
+
                 self.command = 'exit'
 
             if self.command == 'exit':
@@ -7279,6 +7329,9 @@ class Worker():
                                 mode = 'w'
                             )
 
+                    # the run is saved: drop its journal
+                    if writer.finish() is not None:
+                        conn.send( ('Message', f'Autosave journal failed: {writer.error}') )
                     conn.send( ('', f'Experiment {EXP_NAME} finished') )
 
         except BaseException as e:
@@ -7292,6 +7345,11 @@ class Worker():
                 pb.pulser_close()
             except Exception:
                 pass
+            # flush the journal of an interrupted run (a no-op after finish())
+            try:
+                writer.close()
+            except Exception:
+                pass
 
     def exp_amplitude(self, conn, decimation, num_ave, scans, points,
             step_ampl, field, exp_name,
@@ -7326,6 +7384,8 @@ class Worker():
             import atomize.general_modules.csv_opener_saver as openfile
 
             file_handler = openfile.Saver_Opener()
+            # crash-safe per-scan journal of the accumulated data (scan_writer)
+            writer = file_handler.create_scan_writer(exp_name)
             pb = pb_pro.Insys_FPGA()
             pb.awg_time_resolution(f'{self.awg_grid_cur} ns')
             bh15 = bh.BH_15()
@@ -7651,6 +7711,10 @@ class Worker():
                     pb.pulser_pulse_reset()
                     pb.awg_pulse_reset()
 
+                    # journal the completed scan; a crash keeps everything up to here
+                    if self.command != 'exit':
+                        writer.append(k, (data_x, data_y) if iq_cor == 1 else data)
+
                 self.command = 'exit'
 
             if self.command == 'exit':
@@ -7795,6 +7859,9 @@ class Worker():
                                 mode = 'w'
                             )
 
+                    # the run is saved: drop its journal
+                    if writer.finish() is not None:
+                        conn.send( ('Message', f'Autosave journal failed: {writer.error}') )
                     conn.send( ('', f'Experiment {EXP_NAME} finished') )
 
         except BaseException as e:
@@ -7808,6 +7875,11 @@ class Worker():
                 pb.pulser_close()
             except Exception:
                 pass
+            # flush the journal of an interrupted run (a no-op after finish())
+            try:
+                writer.close()
+            except Exception:
+                pass
 
 def main():
     """
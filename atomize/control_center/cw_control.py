@@ -1092,6 +1092,8 @@ class Worker():
             import atomize.general_modules.csv_opener_saver as openfile
 
             file_handler = openfile.Saver_Opener()
+            # crash-safe per-scan journal of the accumulated data (scan_writer)
+            writer = file_handler.create_scan_writer(p2)
             ag53131a = ag.Agilent_53131a()
             ls335 = ls.Lakeshore_335()
             sr860 = sr.SR_860()
@@ -1227,6 +1229,10 @@ class Worker():
                             
                             if conn.poll() == True:
                                 self.command = conn.recv()
+
+                    # journal the completed scan; a crash keeps everything up to here
+                    if self.command != 'exit':
+                        writer.append(j, data, count = 2*j if p10 == 1 else j)
                     
                     j += 1
 
@@ -1274,6 +1280,10 @@ class Worker():
                     field = field - initialization_step 
                 itc_fc.magnet_field( START_FIELD )
 
+                # the run is saved: drop its journal
+                if writer.finish() is not None:
+                    conn.send( ('Message', f'Autosave journal failed: {writer.error}') )
+
                 conn.send( ('', f'Script {p2} finished') )
                 general.wait('200 ms')
                 conn.close()
@@ -1282,6 +1292,13 @@ class Worker():
             exc_info = f"{type(e)} \n{str(e)} \n{traceback.format_exc()}"
             conn.send( ('Error', exc_info) )
 
+        finally:
+            # flush the journal of an interrupted run (a no-op after finish())
+            try:
+                writer.close()
+            except Exception:
+                pass
+
     def exp_test(self, conn, p1, p2, p3, p4, p5, p6, p7, p8, p9, p10):
         """
         function that contains experimental script
@@ -6,8 +6,8 @@ Data Treatment control-center window.
 
 Standalone QProcess launched from the "EPR Endstation Control" tab. It loads a
 1D dataset either from a CSV file (Saver_Opener.open_1d) or from the curves
-currently shown in the main GUI (via the libs/treatment_buffer.csv bridge that
-the plot sidebar writes), lets the user fit / FFT / phase-correct / smooth it,
+currently shown in the main GUI (via the shared-memory treatment_mailbox the
+plot sidebar fills), lets the user fit / FFT / phase-correct / smooth it,
 then push the result to LivePlot (general.plot_1d) and/or save it to CSV.
 
 The window has its own embedded pyqtgraph preview for live, in-process display:
@@ -33,7 +33,7 @@ from pathlib import Path
 
 import pyqtgraph as pg
 from pyqtgraph.dockarea import DockArea
-from PyQt6.QtCore import Qt, QProcess, QUrl, QFileSystemWatcher, QTimer
+from PyQt6.QtCore import Qt, QProcess, QUrl, QThread, pyqtSignal
 from PyQt6.QtGui import QIcon, QDesktopServices
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, QPushButton,
     QComboBox, QGridLayout, QVBoxLayout, QHBoxLayout, QTabWidget, QDoubleSpinBox,
@@ -42,6 +42,7 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, QPushBu
 import atomize.general_modules.general_functions as general
 import atomize.general_modules.csv_opener_saver as openfile
 import atomize.general_modules.bruker_opener as bruker
+import atomize.general_modules.treatment_mailbox as mailbox
 import atomize.math_modules.least_square_fitting_modules as fitting
 import atomize.math_modules.signal_processing as sigproc
 import atomize.math_modules.fft as fft_module
@@ -59,10 +60,6 @@ from atomize.general_modules.gui_style import (apply_app_style,
     BG, FG, ACCENT, BUTTON_STYLE, LABEL_STYLE, DSPIN_STYLE, SPIN_STYLE,
     COMBO_STYLE, LINEEDIT_STYLE, CHECKBOX_STYLE, SCROLL_STYLE, TAB_STYLE)
 
-# Path to the buffer file that the main-window plot sidebar writes selected
-# curves into (same libs/ runtime-IPC convention as the .param files).
-BUFFER_PATH = str(Path(__file__).resolve().parent.parent.parent / 'libs' / 'treatment_buffer.csv')
-
 # remembers the folder of the last file opened/saved here so the next dialog
 # starts there — shared with the 2D tool (one working data folder), survives a
 # window relaunch (each tool is its own short-lived QProcess). libs/ runtime IPC.
@@ -126,6 +123,29 @@ def _html_table(headers, rows):
     return f'<table style="border-collapse:collapse;"><tr>{head}</tr>{body}</table>'
 
 
+class _FitAllWorker(QThread):
+    """Runs the "Fit all traces" batch (fitter.fit_many) off the GUI thread.
+    `fn` is a closure over plain values only (no Qt widgets), called with a
+    progress callback; every finished trace is forwarded as `partial`
+    ((index, fit dict or None, error)), and the fit_many result — or the
+    Exception it raised — is delivered to the main thread via `done`."""
+    done = pyqtSignal(object)
+    partial = pyqtSignal(object)
+
+    def __init__(self, fn, parent=None):
+        super().__init__(parent)
+        self._fn = fn
+
+    def _progress(self, i, res, err):
+        self.partial.emit((i, res, err))
+
+    def run(self):
+        try:
+            self.done.emit(self._fn(self._progress))
+        except Exception as e:                    # surfaced on the main thread
+            self.done.emit(e)
+
+
 class MainWindow(QMainWindow):
 
     def __init__(self, *args, **kwargs):
@@ -139,6 +159,8 @@ class MainWindow(QMainWindow):
         self.opener = openfile.Saver_Opener()
         self.bruker = bruker.Bruker_Opener()
         self.fitter = fitting.math()
+        self._fit_all_worker = None       # keep a ref so a running QThread is not GC'd
+        self._fit_all = None              # state of the running "Fit all traces" batch
         self.sp = sigproc.Signal_Processing()
         self.fft = fft_module.Fast_Fourier()
 
@@ -188,22 +210,14 @@ class MainWindow(QMainWindow):
         self._init_buffer_watch()          # auto-load new data while open
 
     def _init_buffer_watch(self):
-        """Watch the libs/ folder so a plot sent from the main GUI while this
-        window is already open is picked up automatically (no "Load from plot"
-        click needed). A short debounce lets the writer finish before we read;
-        the timer also coalesces the create/modify/delete burst into one load."""
-        self._buf_timer = QTimer(self)
-        self._buf_timer.setSingleShot(True)
-        self._buf_timer.setInterval(200)
-        self._buf_timer.timeout.connect(self._on_buffer_ready)
-        self._buf_watcher = QFileSystemWatcher(self)
-        watch_dir = os.path.dirname(BUFFER_PATH)
-        if os.path.isdir(watch_dir):
-            self._buf_watcher.addPath(watch_dir)
-        self._buf_watcher.directoryChanged.connect(lambda _p: self._buf_timer.start())
+        """Listen for the mailbox notification so a plot sent from the main GUI
+        while this window is already open is picked up automatically (no "Load
+        from plot" click needed). The sender notifies only once the shared
+        block is complete, so no debounce is needed."""
+        self._buf_server = mailbox.listen(mailbox.KIND_1D, self._on_buffer_ready, self)
 
     def _on_buffer_ready(self):
-        if os.path.isfile(BUFFER_PATH):
+        if mailbox.pending(mailbox.KIND_1D):
             self.load_from_buffer(silent=True)
 
     # ----------------------------------------------------------------- UI
@@ -1064,7 +1078,7 @@ class MainWindow(QMainWindow):
         if not file_path or file_path == 'None':
             return
         try:
-            res = self.bruker.open(file_path)
+            res = self.bruker.open(file_path, lazy=True)   # a 2D file is not read
         except Exception as e:
             self.set_status(f'Could not read Bruker file: {e}')
             return
@@ -1096,42 +1110,23 @@ class MainWindow(QMainWindow):
             return None
 
     def load_from_buffer(self, silent=False):
-        if not os.path.isfile(BUFFER_PATH):
-            if not silent:
-                self.set_status('No plot buffer found. Right-click a plot in the '
-                                'main window → "Send to Data Treatment" first.')
-            return
         try:
-            labels = []
-            color_tokens = []
-            buf_xname = ''
-            header_count = 0
-            with open(BUFFER_PATH, 'r') as fh:
-                for line in fh:
-                    if not line.startswith('#'):
-                        break
-                    header_count += 1
-                    if 'labels:' in line:
-                        labels = line.split('labels:', 1)[1].strip().split('|')
-                    elif 'colors:' in line:
-                        color_tokens = line.split('colors:', 1)[1].strip().split('|')
-                    elif 'xname:' in line:
-                        buf_xname = line.split('xname:', 1)[1].strip()
-            data = np.genfromtxt(BUFFER_PATH, delimiter=',', skip_header=header_count)
-            data = np.atleast_2d(data)
-            # The buffer is a one-shot mailbox: consume it now so that closing
-            # and reopening the window does NOT reload this (stale) plot data.
-            # A fresh "Send to Data Treatment" rewrites it.
-            self._consume_buffer()
-            # buffer columns are interleaved x0, y0, x1, y1, ...
-            ncurves = data.shape[1]//2
+            # The mailbox is one-shot: receiving consumes it, so closing and
+            # reopening the window does NOT reload this (stale) plot data.
+            # A fresh "Send to Data Treatment" refills it.
+            sent = mailbox.receive_curves()
+            if sent is None:
+                if not silent:
+                    self.set_status('No plot buffer found. Right-click a plot in the '
+                                    'main window → "Send to Data Treatment" first.')
+                return
+            sent_curves, meta = sent
+            color_tokens = meta.get('colors', [])
+            buf_xname = meta.get('xname', '')
             curves = []
             curve_colors = {}
-            for i in range(ncurves):
-                x = data[:, 2*i]
-                y = data[:, 2*i + 1]
+            for i, (label, x, y) in enumerate(sent_curves):
                 mask = ~(np.isnan(x) | np.isnan(y))
-                label = labels[i] if i < len(labels) else f'curve {i}'
                 curves.append((label, (x[mask], y[mask])))
                 if i < len(color_tokens):
                     rgb = self._parse_rgb(color_tokens[i])
@@ -1181,12 +1176,8 @@ class MainWindow(QMainWindow):
                 self.set_status(f'Could not read plot buffer: {e}')
 
     def _consume_buffer(self):
-        """Delete the plot buffer file once read (one-shot mailbox semantics)."""
-        try:
-            if os.path.isfile(BUFFER_PATH):
-                os.remove(BUFFER_PATH)
-        except OSError:
-            pass
+        """Mark the plot mailbox as read (one-shot mailbox semantics)."""
+        mailbox.discard(mailbox.KIND_1D)
 
     def on_source_changed(self, *args):
         """Source selection / pair-mode change: drop the result and recompute."""
@@ -1229,10 +1220,6 @@ class MainWindow(QMainWindow):
         """Target FFT length for a zero-fill combo choice ('None', '×2'…, 'Next pow₂')."""
         return sigproc.zerofill_length(length, choice)
 
-    def _window(self, n, name, param=8.6):
-        """Apodization window of length n (delegates to the shared helper)."""
-        return sigproc.apodization_window(n, name, param)
-
     def _update_window_param(self, *args):
         """Relabel + reconfigure the window parameter field for the selected
         window (Kaiser β / Gaussian σ / Tukey α), or disable it for the
@@ -1420,6 +1407,9 @@ class MainWindow(QMainWindow):
     # one colour per trace for the "Fit all traces" overlay (cycled if more) — the
     # full shared palette, single source of truth so the two never drift.
     BATCH_COLORS = list(CrosshairDock.CURVE_PALETTE)
+    # worker processes for "Fit all traces" (n_jobs of fit_many). Serial by
+    # default; opt in with e.g. -1 (all CPUs), each worker is a new process
+    FIT_JOBS = 1
 
     def redraw(self):
         """Repaint the embedded preview with the source channel(s) and the
@@ -1719,43 +1709,74 @@ class MainWindow(QMainWindow):
     def fit_all_traces(self):
         """Fit the current model to the I channel of every loaded trace, overlay
         the data + fits, and collect a per-trace parameter table (saveable as CSV).
-        Useful for batch lsq fits, e.g. T₂ across a series of traces."""
+        Useful for batch lsq fits, e.g. T₂ across a series of traces. The traces
+        are read here, then fitted by fitter.fit_many on a worker thread
+        (FIT_JOBS processes); each fit is overlaid as soon as it returns."""
+        if self._fit_all is not None:                      # a batch is running
+            return
         n = self.trace_combo.count()
         if n == 0:
             self.set_status('No traces loaded.')
             return
         model = self.model_combo.currentText()
         no_offset = self.fit_no_offset.isChecked()
-        names = [self.trace_combo.itemText(i) for i in range(n)]
-        rows, overlays, failed = [], [], []
+        names, xs, ys, failed = [], [], [], []
+        for i in range(n):
+            name = self.trace_combo.itemText(i)
+            self.trace_combo.setCurrentIndex(i)            # activate -> i_xy()
+            x, y = self.i_xy()
+            if x is None or not len(x):
+                failed.append(name)
+                continue
+            names.append(name)
+            xs.append(np.asarray(x, float))
+            ys.append(np.asarray(y, float))
+        if not names:
+            self.set_status('Fit all: no trace could be fit.')
+            return
+        self._fit_all = {'model': model, 'n': n, 'names': names, 'xs': xs, 'ys': ys,
+                         'failed': failed, 'overlays': {}, 'done': 0}
+        fitter, jobs = self.fitter, self.FIT_JOBS
+
+        def compute(progress):
+            return fitter.fit_many(model, xs, ys, no_offset=no_offset, n_jobs=jobs,
+                                   progress=progress)
+
         self.fit_all_btn.setEnabled(False)
         self.fit_all_btn.setStyleSheet(BUTTON_BUSY_STYLE)
-        try:
-            for i, name in enumerate(names):
-                self.trace_combo.setCurrentIndex(i)        # activate -> i_xy()
-                x, y = self.i_xy()
-                if x is None or not len(x):
-                    failed.append(name)
-                    continue
-                try:
-                    res = self.fitter.fit(model, np.asarray(x, float),
-                                          np.asarray(y, float), no_offset=no_offset)
-                except Exception as e:
-                    failed.append(f'{name} ({e})')
-                    continue
-                rows.append((name, res))
-                overlays.append((name, np.asarray(x, float), np.asarray(y, float),
-                                 np.asarray(res['y_fit'], float)))
-                self.set_status(f'Fit all: {i + 1}/{n} — {name}…')
-                QApplication.processEvents()
-        finally:
-            self.fit_all_btn.setEnabled(True)
-            self.fit_all_btn.setStyleSheet(BUTTON_STYLE)
+        self.set_status(f'Fit all: 0/{len(names)}…')
+        self._fit_all_worker = _FitAllWorker(compute)
+        self._fit_all_worker.partial.connect(self._fit_all_partial)
+        self._fit_all_worker.done.connect(self._fit_all_finished)
+        self._fit_all_worker.start()
+
+    def _fit_all_partial(self, payload):
+        """One trace of the batch finished: overlay it with the ones so far."""
+        i, res, _ = payload
+        st = self._fit_all
+        if res is not None:
+            if not st['overlays']:
+                self._reset_result()          # drop any single-trace result overlay
+            st['overlays'][i] = (st['names'][i], st['xs'][i], st['ys'][i],
+                                 np.asarray(res['y_fit'], float))
+            self._render_fit_batch([st['overlays'][k] for k in sorted(st['overlays'])])
+        st['done'] += 1
+        self.set_status(f'Fit all: {st["done"]}/{len(st["names"])} — {st["names"][i]}…')
+
+    def _fit_all_finished(self, out):
+        """Batch done: build the parameter table from the fit_many results."""
+        st, self._fit_all = self._fit_all, None
+        self.fit_all_btn.setEnabled(True)
+        self.fit_all_btn.setStyleSheet(BUTTON_STYLE)
+        if isinstance(out, Exception):
+            self.set_status(f'Fit all failed: {out}')
+            return
+        model, n, names = st['model'], st['n'], st['names']
+        rows = [(names[i], res) for i, res in enumerate(out['results']) if res is not None]
+        failed = st['failed'] + [f'{names[i]} ({e})' for i, e in sorted(out['errors'].items())]
         if not rows:
             self.set_status('Fit all: no trace could be fit.')
             return
-        self._reset_result()                  # drop any single-trace result overlay
-        self._render_fit_batch(overlays)
         # parameter table (kept per-row so models with different param sets are ok)
         self.fit_table = {'model': model, 'rows': []}
         pnames = []                            # union of param names, first-seen order
@@ -2042,24 +2063,21 @@ class MainWindow(QMainWindow):
         skip = max(0, min(int(self.fft_skip.value()), len(signal) - 2))
         signal = signal[skip:]
 
-        # apodization window applied to the time-domain signal before transform
+        # apodization window applied to the time-domain signal while it is
+        # zero-filled into the transform buffer (Fast_Fourier.spectrum)
         win = self.fft_window.currentText()
         wparam = self.fft_winparam.value()
-        signal = signal*self._window(len(signal), win, wparam)
 
         zf = self.fft_zerofill.currentText()
         n = self._zerofill_n(len(signal), zf)
-        sp = np.fft.fft(signal, n)
+        sp = self.fft.spectrum(signal, n, window=win, wparam=wparam)
         # Frequency axis in physical units derived from the X (time) unit, so the
         # spectrum is the same whether the trace arrived in 's' (from a plot, where
         # dt≈2e-9) or in 'ns' (from a file, where dt≈2): s→Hz, ns/µs/ms→MHz. Using
         # the raw 1/dt instead leaves the two sources off by 1e9 (see the 2D tool's
         # _freq_axis, the same convention).
         d, funit = self._fft_freq_scale(dt, self._xname())
-        freq = np.fft.fftfreq(n, d)
-        order = np.argsort(freq)
-        freq = freq[order]
-        sp = sp[order]
+        freq = self.fft.freq_axis(n, d).copy()
 
         # optional passband mask on the spectrum
         ftype = self.fft_filter.currentText()
@@ -2166,12 +2184,10 @@ class MainWindow(QMainWindow):
                 return
             zf = self.phase_zerofill.currentText()
             n = self._zerofill_n(len(idata), zf)
-            sp = np.fft.fft(idata + 1j*qdata, n)
-            freq = np.fft.fftfreq(n, dt)
-            order = np.argsort(freq)
-            axis = freq[order]
-            data_i = np.real(sp[order])
-            data_q = np.imag(sp[order])
+            sp = self.fft.spectrum(idata + 1j*qdata, n)
+            axis = self.fft.freq_axis(n, dt).copy()
+            data_i = np.real(sp)
+            data_q = np.imag(sp)
             domain = f'frequency (FFT first, {len(idata)}->{n} pts, zero fill: {zf})'
             xname = 'Frequency'
         else:
@@ -33,7 +33,7 @@ import sys
 import numpy as np
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QFileSystemWatcher, QTimer
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, QPushButton,
     QComboBox, QGridLayout, QVBoxLayout, QHBoxLayout, QTabWidget, QDoubleSpinBox,
@@ -41,6 +41,9 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, QPushBu
 
 import atomize.general_modules.general_functions as general
 import atomize.general_modules.csv_opener_saver as openfile
+import atomize.general_modules.binary_data as binary
+import atomize.general_modules.csv_reader as csv_reader
+import atomize.general_modules.treatment_mailbox as mailbox
 import atomize.general_modules.bruker_opener as bruker
 import atomize.math_modules.signal_processing as sigproc
 import atomize.math_modules.least_square_fitting_modules as fitting
@@ -131,12 +134,6 @@ def _si_autoprefix(unit):
 # shared fitter; for T1/T2 decays k / k1 / k2 are the time constants).
 RELAX_MODELS = ['Exponential', 'Bi-exponential', 'Stretched exponential']
 
-# one-shot mailbox the 1D Data Treatment window reads on "Load from plot";
-# same path the main window writes on right-click → "Send to Data Treatment".
-BUFFER_PATH = str(Path(__file__).resolve().parent.parent.parent / 'libs' / 'treatment_buffer.csv')
-# the 2D counterpart: an .npz the main window writes for 2D image plots
-# (i, q matrices + axis geometry/labels), consumed by this window's "Load from plot".
-BUFFER_2D_PATH = str(Path(__file__).resolve().parent.parent.parent / 'libs' / 'treatment_buffer_2d.npz')
 
 # remembers the folder of the last file opened/saved here so the next dialog
 # starts there — shared with the 1D tool (one working data folder), survives a
@@ -172,6 +169,9 @@ WINDOW_PARAM = {
 
 class MainWindow(QMainWindow):
 
+    # scipy.fft threads for the FFT along one axis (-1 = all CPUs)
+    FFT_WORKERS = -1
+
     def __init__(self, *args, **kwargs):
         super(MainWindow, self).__init__(*args, **kwargs)
 
@@ -210,22 +210,14 @@ class MainWindow(QMainWindow):
         self._init_buffer_watch()          # auto-load new data while open
 
     def _init_buffer_watch(self):
-        """Watch the libs/ folder so a 2D plot sent from the main GUI while this
-        window is already open is picked up automatically (no "Load from plot"
-        click needed). A short debounce lets the writer finish before we read;
-        the timer also coalesces the create/modify/delete burst into one load."""
-        self._buf_timer = QTimer(self)
-        self._buf_timer.setSingleShot(True)
-        self._buf_timer.setInterval(200)
-        self._buf_timer.timeout.connect(self._on_buffer_ready)
-        self._buf_watcher = QFileSystemWatcher(self)
-        watch_dir = os.path.dirname(BUFFER_2D_PATH)
-        if os.path.isdir(watch_dir):
-            self._buf_watcher.addPath(watch_dir)
-        self._buf_watcher.directoryChanged.connect(lambda _p: self._buf_timer.start())
+        """Listen for the mailbox notification so a 2D plot sent from the main
+        GUI while this window is already open is picked up automatically (no
+        "Load from plot" click needed). The sender notifies only once the
+        shared block is complete, so no debounce is needed."""
+        self._buf_server = mailbox.listen(mailbox.KIND_2D, self._on_buffer_ready, self)
 
     def _on_buffer_ready(self):
-        if os.path.isfile(BUFFER_2D_PATH):
+        if mailbox.pending(mailbox.KIND_2D):
             self.load_from_plot(silent=True)
 
     # ----------------------------------------------------------------- UI
@@ -724,17 +716,34 @@ class MainWindow(QMainWindow):
         if not path or path == 'None':
             return
         try:
-            i = np.atleast_2d(np.genfromtxt(path, delimiter=','))
-            base = path[:-4] if path.lower().endswith('.csv') else path
-            qpath = base + '_1.csv'
-            if os.path.isfile(qpath):
-                q = np.atleast_2d(np.genfromtxt(qpath, delimiter=','))
-                qmsg = os.path.basename(qpath)
+            axes = []
+            if binary.is_binary(path):
+                # one file: frame 0 = I, frame 1 = Q (save_data of a (2, nX, nY) array)
+                res = binary.read(path)
+                frames = res['data'] if res['frames'] else [res['data']]
+                i = np.atleast_2d(np.asarray(frames[0], dtype=float))
+                if len(frames) > 1:
+                    q = np.atleast_2d(np.asarray(frames[1], dtype=float))
+                    qmsg = 'frame 1'
+                else:
+                    q = np.zeros_like(i)
+                    qmsg = 'no Q frame (Q = 0)'
+                axes = res['axes']
             else:
-                q = np.zeros_like(i)
-                qmsg = 'no _1 file (Q = 0)'
+                i = np.atleast_2d(csv_reader.load(path))
+                base = path[:-4] if path.lower().endswith('.csv') else path
+                qpath = base + '_1.csv'
+                if os.path.isfile(qpath):
+                    q = np.atleast_2d(csv_reader.load(qpath))
+                    qmsg = os.path.basename(qpath)
+                else:
+                    q = np.zeros_like(i)
+                    qmsg = 'no _1 file (Q = 0)'
             header_lines = read_header(path)    # one read: axis steps + viewer
             dx, xu, dy, yu = self._parse_axis_header(header_lines)
+            if len(axes) == 2:                  # binary: [rows (Y), columns (X)]
+                dy, yu = axes[0].get('step', dy), axes[0].get('unit') or yu
+                dx, xu = axes[1].get('step', dx), axes[1].get('unit') or xu
             if self.transpose_check.isChecked():
                 i, q = i.T, q.T
                 dx, xu, dy, yu = dy, yu, dx, xu   # axes swap with the matrix
@@ -823,7 +832,7 @@ class MainWindow(QMainWindow):
         if not path or path == 'None':
             return
         try:
-            res = self.bruker.open(path)
+            res = self.bruker.open(path, lazy=True)   # mapped; read once below
         except Exception as e:
             self.set_status(f'Could not read Bruker file: {e}')
             return
@@ -831,9 +840,8 @@ class MainWindow(QMainWindow):
             self.set_status(f'{res["format"]} {res["ndim"]}D dataset — the 2D tool '
                             f'needs a 2D matrix; use the 1D Data Treatment window.')
             return
-        data = np.asarray(res['data'])               # (ny traces, nx points)
-        i = np.real(data).astype(float)
-        q = np.imag(data).astype(float) if res['complex'] else np.zeros_like(i)
+        # (ny traces, nx points), each of I / Q filled straight from the file
+        i, q = bruker.split_iq(res['data'])
         # X = within-trace (cols), Y = indirect (rows); transpose swaps them
         xarr, yarr = res['x'], res['y']
         xn, xs = res['x_name'] or 'X', res['x_unit'] or ''
@@ -867,21 +875,20 @@ class MainWindow(QMainWindow):
 
     def load_from_plot(self, silent=False):
         """Load a 2D image sent from the main GUI (right-click a 2D plot →
-        "Send to Data Treatment"), which writes libs/treatment_buffer_2d.npz:
-        i/q [trace, point] matrices + axis geometry/labels. The buffer is a
-        one-shot mailbox — consumed on read."""
-        if not os.path.isfile(BUFFER_2D_PATH):
-            if not silent:
-                self.set_status('No 2D plot buffer found. Right-click a 2D plot in '
-                                'the main window → "Send to Data Treatment" first.')
-            return
+        "Send to Data Treatment"), which posts it to the 2D treatment_mailbox:
+        i/q [trace, point] matrices + axis geometry/labels. The mailbox is
+        one-shot — consumed on read."""
         try:
-            with np.load(BUFFER_2D_PATH, allow_pickle=False) as d:
-                i = np.atleast_2d(np.asarray(d['i'], dtype=float))
-                q = np.atleast_2d(np.asarray(d['q'], dtype=float))
-                geom = np.asarray(d['geom'], dtype=float).ravel().tolist()
-                labels = [str(s) for s in np.asarray(d['labels']).ravel().tolist()]
-            self._consume_2d_buffer()
+            sent = mailbox.receive(mailbox.KIND_2D)
+            if sent is None:
+                if not silent:
+                    self.set_status('No 2D plot buffer found. Right-click a 2D plot in '
+                                    'the main window → "Send to Data Treatment" first.')
+                return
+            i = np.atleast_2d(np.asarray(sent['arrays']['i'], dtype=float))
+            q = np.atleast_2d(np.asarray(sent['arrays']['q'], dtype=float))
+            geom = [float(v) for v in sent['meta'].get('geom', [])]
+            labels = [str(v) for v in sent['meta'].get('labels', [])]
             if i.shape != q.shape or min(i.shape) < 2:
                 if not silent:
                     self.set_status('2D buffer is not a valid matrix (need ≥ 2×2).')
@@ -925,12 +932,8 @@ class MainWindow(QMainWindow):
                 self.set_status(f'Could not read 2D plot buffer: {e}')
 
     def _consume_2d_buffer(self):
-        """Delete the 2D plot buffer once read (one-shot mailbox semantics)."""
-        try:
-            if os.path.isfile(BUFFER_2D_PATH):
-                os.remove(BUFFER_2D_PATH)
-        except OSError:
-            pass
+        """Mark the 2D plot mailbox as read (one-shot mailbox semantics)."""
+        mailbox.discard(mailbox.KIND_2D)
 
     def _raw_axes(self):
         return (self._axis(self.x0_spin.value(), self.dx_spin.value(),
@@ -1323,11 +1326,11 @@ class MainWindow(QMainWindow):
         sl = [slice(None), slice(None)]; sl[axis] = slice(skip, None)
         src_i = self.src_i[tuple(sl)]; src_q = self.src_q[tuple(sl)]
         n0 = src_i.shape[axis]
-        win = sigproc.apodization_window(n0, win_name, wparam)
-        shape = [1, 1]; shape[axis] = n0
-        Z = (src_i + 1j*src_q)*win.reshape(shape)
         n = sigproc.zerofill_length(n0, zf)
-        sp = np.fft.fftshift(np.fft.fft(Z, n=n, axis=axis), axes=axis)
+        # windowed + zero-filled in one pass, threaded over the traces
+        sp = fft_module.Fast_Fourier.spectrum(src_i + 1j*src_q, n, axis=axis,
+                                              window=win_name, wparam=wparam,
+                                              workers=self.FFT_WORKERS)
         fr, funit = self._freq_axis(n, src_ax['step'], src_ax['scale'])
         df = float(fr[1] - fr[0]) if n > 1 else 1.0
         freq_ax = self._axis(float(fr[0]), df, 'Frequency Offset', funit, auto=True)
@@ -1565,23 +1568,12 @@ class MainWindow(QMainWindow):
             self.slice_label.setText(f"{axis['name']} = {coord:.4g} {axis['scale']} (of {ntr})")
 
     def _write_buffer(self, curves, xname=''):
-        """Write a one-shot 1D-tool mailbox (libs/treatment_buffer.csv): interleaved
-        x0,y0,x1,y1,… columns padded with NaN, '# labels:' header naming the curves.
-        An optional '# xname:' line carries the X axis name+unit so the 1D tool can
-        label and SI-prefix the axis (e.g. a 's' slice axis then reads in ns)."""
-        maxlen = max(np.asarray(x).size for _, x, _ in curves)
-        buf = np.full((maxlen, 2*len(curves)), np.nan)
-        labels = []
-        for j, (lab, x, y) in enumerate(curves):
-            x = np.asarray(x, float); y = np.asarray(y, float)
-            buf[:x.size, 2*j] = x
-            buf[:y.size, 2*j + 1] = y
-            labels.append(str(lab).replace('|', '/'))
-        header_lines = ['Atomize data treatment buffer', 'labels: ' + '|'.join(labels)]
-        if xname:
-            header_lines.append('xname: ' + str(xname).replace('\n', ' '))
-        header = '\n'.join(header_lines)
-        np.savetxt(BUFFER_PATH, buf, delimiter=',', fmt='%.6e', header=header, comments='# ')
+        """Post the curves [(label, x, y), …] to the one-shot 1D-tool mailbox
+        (treatment_mailbox) and notify an open 1D window. The X axis name+unit
+        lets the 1D tool label and SI-prefix the axis (e.g. a 's' slice axis
+        then reads in ns)."""
+        mailbox.send_curves(curves, xname=str(xname).replace('\n', ' '))
+        mailbox.notify(mailbox.KIND_1D)
 
     def _compute_slice(self):
         """Build the current slice (Re/Im vs the decay axis), averaging the
@@ -1701,14 +1693,20 @@ class MainWindow(QMainWindow):
             i, q, col, row, meta = (self.src_i, self.src_q, self.src_col,
                                     self.src_row, ['Raw I/Q'])
         # save_data writes a (2, nX, nY) array as name.csv (real) + name_1.csv
-        # (imag), each transposed back to [trace, point] — the load format.
+        # (imag), each transposed back to [trace, point] — the load format; a
+        # binary name keeps both frames (and the axes) in the one file.
         arr = np.array([np.transpose(i), np.transpose(q)])
+        is_bin = binary.wants_binary(file_path)
         header = '\n'.join(meta + [
             f'X ({col["name"]}/{col["scale"]}): start {col["start"]:.6g} step {col["step"]:.6g}',
             f'Y ({row["name"]}/{row["scale"]}): start {row["start"]:.6g} step {row["step"]:.6g}',
+            'channel 0 = real/I (frame 0), channel 1 = imag/Q (frame 1)' if is_bin else
             'channel 0 = real/I (this file), channel 1 = imag/Q (_1 file)'])
-        self.opener.save_data(file_path, arr, header=header, mode='w')
-        self.set_status(f'Saved I/Q to {os.path.basename(file_path)} (+ _1).')
+        axes = [{'name': ax['name'], 'unit': ax['scale'],
+                 'start': float(ax['start']), 'step': float(ax['step'])} for ax in (row, col)]
+        self.opener.save_data(file_path, arr, header=header, mode='w', axes=axes)
+        self.set_status(f'Saved I/Q to {os.path.basename(file_path)}'
+                        + ('.' if is_bin else ' (+ _1).'))
 
 
 def main():
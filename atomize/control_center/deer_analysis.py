@@ -34,6 +34,8 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, QPushBu
 import atomize.general_modules.general_functions as general
 import atomize.general_modules.csv_opener_saver as openfile
 import atomize.general_modules.bruker_opener as bruker
+import atomize.general_modules.binary_data as binary
+import atomize.general_modules.treatment_mailbox as mailbox
 import atomize.math_modules.fft as fft_module
 import atomize.math_modules.deer as deer_module
 
@@ -45,9 +47,6 @@ from atomize.general_modules.gui_style import (apply_app_style,
     BG, ACCENT, BUTTON_STYLE, LABEL_STYLE, DSPIN_STYLE, SPIN_STYLE,
     COMBO_STYLE, CHECKBOX_STYLE, SCROLL_STYLE, TAB_STYLE)
 
-# Plot buffer written by the main-window plot sidebar ("Send to Data Treatment");
-# shared one-shot mailbox with the Data Treatment tools (libs/ runtime IPC).
-BUFFER_PATH = str(Path(__file__).resolve().parent.parent.parent / 'libs' / 'treatment_buffer.csv')
 # Folder of the last file opened/saved here — shared working folder with the
 # Data Treatment tools so dialogs reopen where you left off.
 LASTDIR_PATH = str(Path(__file__).resolve().parent.parent.parent / 'libs' / 'treatment_lastdir.txt')
@@ -111,17 +110,23 @@ class _DeerWorker(QThread):
     """Runs one DEER inversion (optionally zero-time fit + validation) off the GUI
     thread. The work is pure numpy/scipy (the heavy NNLS/least-squares releases the
     GIL), so the window stays responsive during the ~10-60 s joint fit. `fn` is a
-    closure that captures plain values only (no Qt widgets); its return value — or
-    the Exception it raised — is delivered to the main thread via `done`."""
+    closure that captures plain values only (no Qt widgets); it is called with a
+    progress callback (deer_validate's `progress`, forwarded as `partial`), and
+    its return value — or the Exception it raised — is delivered to the main
+    thread via `done`."""
     done = pyqtSignal(object)
+    partial = pyqtSignal(object)
 
     def __init__(self, fn, parent=None):
         super().__init__(parent)
         self._fn = fn
 
+    def _progress(self, n_done, total, band):
+        self.partial.emit((n_done, total, band))
+
     def run(self):
         try:
-            self.done.emit(self._fn())
+            self.done.emit(self._fn(self._progress))
         except Exception as e:                    # surfaced on the main thread
             self.done.emit(e)
 
@@ -132,6 +137,10 @@ class MainWindow(QMainWindow):
     DEER_TUNITS = {'µs': 1.0, 'ns': 1e-3, 'ms': 1e3}
     # plausible DEER trace length in µs, for guessing the unit of a file with none
     DEER_TSPAN_US = (0.05, 50.0)
+    # worker processes for the validation sweep and the Monte-Carlo Gaussian
+    # multi-start (n_jobs of deer_validate / deer_invert_gauss). Serial by
+    # default; opt in with e.g. -1 (all CPUs), each worker is a new process
+    DEER_JOBS = 1
 
     def __init__(self, *args, **kwargs):
         super(MainWindow, self).__init__(*args, **kwargs)
@@ -1230,19 +1239,24 @@ class MainWindow(QMainWindow):
         the data, split on commas). Best-effort: returns [] on any trouble."""
         labels = []
         try:
-            with open(file_path, 'r', errors='ignore') as fh:
-                for line in fh:
-                    s = line.strip()
-                    if not s:
-                        continue
-                    if s.startswith('#'):
-                        parts = [c.strip() for c in s.lstrip('#').split(',')]
-                        if any(parts):
-                            labels = parts
-                    else:
-                        break
+            if binary.is_binary(file_path):
+                lines = binary.read_header(file_path)
+            else:
+                lines = []
+                with open(file_path, 'r', errors='ignore') as fh:
+                    for line in fh:
+                        s = line.strip()
+                        if not s:
+                            continue
+                        if not s.startswith('#'):
+                            break
+                        lines.append(s.lstrip('#'))
         except Exception:
             return []
+        for line in lines:
+            parts = [c.strip() for c in line.split(',')]
+            if any(parts):
+                labels = parts
         return labels if any(labels) else []
 
     def _preset_deer_unit(self, label, x=None):
@@ -1335,7 +1349,7 @@ class MainWindow(QMainWindow):
         if not file_path or file_path == 'None':
             return
         try:
-            res = self.bruker.open(file_path)
+            res = self.bruker.open(file_path, lazy=True)   # a 2D file is not read
         except Exception as e:
             self.set_status(f'Could not read Bruker file: {e}')
             return
@@ -1364,36 +1378,20 @@ class MainWindow(QMainWindow):
                         + advice)
 
     def load_from_buffer(self, silent=False):
-        if not os.path.isfile(BUFFER_PATH):
-            if not silent:
-                self.set_status('No plot buffer found. Right-click a plot in the '
-                                'main window → "Send to Data Treatment" first.')
-            return
         try:
-            labels = []
-            buf_xname = ''
-            header_count = 0
-            with open(BUFFER_PATH, 'r') as fh:
-                for line in fh:
-                    if not line.startswith('#'):
-                        break
-                    header_count += 1
-                    if 'labels:' in line:
-                        labels = line.split('labels:', 1)[1].strip().split('|')
-                    elif 'xname:' in line:
-                        buf_xname = line.split('xname:', 1)[1].strip()
-            data = np.genfromtxt(BUFFER_PATH, delimiter=',', skip_header=header_count)
-            data = np.atleast_2d(data)
-            # one-shot mailbox: consume now so reopening the window does not
-            # reload this (stale) plot data
-            self._consume_buffer()
-            ncurves = data.shape[1] // 2
+            # one-shot mailbox: receiving consumes it, so reopening the window
+            # does not reload this (stale) plot data
+            sent = mailbox.receive_curves()
+            if sent is None:
+                if not silent:
+                    self.set_status('No plot buffer found. Right-click a plot in the '
+                                    'main window → "Send to Data Treatment" first.')
+                return
+            curves, meta = sent
+            buf_xname = meta.get('xname', '')
             mapping = {}
-            for i in range(ncurves):
-                x = data[:, 2 * i]
-                y = data[:, 2 * i + 1]
+            for label, x, y in curves:
                 mask = ~(np.isnan(x) | np.isnan(y))
-                label = labels[i] if i < len(labels) else f'curve {i}'
                 mapping[label] = (x[mask], y[mask])
             if not mapping:
                 if not silent:
@@ -1410,11 +1408,7 @@ class MainWindow(QMainWindow):
                 self.set_status(f'Could not read plot buffer: {e}')
 
     def _consume_buffer(self):
-        try:
-            if os.path.isfile(BUFFER_PATH):
-                os.remove(BUFFER_PATH)
-        except OSError:
-            pass
+        mailbox.discard(mailbox.KIND_1D)
 
     def _unique_trace_name(self, name):
         """A trace name not already in use (append (2), (3), … on collision)."""
@@ -1906,6 +1900,7 @@ class MainWindow(QMainWindow):
         self.set_status(status)
         self._deer_worker = _DeerWorker(compute)
         self._deer_worker.done.connect(self._deer_finished)
+        self._deer_worker.partial.connect(self._deer_partial)
         self._deer_worker.start()
 
     def do_deer(self):
@@ -1956,12 +1951,13 @@ class MainWindow(QMainWindow):
         echo_head = self.deer_echo_head.isChecked() and engine == 'joint'
         validate = self.deer_validate_chk.isChecked()
         fit_t0 = self.deer_fit_t0.isChecked()
+        jobs = self.DEER_JOBS
         bgs_disp = float(self.deer_bgstart.value())
         bge_disp = float(self.deer_bgend.value())
         t0_cur = float(self.deer_t0.value())
         bgp = self._general_bg_params()
 
-        def compute():
+        def compute(progress=None):
             t0_disp = t0_cur
             if fit_t0:
                 t0u = deer_module.fit_zero_time(
@@ -1977,7 +1973,7 @@ class MainWindow(QMainWindow):
                 val = deer_module.deer_validate(
                     t_us, v, r=r, bg_start=bg_us, bg_end=bg_end_us, dim=dim,
                     fit_dim=fit_dim, alpha=alpha, alpha_factor=afac, engine=engine,
-                    bg_params=bgp)
+                    bg_params=bgp, n_jobs=jobs, progress=progress)
                 res, band = val['base'], val
             else:
                 res = deer_module.deer_invert(
@@ -2041,10 +2037,11 @@ class MainWindow(QMainWindow):
         n_tau = int(self.mellin_ntau.value())
         validate = self.deer_validate_chk.isChecked()
         n_mc = 50 if self.deer_ci_chk.isChecked() else 0
+        jobs = self.DEER_JOBS
         signed_fit = self.mellin_signed_fit_chk.isChecked()
         bgp = self._general_bg_params()
 
-        def compute():
+        def compute(progress=None):
             t0_disp = t0_cur
             if fit_t0:
                 t0u = deer_module.fit_zero_time(
@@ -2062,7 +2059,8 @@ class MainWindow(QMainWindow):
             if validate:
                 val = deer_module.deer_validate(
                     t_us, v, r=r, bg_start=bg_us, bg_end=bg_end_us, dim=dim,
-                    fit_dim=fit_dim, engine='mellin', **mk)
+                    fit_dim=fit_dim, engine='mellin', n_jobs=jobs,
+                    progress=progress, **mk)
                 res, band = val['base'], val
             else:
                 res = deer_module.deer_invert_mellin(
@@ -2131,9 +2129,10 @@ class MainWindow(QMainWindow):
         ci_mode = ('linear' if gmethod == 'mc'
                    else ('support' if self.gauss_support_chk.isChecked() else 'linear'))
         validate_flag = self.deer_validate_chk.isChecked()
+        jobs = self.DEER_JOBS
         bgp = self._general_bg_params()
 
-        def compute():
+        def compute(progress=None):
             t0_disp = t0_cur
             if fit_t0:
                 t0u = deer_module.fit_zero_time(
@@ -2153,12 +2152,12 @@ class MainWindow(QMainWindow):
                 # would make the per-bg-start sweep prohibitively slow.)
                 val = deer_module.deer_validate(
                     t_us, v, r=r, bg_start=bg_us, bg_end=bg_end_us, dim=dim,
-                    fit_dim=fit_dim, engine='gauss', **gk)
+                    fit_dim=fit_dim, engine='gauss', n_jobs=jobs, **gk)
                 res, band = val['base'], val
             else:
                 res = deer_module.deer_invert_gauss(
                     t_us, v, r=r, bg_start=bg_us, bg_end=bg_end_us, dim=dim,
-                    fit_dim=fit_dim, n_mc=n_mc, **gk)
+                    fit_dim=fit_dim, n_mc=n_mc, n_jobs=jobs, **gk)
                 band = None
             # display axis in acquisition time, over exactly the samples the engine kept
             res['r_min_requested'] = float(np.min(r))
@@ -2457,6 +2456,17 @@ class MainWindow(QMainWindow):
         self.set_status(f'Saved {os.path.basename(summ)} + {os.path.basename(pr)} '
                         f'({len(tbl["rows"])} traces).')
 
+    def _deer_partial(self, msg):
+        """Progressive validation band while a `deer_validate` sweep runs (main
+        thread, via the worker's `partial` signal): the percentile band of the
+        trials finished so far, redrawn as each one comes in."""
+        n_done, total, band = msg
+        if self.real_xy[0] is None:
+            return
+        self.set_status(f'Validation: {n_done}/{total} trials…')
+        if band is not None and band['n_trials'] > 1:
+            self._show_deer_band(True, band['r'], band['P_lower'], band['P_upper'])
+
     def _deer_finished(self, payload):
         """Apply a finished inversion (runs on the main thread via the signal).
         Shared by the Tikhonov (`do_deer`), Mellin (`do_mellin`) and
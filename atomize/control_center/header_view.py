@@ -29,6 +29,7 @@ from PyQt6.QtWidgets import (QWidget, QLabel, QComboBox, QCheckBox, QLineEdit,
     QPushButton, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QPlainTextEdit, QHeaderView, QAbstractItemView)
 
+import atomize.general_modules.binary_data as binary
 from atomize.general_modules.gui_style import (BG, BASE, FG, BORDER, ACCENT,
     BUTTON_STYLE, LABEL_STYLE, COMBO_STYLE, LINEEDIT_STYLE, CHECKBOX_STYLE,
     SCROLL_STYLE)
@@ -60,9 +61,13 @@ QPlainTextEdit {{ background-color: {BG}; color: {FG};
 def read_header(path):
     """The leading '#' comment block of `path` as a list of lines, '#' stripped.
     Returns [] for a file without one (or one that cannot be read): a header is
-    a nicety, never a reason to fail a load."""
+    a nicety, never a reason to fail a load. A binary_data container gives the
+    header text stored in it."""
     lines = []
     try:
+        if binary.is_binary(path):
+            lines = [ln.rstrip() for ln in binary.read_header(path) if ln.strip()]
+            return lines[:MAX_HEADER_LINES]
         with open(path, 'r', errors='ignore') as fh:
             for line in fh:
                 if not line.strip():
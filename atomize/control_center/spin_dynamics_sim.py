@@ -59,6 +59,7 @@ ROW_H = 26
 SUB_PT = 11
 LBL_SUB_PT = 10
 MAX_NUC = 3                       # nuclei the spin-system builder exposes
+SWEEP_CHUNK = 32                  # time-sweep points per Engine.run_sweep call
 
 
 def _sub(base, sub, pt=SUB_PT):
@@ -829,11 +830,30 @@ class MainWindow(QMainWindow):
         self._axis_unit = 's'
         self._x_log = self.preset.globals.get('sweep_type') == 'log'
         self._update_status("Simulating 0 / %d…" % npts)
-        for i in range(npts):
+        steps = [self._build_events(step=i) for i in range(npts)]
+        k = self._swept_delay(steps)
+        if k is not None:
+            # only one delay moves: the whole axis in batches of run_sweep
+            events, cyc = steps[0]
+            taus = np.array([ev[k].tau for ev, _ in steps])
+            for i in range(0, npts, SWEEP_CHUNK):
+                if self._stop:
+                    self._update_status("Stopped at %d / %d." % (i, npts))
+                    break
+                win = eng.run_sweep(events, k, taus[i:i + SWEEP_CHUNK],
+                                    phase_cycle=cyc)[0]
+                for j in range(win['v'].shape[0]):
+                    sig[i + j] = self._integrate({'t': win['t'][j], 'v': win['v'][j]}, integ)
+                self._axis, self._sig = axis, sig
+                self._replot_only()
+                self._update_status("Simulating %d / %d…"
+                                    % (min(i + SWEEP_CHUNK, npts), npts))
+                QApplication.processEvents()
+            steps = []
+        for i, (events, cyc) in enumerate(steps):
             if self._stop:
                 self._update_status("Stopped at %d / %d." % (i, npts))
                 break
-            events, cyc = self._build_events(step=i)
             sig[i] = self._integrate(eng.run(events, phase_cycle=cyc)[0], integ)
             if i % 4 == 0 or i == npts - 1:
                 self._axis, self._sig = axis, sig
@@ -845,6 +865,28 @@ class MainWindow(QMainWindow):
         if not self._stop:
             self._update_status("Done: %d points.%s" % (npts, self._aliasing_warning(npts)))
 
+    @staticmethod
+    def _swept_delay(steps):
+        """Index of the only Delay that changes between the steps' event
+        lists, or None if anything else (an event, the phase cycle) does.
+        Delays equal to float round-off (1e-6 ns) count as unchanged."""
+        events0, cyc0 = steps[0]
+        k = None
+        for events, cyc in steps[1:]:
+            if len(events) != len(events0) or cyc != cyc0:
+                return None
+            for i, (a, b) in enumerate(zip(events0, events)):
+                if type(a) is not type(b):
+                    return None
+                if isinstance(a, sd.Delay):
+                    if abs(a.tau - b.tau) > 1e-6:
+                        if k not in (None, i):
+                            return None
+                        k = i
+                elif vars(a) != vars(b):
+                    return None
+        return k
+
     def _aliasing_warning(self, npts):
         """Warn if the discrete offset grid is too coarse for the sequence.
 
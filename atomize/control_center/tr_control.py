@@ -1148,6 +1148,8 @@ class Worker():
 
             w = 30
             file_handler = openfile.Saver_Opener()
+            # crash-safe per-scan journal of the accumulated data (scan_writer)
+            writer = file_handler.create_scan_writer(p2)
             process = 'None'
             ag53131a = ag.Agilent_53131a()
             ls335 = ls.Lakeshore_335()
@@ -1218,6 +1220,8 @@ class Worker():
             else:
                 data = np.zeros( (3, real_length, points + 1) )
                 data_2 = np.zeros( (2, real_length_2, points + 1) )
+            if p9 > 1:
+                writer_2 = file_handler.create_scan_writer(f"{p2}_2")
             
             temp_start = str( ls335.tc_temperature('A') )
 
@@ -1641,6 +1645,14 @@ class Worker():
                             file_save_j = file_save_1.split('.csv')[0] + f'_{j}_scans.csv'
                             file_handler.save_data(file_save_j, np.transpose( data[0, :, :] ), header = header)
 
+                    # journal the completed scan; a crash keeps everything up to here
+                    # (a two-sided scan averages two passes and j counts the passes)
+                    if self.command != 'exit':
+                        scans, count = ( (j + 1) // 2, j + 1 ) if p12 == 1 else ( j, j )
+                        writer.append(scans, data, count = count)
+                        if p9 > 1:
+                            writer_2.append(scans, data_2, count = count)
+
                     j += 1
 
                 # finish succesfully
@@ -1778,6 +1790,11 @@ class Worker():
                 field = bh15.magnet_field( OFFRES_FIELD )
                 field = OFFRES_FIELD
 
+                # the run is saved: drop its journal
+                for scan_writer in ( (writer, writer_2) if p9 > 1 else (writer, ) ):
+                    if scan_writer.finish() is not None:
+                        conn.send( ('Message', f'Autosave journal failed: {scan_writer.error}') )
+
                 conn.send( ('', f'Script {p2} finished') )
                 general.wait('200 ms')
                 conn.close()
@@ -1786,6 +1803,15 @@ class Worker():
             exc_info = f"{type(e)} \n{str(e)} \n{traceback.format_exc()}"
             conn.send( ('Error', exc_info) )
 
+        finally:
+            # flush the journal of an interrupted run (a no-op after finish())
+            try:
+                writer.close()
+                if p9 > 1:
+                    writer_2.close()
+            except Exception:
+                pass
+
     def exp_test(self, conn, p1, p2, p3, p4, p5, p6, p7, p8, p9, p10, p11, p12):
         """
         function that contains experimental script
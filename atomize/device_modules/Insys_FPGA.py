@@ -9,8 +9,10 @@ import time
 import queue
 import ctypes
 import fileinput
+import hashlib
 import threading
-from copy import deepcopy
+from copy import copy, deepcopy
+from collections import OrderedDict
 from operator import iconcat
 from functools import reduce
 from itertools import groupby, chain
@@ -19,6 +21,7 @@ import numpy as np
 import atomize.main.local_config as lconf
 import atomize.device_modules.config.config_utils as cutil
 import atomize.general_modules.general_functions as general
+import atomize.math_modules.signal_processing as sigproc
 
 
 # Streaming-parser constants used by the v4 buffer-handling path
@@ -38,6 +41,14 @@ _GIM_SWCOMP_POLL_S = 0.0001
 _GIM_BUSY_TAIL_S = 0.0008
 _GIM_ESTIMATE_SLACK_S = 0.002
 
+# Byte budget of the compiled-program cache (GIM words + DAC buffers shared by
+# all sweep points, phases and scans); least recently used programs go first.
+_PROGRAM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+class _PrecompileStopped(Exception):
+    """Raised inside the pulser_precompile_sweep() thread when it is stopped."""
+
+
 _PHASE_SIGN = {
     '+x': 1,  '+': 1,
     '-x': -1, '-': -1,
@@ -48,6 +59,8 @@ _PHASE_SIGN = {
 
 class Insys_FPGA:
     def __init__(self):
+        # cached correction phasors of the IQ demodulation
+        self.demodulator = sigproc.Demodulator()
         #### Inizialization
         # setting path to *.ini file
         self.path_current_directory = lconf.load_config_device()
@@ -253,6 +266,27 @@ class Insys_FPGA:
         # per-pulse waveform cache for the 'Single Joined' DAC buffer, keyed by
         # all waveform-defining parameters (see define_buffer_single_joined_awg)
         self.waveform_cache_awg = {}
+        # compiled programs, content-addressed by the normalized pulse table:
+        # GIM words for pulser_update() and DAC buffers for awg_update(), so
+        # scans 2..N and repeated phase steps replay scan 1 instead of
+        # recompiling (see _program_cache_get / pulser_cache_stats). The cache
+        # and its counters are shared with the pulser_precompile_sweep() thread
+        self._program_cache = OrderedDict()
+        self._program_stats = {'bytes': 0, 'hits': 0, 'misses': 0, 'compile_s': 0.0}
+        self._program_lock = threading.Lock()
+        self.program_cache_max_bytes = _PROGRAM_CACHE_MAX_BYTES
+        self._dac_words = (None, None)
+        # content address of the DAC program in channel_1 / channel_2
+        self._dac_key = None
+        # awg_update() left the buffer to the precompiled sweep
+        self._dac_deferred = False
+        # ahead-of-time sweep compilation (pulser_precompile_sweep)
+        self._precompile_thread = None
+        self._precompile_queue = None
+        self._precompile_stop = None
+        # set on the shadow copy the precompile thread walks: its
+        # pulser_update() hands the compiled program here instead of uploading
+        self._program_sink = None
         self.cor_version_awg = 0 # bumped on every correction-settings change
         # active time grid (ns) for AWG-related timing: start / length /
         # delta_start / length_increment of TRIGGER_AWG (+ its 'AWG' pair) and
@@ -1401,19 +1435,30 @@ class Insys_FPGA:
         Repetition rate is taking into account by adding a last pulse with delay.
         Currently, all pulses are cycled using BRANCH.
         """
-        if self.test_flag != 'test':
+        if self._program_sink is not None:
+            # shadow copy of a precompiled sweep: compile and queue, no upload
+            if not (self.reset_count_pulser == 0 or self.shift_count_pulser == 1
+                    or self.increment_count_pulser == 1 or self.rep_rate_count_pulser == 1):
+                return
+            key = self._pulser_program(self._rep_time_ns())
+            if self.test_flag == 'test' and self.awg_pulses_pulser == 1:
+                self.awg_update()
+            dac = self._dac_program() if self._dac_key is not None else None
+            self._program_sink((key, self._dac_key, self._gim_buffer, dac))
+
+            self.reset_count_pulser = 1
+            self.shift_count_pulser = 0
+            self.increment_count_pulser = 0
+            self.rep_rate_count_pulser = 0
+
+        elif self.test_flag != 'test':
             if not (self.reset_count_pulser == 0 or self.shift_count_pulser == 1
                     or self.increment_count_pulser == 1 or self.rep_rate_count_pulser == 1):
                 return
 
             rep_time = self._rep_time_ns()
 
-            to_spinapi = self.split_into_parts_pulser(self.pulse_array_pulser, rep_time)
-            to_spinapi2 = np.array(to_spinapi, dtype=np.int64)
-            if self.awg_pulses_pulser == 1:
-                # mod; offset all but the last instruction by 512 on column 0
-                to_spinapi2[:-1, 0] += 512
-            self.gen_GIM_words(to_spinapi2)  # Создает главный буфер
+            self._next_program(rep_time)  # Создает главный буфер
 
             if self.nIP_NoKeeper_brd != self.nIP_No_brd:
                 if self.awg_pulses_pulser == 1:
@@ -1467,13 +1512,7 @@ class Insys_FPGA:
 
             rep_time = self._rep_time_ns()
 
-            to_spinapi = self.split_into_parts_pulser(self.pulse_array_pulser, rep_time)
-            to_spinapi2 = np.array(to_spinapi, dtype=np.int64)
-
-            if self.awg_pulses_pulser == 1:
-                # mod; offset all but the last instruction by 512 on column 0
-                to_spinapi2[:-1, 0] += 512
-            self.gen_GIM_words(to_spinapi2)  # Создает главный буфер
+            self._next_program(rep_time)  # Создает главный буфер
 
             if self.awg_pulses_pulser == 1:
                 self.awg_update()
@@ -1932,6 +1971,7 @@ class Insys_FPGA:
         A special function for Pulse Control module
         It clear self.pulse_array_pulser and other status flags
         """
+        self.pulser_precompile_stop()
         self.pulse_array_pulser = []
         self.phase_array_length_pulser = []
         self.pulse_name_array_pulser = []
@@ -1952,6 +1992,26 @@ class Insys_FPGA:
         """
         self.test_flag = flag
 
+    def pulser_cache_stats(self):
+        """
+        Statistics of the compiled-program cache used by pulser_update() and
+        awg_update(): number of cached programs, their size in bytes, hits,
+        misses, hit rate and the total time spent compiling (s)
+        """
+        with self._program_lock:
+            stats = dict(self._program_stats)
+            entries = len(self._program_cache)
+        lookups = stats['hits'] + stats['misses']
+        return {
+            'entries': entries,
+            'bytes': stats['bytes'],
+            'max_bytes': self.program_cache_max_bytes,
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_rate': stats['hits'] / lookups if lookups else 0.0,
+            'compile_time': stats['compile_s'],
+        }
+
     def pulser_acquisition_cycle(self, data1, data2, points, phases, adc_window,
                                  acq_cycle=['+x'], lo=None, hi=None):
         """
@@ -2203,6 +2263,7 @@ class Insys_FPGA:
           * the 'status' file (the cross-process "card busy" lock) is ALWAYS
             cleared, even if a board call failed.
         """
+        self.pulser_precompile_stop()
         if self.test_flag != 'test':
 
             # Stop the background processing thread first (bounded join;
@@ -2951,7 +3012,12 @@ class Insys_FPGA:
             if self.reset_count_awg == 0 or self.shift_count_awg == 1 or self.increment_count_awg == 1 or self.setting_change_count_awg == 1:
 
                 self.update_counter_awg += 1
-                self.channel_1 , self.channel_2 = self.define_buffer_single_joined_awg()
+                if self._precompile_thread is None:
+                    self.channel_1 , self.channel_2 = self._awg_program()
+                else:
+                    # the buffer comes with the precompiled program in pulser_update()
+                    self._dac_key = self._awg_program_key()
+                    self._dac_deferred = True
 
                 self.shift_count_pulser = 1
                 
@@ -2969,7 +3035,12 @@ class Insys_FPGA:
             if self.reset_count_awg == 0 or self.shift_count_awg == 1 or self.increment_count_awg == 1 or self.setting_change_count_awg == 1:
 
                 self.update_counter_awg += 1
-                self.channel_1 , self.channel_2 = self.define_buffer_single_joined_awg()
+                if self._precompile_thread is None:
+                    self.channel_1 , self.channel_2 = self._awg_program()
+                else:
+                    # the buffer comes with the precompiled program in pulser_update()
+                    self._dac_key = self._awg_program_key()
+                    self._dac_deferred = True
 
                 self.shift_count_pulser = 1
 
@@ -6124,6 +6195,245 @@ class Insys_FPGA:
         self._gim_buffer = kk
         self.data_buf_IP_GIM_brd = len(kk), kk.ctypes.data_as(ctypes.POINTER(ctypes.c_int32))
 
+    def interleave_dac_awg(self, channel_1, channel_2):
+        """
+        DAC FIFO words for the 'Single Joined' buffers: -CH0, -CH1, CH1, CH0
+        per sample
+        """
+        return np.array([-channel_1, -channel_2, channel_2, channel_1], dtype = np.int16).T.ravel()
+
+    def _program_key(self, kind, *parts):
+        """
+        Content address of a compiled program: a digest of the normalized
+        pulse table and every setting the compiler reads
+        """
+        h = hashlib.blake2b(kind.encode(), digest_size = 16)
+        for part in parts:
+            if isinstance(part, np.ndarray) and part.dtype != object:
+                h.update(repr((part.dtype.str, part.shape)).encode())
+                h.update(np.ascontiguousarray(part).tobytes())
+            else:
+                h.update(repr(part).encode())
+        return kind, h.digest()
+
+    def _program_cache_get(self, key):
+        with self._program_lock:
+            entry = self._program_cache.get(key)
+            if entry is None:
+                self._program_stats['misses'] += 1
+                return None
+            self._program_cache.move_to_end(key)
+            self._program_stats['hits'] += 1
+            return entry[0]
+
+    def _program_cache_put(self, key, program, compile_s):
+        """
+        Store a compiled program (tuple of arrays and scalars); the arrays are
+        made read-only, since every replay hands out the same objects.
+        Least recently used programs are evicted beyond program_cache_max_bytes
+        """
+        for a in program:
+            if isinstance(a, np.ndarray):
+                a.flags.writeable = False
+        nbytes = sum(a.nbytes for a in program if isinstance(a, np.ndarray))
+        with self._program_lock:
+            stats = self._program_stats
+            stats['compile_s'] += compile_s
+            if nbytes > self.program_cache_max_bytes:
+                return
+            old = self._program_cache.pop(key, None)
+            if old is not None:
+                stats['bytes'] -= old[1]
+            self._program_cache[key] = (program, nbytes)
+            stats['bytes'] += nbytes
+            while stats['bytes'] > self.program_cache_max_bytes:
+                _, (_, n) = self._program_cache.popitem(last = False)
+                stats['bytes'] -= n
+
+    def _pulser_program(self, rep_time):
+        """
+        GIM words of the current pulse sequence. The sequence is compiled
+        (split_into_parts_pulser + gen_GIM_words) only the first time a pulse
+        table / repetition time combination is seen; later sweep points,
+        phases and scans with the same table replay the cached words
+        """
+        key = self._pulser_program_key(rep_time)
+        program = self._program_cache_get(key)
+        if program is None:
+            t0 = time.perf_counter()
+            to_spinapi = self.split_into_parts_pulser(self.pulse_array_pulser, rep_time)
+            to_spinapi2 = np.array(to_spinapi, dtype=np.int64)
+            if self.awg_pulses_pulser == 1:
+                # mod; offset all but the last instruction by 512 on column 0
+                to_spinapi2[:-1, 0] += 512
+            self.gen_GIM_words(to_spinapi2)
+            self._program_cache_put(key, (self._gim_buffer, ), time.perf_counter() - t0)
+        else:
+            self._set_gim_words(program[0])
+        return key
+
+    def _pulser_program_key(self, rep_time):
+        table = self.convertion_to_numpy_pulser(self.pulse_array_pulser)
+        return self._program_key('GIM', table, rep_time, self.auto_defense_pulser, self.awg_pulses_pulser)
+
+    def _set_gim_words(self, kk):
+        self._gim_buffer = kk
+        self.data_buf_IP_GIM_brd = len(kk), kk.ctypes.data_as(ctypes.POINTER(ctypes.c_int32))
+
+    def _awg_program(self):
+        """
+        DAC buffers of the current AWG sequence (define_buffer_single_joined_awg)
+        and their interleaved FIFO words, compiled once per distinct AWG pulse
+        table, TRIGGER_AWG gates and output settings
+        """
+        key = self._awg_program_key()
+        program = self._program_cache_get(key)
+        if program is None:
+            t0 = time.perf_counter()
+            channel_1, channel_2 = self.define_buffer_single_joined_awg()
+            words = self.interleave_dac_awg(channel_1, channel_2)
+            program = (channel_1, channel_2, words, self.dac_window, self.overlap_flag)
+            self._program_cache_put(key, program, time.perf_counter() - t0)
+        self._dac_key = key
+        return self._set_dac_program(program)
+
+    def _awg_program_key(self):
+        pulses = [np.asarray(p).tolist() for p in self.preparing_buffer_single_awg()]
+        gates = [(p['start'], p['length']) for p in self.pulse_array_pulser if p['channel'] == 'TRIGGER_AWG']
+        return self._program_key('DAC', pulses, gates, self.awg_grid_ns, self.sample_rate_awg,
+                                 self.amplitude_0_awg, self.amplitude_1_awg, self.phase_shift_ch1_seq_mode_awg,
+                                 self.cor_version_awg, self.trigger_awg_shift, self.constant_shift_pulser)
+
+    def _set_dac_program(self, program):
+        channel_1, channel_2, words, self.dac_window, self.overlap_flag = program
+        self._dac_words = (channel_1, words)
+        return channel_1, channel_2
+
+    def _dac_program(self):
+        """
+        The DAC program currently in channel_1 / channel_2, as cached by _awg_program
+        """
+        return (self.channel_1, self.channel_2, self._dac_words[1], self.dac_window, self.overlap_flag)
+
+    def _next_program(self, rep_time):
+        """
+        Make the program of the current sweep step the one to upload: the next
+        item of pulser_precompile_sweep() if one is running and it was compiled
+        for the same pulse table, otherwise compile (or replay from the cache)
+        on this thread
+        """
+        if self._precompile_thread is not None:
+            try:
+                item = self._precompile_queue.get(timeout = _GIM_SWCOMP_TIMEOUT_S)
+            except queue.Empty:
+                item = None
+            if isinstance(item, tuple) and item[0] == self._pulser_program_key(rep_time) \
+                    and item[1] == self._dac_key:
+                self._set_gim_words(item[2])
+                if item[3] is not None:
+                    self.channel_1, self.channel_2 = self._set_dac_program(item[3])
+                    self._dac_deferred = False
+                return
+            self.pulser_precompile_stop()
+            if isinstance(item, BaseException) and self.test_flag == 'test':
+                raise item
+            if not isinstance(item, BaseException):
+                general.message('Precompiled sweep does not match the pulse sequence; compiling the remaining points on the fly')
+
+        if self._dac_deferred:
+            self.channel_1, self.channel_2 = self._awg_program()
+            self._dac_deferred = False
+        self._pulser_program(rep_time)
+
+    def pulser_precompile_sweep(self, points, phases, increment = False, depth = 64):
+        """
+        Compile the programs of a sweep ahead of the acquisition in a background
+        thread. The thread walks the same schedule as the measurement loop on a
+        copy of the pulse sequence:
+            for every scan:
+                for every point:
+                    for every phase: awg_next_phase(); pulser_update()
+                    pulser_shift(); awg_increment() or awg_shift(); pulser_increment()
+                pulser_pulse_reset(); awg_pulse_reset()
+        and queues the compiled GIM words and DAC buffers (at most `depth`
+        steps ahead). While it runs, awg_update() and pulser_update() on the
+        measurement thread only take the next program and upload it.
+        A step whose pulse table differs from the queued one (the loop left the
+        schedule) stops the precompilation and compiles on the fly from then on.
+        Call after pulser_open() and before the first point of the sweep.
+        """
+        self.pulser_precompile_stop()
+        shadow = copy(self)
+        for name in ('pulse_array_pulser', 'pulse_array_init_pulser', 'pulse_array_awg', 'pulse_array_init_awg'):
+            setattr(shadow, name, deepcopy(getattr(self, name)))
+        shadow.waveform_cache_awg = {}
+        shadow._acq_worker = None
+        shadow._precompile_thread = None
+
+        self._precompile_queue = queue.Queue(maxsize = max(1, int(depth)))
+        self._precompile_stop = threading.Event()
+        shadow._program_sink = self._precompile_put
+        self._precompile_thread = threading.Thread(
+            target = self._precompile_loop, args = (shadow, int(points), int(phases), increment),
+            name = 'InsysPrecompile', daemon = True)
+        self._precompile_thread.start()
+
+    def pulser_precompile_stop(self):
+        """
+        Stop the pulser_precompile_sweep() thread and drop the queued programs
+        """
+        t = self._precompile_thread
+        if t is None:
+            return
+        self._precompile_thread = None
+        self._precompile_stop.set()
+        try:
+            while True:
+                self._precompile_queue.get_nowait()
+        except queue.Empty:
+            pass
+        t.join(5.0)
+        self._precompile_queue = None
+
+    def _precompile_put(self, item):
+        stop = self._precompile_stop
+        while not stop.is_set():
+            try:
+                self._precompile_queue.put(item, timeout = 0.1)
+                return
+            except queue.Full:
+                pass
+        raise _PrecompileStopped()
+
+    def _precompile_loop(self, shadow, points, phases, increment):
+        """Worker: replay the sweep schedule on `shadow` (see pulser_precompile_sweep)."""
+        try:
+            while True:
+                for j in range(points):
+                    for i in range(phases):
+                        if len(shadow.pulse_array_awg) != 0:
+                            shadow.awg_next_phase()
+                        shadow.pulser_update()
+                    shadow.pulser_shift()
+                    if len(shadow.pulse_array_awg) != 0:
+                        if increment:
+                            shadow.awg_increment()
+                        else:
+                            shadow.awg_shift()
+                    shadow.pulser_increment()
+                shadow.pulser_pulse_reset()
+                shadow.awg_pulse_reset()
+        except _PrecompileStopped:
+            pass
+        except BaseException as exc:
+            # compile errors (and sys.exit() of split_into_parts_pulser) are
+            # raised again on the measurement thread, which compiles that
+            # step itself
+            try:
+                self._precompile_put(exc)
+            except _PrecompileStopped:
+                pass
+
     def awg_update_test(self):
         """
         Function that can be used for tests instead of awg_update()
@@ -6804,13 +7114,17 @@ class Insys_FPGA:
         """
         if self.test_flag != 'test':
             len_1st_ch              = self.dac_window
-            fl1  = np.array([-self.channel_1, -self.channel_2, self.channel_2, self.channel_1], dtype = ctypes.c_int16).T.ravel()
-            self.arr1 = ( ctypes.c_int16 * len(fl1) )(*fl1)
+            # the interleaved words of a cached program are built once
+            # (_awg_program); buffers set elsewhere are interleaved here
+            src, fl1 = self._dac_words
+            if src is not self.channel_1:
+                fl1 = self.interleave_dac_awg(self.channel_1, self.channel_2)
+            self.arr1 = fl1
 
             #writing data to FPGA
             self.rstDACFIFO_GIM( (nFIFO&1) )
             self.setDACWriteEnable_GIM( (nFIFO&1), 1 )
-            retval = self.write_DAC_data( self.arr1, ctypes.c_int(len(self.arr1)) )
+            retval = self.write_DAC_data( fl1.ctypes.data_as(ctypes.POINTER(ctypes.c_int16)), ctypes.c_int(len(fl1)) )
             self.setDACWriteEnable_GIM( (nFIFO&1), 0 )
 
         elif self.test_flag == 'test':
@@ -6910,32 +7224,16 @@ class Insys_FPGA:
 
         #phi_rad = np.radians(ph)
 
-        signal = arr_i + 1j * arr_q
-        timeaxis = signal.shape[0]
-        
         fs = 2.5e9 / self.dec_coef
-        t = np.arange(timeaxis) / fs
-        f_offset = freq * 1e6
-
-        if (ph1 != 0.0) or (ph2 != 0.0):
-            correction = np.exp(-1j * (2 * np.pi * f_offset * t + ph + ph1 * t + ph2 * t**2) )
-        else:
-            correction = np.exp(-1j * (2 * np.pi * f_offset * t + ph) )
-
-        new_shape = (timeaxis,) + (1,) * (signal.ndim - 1)
-        corrected_signal = signal * correction.reshape(new_shape)
 
+        # cached phasor + fused windowed integral (signal_processing.Demodulator)
         if not integral:
-            return corrected_signal.real, corrected_signal.imag
-        elif (integral) and len(signal.shape) == 2:
+            return self.demodulator.demodulate(arr_i, arr_q, fs, freq, ph, ph1, ph2)
+        elif (integral) and np.ndim(arr_i) == 2:
 
             scale = 0.4 * self.dec_coef
-            window = corrected_signal[self.win_left : self.win_right, :]
-
-            res_i = np.sum(window.real, axis=0) * scale
-            res_q = np.sum(window.imag, axis=0) * scale
-
-            return res_i, res_q
+            return self.demodulator.demodulate(arr_i, arr_q, fs, freq, ph, ph1, ph2,
+                                               window = (self.win_left, self.win_right), scale = scale)
 
         else:
             raise ValueError("Incorrect dimension of the array")
@@ -10,10 +10,13 @@ import pyqtgraph as pg
 import atomize.main.local_config as lconf
 import atomize.device_modules.config.config_utils as cutil
 import atomize.general_modules.general_functions as general
+import atomize.math_modules.signal_processing as sigproc
 
 class Keysight_3000_Xseries:
     #### Basic interaction functions
     def __init__(self):
+        # cached correction phasors of the IQ demodulation
+        self.demodulator = sigproc.Demodulator()
 
         #### Inizialization
         # setting path to *.ini file
@@ -490,33 +493,17 @@ class Keysight_3000_Xseries:
         if np.isnan(arr_i).any() or np.isnan(arr_q).any():
             return arr_i, arr_q
 
-        signal = arr_i + 1j * arr_q
-        timeaxis = signal.shape[0]
-
         dt = pg.siEval( self.oscilloscope_time_resolution() )   # seconds per point
         fs = 1.0 / dt                                           # sampling frequency, Hz
-        t = np.arange(timeaxis) / fs
-        f_offset = freq * 1e6
-
-        if (ph1 != 0.0) or (ph2 != 0.0):
-            correction = np.exp(-1j * (2 * np.pi * f_offset * t + ph + ph1 * t + ph2 * t**2) )
-        else:
-            correction = np.exp(-1j * (2 * np.pi * f_offset * t + ph) )
-
-        new_shape = (timeaxis,) + (1,) * (signal.ndim - 1)
-        corrected_signal = signal * correction.reshape(new_shape)
 
+        # cached phasor + fused windowed integral (signal_processing.Demodulator)
         if not integral:
-            return corrected_signal.real, corrected_signal.imag
-        elif (integral) and len(signal.shape) == 2:
+            return self.demodulator.demodulate(arr_i, arr_q, fs, freq, ph, ph1, ph2)
+        elif (integral) and np.ndim(arr_i) == 2:
 
             scale = dt                              # seconds per point (matches oscilloscope_get_curve integral)
-            window = corrected_signal[self.win_left : self.win_right, :]
-
-            res_i = np.sum(window.real, axis=0) * scale
-            res_q = np.sum(window.imag, axis=0) * scale
-
-            return res_i, res_q
+            return self.demodulator.demodulate(arr_i, arr_q, fs, freq, ph, ph1, ph2,
+                                               window = (self.win_left, self.win_right), scale = scale)
 
         else:
             raise ValueError("Incorrect dimension of the array")
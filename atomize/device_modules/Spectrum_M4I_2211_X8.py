@@ -10,6 +10,7 @@ import numpy as np
 import atomize.main.local_config as lconf
 import atomize.device_modules.config.config_utils as cutil
 import atomize.general_modules.general_functions as general
+import atomize.math_modules.signal_processing as sigproc
 
 # The pyspcm driver source path (header_dir) and the card device node
 # (device, e.g. /dev/spcm0) are machine-specific and read from the device
@@ -24,6 +25,8 @@ from spcm_tools import *
 
 class Spectrum_M4I_2211_X8:
     def __init__(self):
+        # cached correction phasors of the IQ demodulation
+        self.demodulator = sigproc.Demodulator()
         #### Inizialization
         # setting path to *.ini file
         self.path_current_directory = lconf.load_config_device()
@@ -1460,32 +1463,16 @@ class Spectrum_M4I_2211_X8:
         if np.isnan(arr_i).any() or np.isnan(arr_q).any():
             return arr_i, arr_q
 
-        signal = arr_i + 1j * arr_q
-        timeaxis = signal.shape[0]
-
         fs = self.sample_rate * 1e6                 # sampling frequency, Hz
-        t = np.arange(timeaxis) / fs
-        f_offset = freq * 1e6
-
-        if (ph1 != 0.0) or (ph2 != 0.0):
-            correction = np.exp(-1j * (2 * np.pi * f_offset * t + ph + ph1 * t + ph2 * t**2) )
-        else:
-            correction = np.exp(-1j * (2 * np.pi * f_offset * t + ph) )
-
-        new_shape = (timeaxis,) + (1,) * (signal.ndim - 1)
-        corrected_signal = signal * correction.reshape(new_shape)
 
+        # cached phasor + fused windowed integral (signal_processing.Demodulator)
         if not integral:
-            return corrected_signal.real, corrected_signal.imag
-        elif (integral) and len(signal.shape) == 2:
+            return self.demodulator.demodulate(arr_i, arr_q, fs, freq, ph, ph1, ph2)
+        elif (integral) and np.ndim(arr_i) == 2:
 
             scale = 1000 / self.sample_rate         # ns per point
-            window = corrected_signal[self.win_left : self.win_right, :]
-
-            res_i = np.sum(window.real, axis=0) * scale
-            res_q = np.sum(window.imag, axis=0) * scale
-
-            return res_i, res_q
+            return self.demodulator.demodulate(arr_i, arr_q, fs, freq, ph, ph1, ph2,
+                                               window = (self.win_left, self.win_right), scale = scale)
 
         else:
             raise ValueError("Incorrect dimension of the array")
@@ -3737,185 +3737,52 @@ class Spectrum_M4I_6631_X8:
         if self.channel == 1 or self.channel == 2:
             # two bytes per sample; multiply by number of enabled channels
             self.buffer_size = len( np.zeros(2 * self.memsize * 1) ) 
-            #buf = np.zeros(self.memsize * 1, dtype = np.float64 )
 
             # define the buffer
             self.pnBuffer = c_void_p()
             self.qwBufferSize = uint64 (self.buffer_size)  # buffer size
             self.pvBuffer = pvAllocMemPageAligned (self.qwBufferSize.value)
             self.pnBuffer = cast (self.pvBuffer, ptr16)
+            buf = self.buffer_view( self.memsize )
 
             # pulses for different channel
             for element in pulses:
                 # individual pulses at each channel
                 for index2, element2 in enumerate( element ):
-                    # segmented memory; mid_point for GAUSS, SINC, and WURST
-                    mid_point = int( element2[4]/2 )
-
                     # take a segment: self.segment_memsize*index2, self.segment_memsize*(index2 + 1)
-                    for i in range ( self.segment_memsize*index2, self.segment_memsize*(index2 + 1), 1):
-                                             #[      0,        1,               2,           3,                4,               5,     6,           7,               8,        9,     10]
-                        if element2[1] == 0: # SINE; [channel, function, frequency (MHz), phase, length (samples), sigma (samples), start, delta_start, amp_coefficient, n_wurst, b_sech]
-                            if i <= ( element2[4] + self.segment_memsize*index2 ):
-                                #buf[i]
-                                self.pnBuffer[i] = int(self.maxCAD / element2[8] * sin(2*pi*(( i - self.segment_memsize*index2))*element2[2] / self.sample_rate + element2[3]) )
-                            else:
-                                # keeping 0
-                                break
-                        elif element2[1] == 1: # GAUSS
-                            if i <= ( element2[4] + self.segment_memsize*index2 ):
-                                self.pnBuffer[i] = int(self.maxCAD / element2[8] * exp(-((( i - self.segment_memsize*index2) - mid_point)**2)*(1/(2*element2[5]**2)))*\
-                                    sin(2*pi*(( i - self.segment_memsize*index2))*element2[2] / self.sample_rate + element2[3]) )
-                            else:
-                                break
-                        elif element2[1] == 2: # SINC
-                            if i <= ( element2[4] + self.segment_memsize*index2 ):
-                                self.pnBuffer[i] = int(self.maxCAD / element2[8] * np.sinc(2*(( i - self.segment_memsize*index2) - mid_point) / (element2[5]) )*\
-                                    sin(2*pi*( i - self.segment_memsize*index2)*element2[2] / self.sample_rate + element2[3]) )
-                            else:
-                                break
-                        elif element2[1] == 3: # BLANK
-                            break
-                        elif element2[1] == 4: # WURST
-                            # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
-                            # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
-                            # WURST = at*sin(ph + phase_0)
-                            if i <= ( element2[4] + self.segment_memsize*index2 ):
-                                self.pnBuffer[i] = int( self.maxCAD / element2[8] * ( 1 - abs( sin( pi*( ( i - self.segment_memsize*index2) - mid_point ) / element2[4] ) ) ** element2[9] )*\
-                                    sin(2*pi*( ( i - self.segment_memsize*index2) *  element2[2][0] / self.sample_rate + 0.5 * (element2[2][1] - element2[2][0])*\
-                                    ( i - self.segment_memsize*index2)**2 / element2[4] / self.sample_rate ) + element2[3] ))
-
-                            else:
-                                break
-                        elif element2[1] == 5: # SECH/TANH
-                            # at = Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n];
-                            # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
-                            # SECH/TANH = at*sin(ph + phase_0)
-                            freq_cen = ( element2[2][1] + element2[2][0] ) / 2
-                            if i <= ( element2[4] + self.segment_memsize*index2 ):
-                                self.pnBuffer[i] = int( self.maxCAD / element2[8] * (1 / np.cosh( element2[10] * element2[4] * 2 **(element2[9] - 1) * ( ( ( i - self.segment_memsize*index2) - mid_point ) / element2[4]  ) ** element2[9] ) ) * \
-                                    sin(2*pi*(element2[2][1] - element2[2][0]) / self.sample_rate / element2[10] * \
-                                    np.log( np.cosh( element2[10] * ( ( i - self.segment_memsize*index2) - mid_point ) ) ) / 2 / np.tanh( element2[10] * mid_point ) + element2[3] + \
-                                        2 * pi * i * freq_cen / self.sample_rate ))
-                            else:
-                                break
+                    seg_start = self.segment_memsize*index2
+                    t = np.arange( min( element2[4], self.segment_memsize - 1 ) + 1 )
+                    wave = self.pulse_samples( element2, t, t + seg_start )
+                    if wave is not None:
+                        buf[seg_start:seg_start + len(t)] = wave
 
             return self.pvBuffer, self.pnBuffer
 
         elif self.channel == 3:
             # two bytes per sample; multiply by number of enabled channels
             self.buffer_size = len( np.zeros(2 * self.memsize * 2) )
-            #buf = np.zeros(self.memsize * 2)
             
             # define the buffer
             self.pnBuffer = c_void_p()
             self.qwBufferSize = uint64 (self.buffer_size)  # buffer size
             self.pvBuffer = pvAllocMemPageAligned (self.qwBufferSize.value)
             self.pnBuffer = cast (self.pvBuffer, ptr16)
+            buf = self.buffer_view( 2 * self.memsize )
 
             # pulses for different channel
             for element in pulses:
                 # individual pulses at each channel
                 for index2, element2 in enumerate( element ):
-                    # segments memory; mid_point for GAUSS, SINC, and WURST
-                    mid_point = int( element2[4]/2 )
-                    
-                    if element2[0] == 0:
-                        # take a segment: 2*self.segment_memsize*index2, 2*self.segment_memsize*(index2 + 1)
-                        # fill even indexes for CH0; step in the cycle is 2
-                        for i in range (2 * self.segment_memsize*index2, 2 * self.segment_memsize*(index2 + 1), 2):
-                                                 #[      0,        1,               2,           3,                4,               5,     6,           7,               8,        9,     10]
-                            if element2[1] == 0: # SINE; [channel, function, frequency (MHz), phase, length (samples), sigma (samples), start, delta_start, amp_coefficient, n_wurst, b_sech]
-                                if i <= (2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    # Sine Signal CH_0; i/2 in order to keep the frequency
-                                    #buf[i] 
-                                    self.pnBuffer[i] = int(self.maxCAD / element2[8] * sin(2*pi*(( i/2 - self.segment_memsize*index2))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 1: # GAUSS
-                                if i <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int(self.maxCAD / element2[8] * exp(-((( i/2 - self.segment_memsize*index2) - mid_point)**2)*(1/(2*element2[5]**2)))*\
-                                        sin(2*pi*(( i/2 - self.segment_memsize*index2))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 2: # SINC
-                                if i <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int(self.maxCAD / element2[8] * np.sinc(2*(( i/2 - self.segment_memsize*index2) - mid_point) / (element2[5]) )*\
-                                        sin(2*pi*( i/2 - self.segment_memsize*index2)*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 3: # BLANK
-                                break
-                            elif element2[1] == 4: # WURST
-                                # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
-                                # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
-                                # WURST = at*sin(ph + phase_0)
-                                if i <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * ( 1 - abs( sin( pi*( (  i/2 - self.segment_memsize*index2) - mid_point ) / element2[4] ) ) ** element2[9] )*\
-                                        sin(2*pi*( (  i/2 - self.segment_memsize*index2) *  element2[2][0] / self.sample_rate + 0.5 * (element2[2][1] - element2[2][0])*\
-                                        (  i/2 - self.segment_memsize*index2)**2 / element2[4] / self.sample_rate ) + element2[3] ))
-                                else:
-                                    break
-                            elif element2[1] == 5: # SECH/TANH
-                                # at = Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n];
-                                # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
-                                # SECH/TANH = at*sin(ph + phase_0)
-                                freq_cen = ( element2[2][1] + element2[2][0] ) / 2
-                                if i <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * (1 / np.cosh( element2[10] * element2[4] * 2 **(element2[9] - 1) * ( ( ( i/2 - self.segment_memsize*index2) - mid_point ) / element2[4]  ) ** element2[9] ) ) * \
-                                        sin(2*pi*(element2[2][1] - element2[2][0]) / self.sample_rate / element2[10] * \
-                                        np.log( np.cosh( element2[10] * ( ( i/2 - self.segment_memsize*index2) - mid_point ) ) ) / 2 / np.tanh( element2[10] * mid_point ) + element2[3] + \
-                                        2 * pi * (i/2) * freq_cen / self.sample_rate ))
-                                else:
-                                    break
-
-                    elif element2[0] == 1:
-                        # fill odd indexes for CH1; step in the cycle is 2
-                        for i in range (1 + 2 * self.segment_memsize*index2, 1 + 2 * self.segment_memsize*(index2 + 1), 2):
-                                                 #[      0,        1,               2,           3,                4,               5,     6,           7,               8,        9]
-                            if element2[1] == 0: # SINE; [channel, function, frequency (MHz), phase, length (samples), sigma (samples), start, delta_start, amp_coefficient, n_wurst]
-                                if (i - 1) <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    # Sine Signal CH_1; i/2 in order to keep the frequency
-                                    #buf[i]
-                                    self.pnBuffer[i] = int(self.maxCAD / element2[8] * sin(2*pi*(( (i - 1)/2 - self.segment_memsize*index2 ))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 1: # GAUSS
-                                if (i - 1) <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int(self.maxCAD / element2[8] * exp(-((( (i - 1)/2 - self.segment_memsize*index2) - mid_point)**2)*(1/(2*element2[5]**2)))*\
-                                        sin(2*pi*(( (i - 1)/2 - self.segment_memsize*index2))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 2: # SINC
-                                if (i - 1) <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int(self.maxCAD / element2[8] * np.sinc(2*(( (i - 1)/2 - self.segment_memsize*index2) - mid_point) / (element2[5]) )*\
-                                        sin(2*pi*( (i - 1)/2 - self.segment_memsize*index2)*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 3: # BLANK
-                                break
-                            elif element2[1] == 4: # WURST
-                                # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
-                                # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
-                                # WURST = at*sin(ph + phase_0)
-                                if (i - 1) <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * ( 1 - abs( sin( pi*( (  (i - 1)/2 - self.segment_memsize*index2) - mid_point ) / element2[4] ) ) ** element2[9] )*\
-                                        sin(2*pi*( (  (i - 1)/2 - self.segment_memsize*index2) *  element2[2][0] / self.sample_rate + 0.5 * (element2[2][1] - element2[2][0])*\
-                                        (  (i - 1)/2 - self.segment_memsize*index2)**2 / element2[4] / self.sample_rate ) + element2[3] ))
-                                else:
-                                    break
-                            elif element2[1] == 5: # SECH/TANH
-                                # at = Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n];
-                                # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
-                                # SECH/TANH = at*sin(ph + phase_0)
-                                freq_cen = ( element2[2][1] + element2[2][0] ) / 2
-                                if (i - 1) <= ( 2 * element2[4] + 2 * self.segment_memsize*index2 ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * (1 / np.cosh( element2[10] * element2[4] * 2 **(element2[9] - 1) * ( ( ( (i - 1)/2 - self.segment_memsize*index2) - mid_point ) / element2[4]  ) ** element2[9] ) ) * \
-                                        sin(2*pi*(element2[2][1] - element2[2][0]) / self.sample_rate / element2[10] * \
-                                        np.log( np.cosh( element2[10] * ( ( (i - 1)/2 - self.segment_memsize*index2) - mid_point ) ) ) / 2 / np.tanh( element2[10] * mid_point ) + element2[3] + \
-                                        2 * pi * (i - 1)/2 * freq_cen / self.sample_rate ))
-                                else:
-                                    break
+                    # take a segment: 2*self.segment_memsize*index2, 2*self.segment_memsize*(index2 + 1)
+                    # even indexes for CH0, odd indexes for CH1
+                    if element2[0] != 0 and element2[0] != 1:
+                        continue
+                    seg_start = self.segment_memsize*index2
+                    t = np.arange( min( element2[4], self.segment_memsize - 1 ) + 1 )
+                    wave = self.pulse_samples( element2, t, t + seg_start )
+                    if wave is not None:
+                        first = 2 * seg_start + int( element2[0] )
+                        buf[first:first + 2 * len(t):2] = wave
 
             return self.pvBuffer, self.pnBuffer
 
@@ -4013,180 +3880,105 @@ class Spectrum_M4I_6631_X8:
         if self.channel == 1 or self.channel == 2:
             # two bytes per sample; multiply by number of enabled channels
             self.buffer_size = len( np.zeros(2 * self.memsize * 1) )
-            #buf = np.zeros(self.memsize * 1, dtype = np.float64 )
 
             # define the buffer
             self.pnBuffer = c_void_p()
             self.qwBufferSize = uint64 (self.buffer_size)  # buffer size
             self.pvBuffer = pvAllocMemPageAligned (self.qwBufferSize.value)
             self.pnBuffer = cast (self.pvBuffer, ptr16)
+            buf = self.buffer_view( self.memsize )
 
             # pulses for different channel
             for element in pulses:
                 # individual pulses at each channel
                 for index2, element2 in enumerate( element ):
-                    # mid_point for GAUSS, SINC, and WURST
-                    mid_point = int( element2[4]/2 )
-
-                    for i in range (0, self.memsize, 1):
-                                                    #[      0,        1,               2,     3,                4,               5,     6,           7,               8,       9,     10]
-                        if element2[1] == 0: # SINE; [channel, function, frequency (MHz), phase, length (samples), sigma (samples), start, delta_start, amp_coefficient, n_wurst, b_sech]
-                            if i <= ( element2[4] ):
-                                #buf[i]
-                                self.pnBuffer[i] = int( self.maxCAD / element2[8] * sin(2*pi*(( i ))*element2[2] / self.sample_rate + element2[3]) )
-                            else:
-                                break
-                        elif element2[1] == 1: # GAUSS
-                            if i <= ( element2[4] ):
-                                self.pnBuffer[i] = int( self.maxCAD / element2[8] * exp(-((( i ) - mid_point)**2)*(1/(2*element2[5]**2)))*\
-                                    sin(2*pi*(( i ))*element2[2] / self.sample_rate + element2[3]) )
-                            else:
-                                break
-                        elif element2[1] == 2: # SINC
-                            if i <= ( element2[4] ):
-                                self.pnBuffer[i] = int( self.maxCAD / element2[8] * np.sinc(2*(( i ) - mid_point) / (element2[5]) )*\
-                                    sin(2*pi*( i )*element2[2] / self.sample_rate + element2[3]) )
-                            else:
-                                break
-                        elif element2[1] == 3: # BLANK
-                            break
-                        elif element2[1] == 4: # WURST
-                            # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
-                            # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
-                            # WURST = at*sin(ph + phase_0)
-                            if i <= ( element2[4] ):
-                                self.pnBuffer[i] = int( self.maxCAD / element2[8] * ( 1 - abs( sin( pi*( i - mid_point ) / element2[4] ) ) ** element2[9] )*\
-                                    sin(2*pi*( i * element2[2][0] / self.sample_rate + 0.5 * (element2[2][1] - element2[2][0])*\
-                                    i**2  / element2[4] / self.sample_rate ) + element2[3] ) )
-                            else:
-                                break
-                        elif element2[1] == 5: # SECH/TANH
-                            # at = Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n];
-                            # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
-                            # SECH/TANH = at*sin(ph + phase_0)
-                            freq_cen = ( element2[2][1] + element2[2][0] ) / 2
-                            if i <= ( element2[4] ):
-                                self.pnBuffer[i] = int( self.maxCAD / element2[8] * ( 1 / np.cosh( element2[10] * element2[4] * 2 **(element2[9] - 1) * ( ( i - mid_point ) / element2[4]  ) ** element2[9] ) ) * \
-                                    sin(2*pi*(element2[2][1] - element2[2][0]) / self.sample_rate / element2[10] * \
-                                    np.log( np.cosh( element2[10] * ( i - mid_point ) ) ) / 2 / np.tanh( element2[10] * mid_point ) + element2[3] + \
-                                    2 * pi * i * freq_cen / self.sample_rate ))
-                            else:
-                                break
+                    t = np.arange( min( element2[4], self.memsize - 1 ) + 1 )
+                    wave = self.pulse_samples( element2, t, t )
+                    if wave is not None:
+                        buf[:len(t)] = wave
 
             return self.pvBuffer, self.pnBuffer
 
         elif self.channel == 3:
             # two bytes per sample; multiply by number of enabled channels
             self.buffer_size = len( np.zeros(2 * self.memsize * 2) )
-            #buf = np.zeros(self.memsize * 2, dtype = np.float64 )
 
             # define the buffer
             self.pnBuffer = c_void_p()
             self.qwBufferSize = uint64 (self.buffer_size)  # buffer size
             self.pvBuffer = pvAllocMemPageAligned (self.qwBufferSize.value)
             self.pnBuffer = cast (self.pvBuffer, ptr16)
+            buf = self.buffer_view( 2 * self.memsize )
 
             # pulses for different channel
             for element in pulses:
                 # individual pulses at each channel
                 for index2, element2 in enumerate( element ):
-                    # mid_point for GAUSS, SINC, and WURST
-                    mid_point = int( element2[4]/2 )
+                    # even indexes for CH0, odd indexes for CH1
+                    if element2[0] != 0 and element2[0] != 1:
+                        continue
+                    t = np.arange( min( element2[4], self.memsize - 1 ) + 1 )
+                    wave = self.pulse_samples( element2, t, t )
+                    if wave is not None:
+                        first = int( element2[0] )
+                        buf[first:first + 2 * len(t):2] = wave
 
-                    
-                    if element2[0] == 0:
-                        # fill even indexes for CH0; step in the cycle is 2
-                        for i in range (0, 2 * self.memsize, 2):
-                                                        #[      0,        1,               2,     3,                4,               5,     6,           7,               8,       9,     10]
-                            if element2[1] == 0: # SINE; [channel, function, frequency (MHz), phase, length (samples), sigma (samples), start, delta_start, amp_coefficient, n_wurst, b_sech]
-                                if i <= ( 2 * element2[4] ):
-                                    # Sine Signal CH_0; i/2 in order to keep the frequency
-                                    # buf[i]
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * sin(2*pi*(( i/2 ))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 1: # GAUSS
-                                if i <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * exp(-((( i/2 ) - mid_point)**2)*(1/(2*element2[5]**2)))*\
-                                        sin(2*pi*(( i/2 ))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 2: # SINC
-                                if i <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * np.sinc(2*(( i/2 ) - mid_point) / (element2[5]) )*\
-                                        sin(2*pi*( i/2 )*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 3: # BLANK
-                                break
-                            elif element2[1] == 4: # WURST
-                                # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
-                                # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
-                                # WURST = at*sin(ph + phase_0)                            
-                                if i <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * ( 1 - abs( sin( pi*( i/2 - mid_point ) / element2[4] ) ) ** element2[9] )*\
-                                        sin(2*pi*( i/2 * element2[2][0] / self.sample_rate + 0.5 * (element2[2][1] - element2[2][0])*\
-                                        (i/2)**2  / element2[4] / self.sample_rate ) + element2[3] ) )
-                            elif element2[1] == 5: # SECH/TANH
-                                # at = Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n];
-                                # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
-                                # SECH/TANH = at*sin(ph + phase_0)
-                                freq_cen = ( element2[2][1] + element2[2][0] ) / 2
-                                if i <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * (1 / np.cosh( element2[10] * element2[4] * 2 **(element2[9] - 1) * ( ( i/2 - mid_point ) / element2[4]  ) ** element2[9] ) ) * \
-                                        sin(2*pi*(element2[2][1] - element2[2][0]) / self.sample_rate / element2[10] * \
-                                        np.log( np.cosh( element2[10] * ( i/2 - mid_point ) ) ) / 2 / np.tanh( element2[10] * mid_point ) + element2[3] + \
-                                        2 * pi * (i/2) * freq_cen / self.sample_rate ))
-                                else:
-                                    break
+            return self.pvBuffer, self.pnBuffer
 
-                    elif element2[0] == 1:
-                        # fill odd indexes for CH1; step in the cycle is 2
-                        for i in range (1 , 1 + 2 * self.memsize, 2):
-                                                        #[      0,        1,               2,     3,                4,               5,     6,           7,               8,       9,     10]
-                            if element2[1] == 0: # SINE; [channel, function, frequency (MHz), phase, length (samples), sigma (samples), start, delta_start, amp_coefficient, n_wurst, b_sech]
-                                if (i - 1) <= ( 2 * element2[4] ):
-                                    # Sine Signal CH_1; i/2 in order to keep the frequency
-                                    #buf[i]
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * sin(2*pi*(( (i - 1)/2 ))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 1: # GAUSS
-                                if (i - 1) <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * exp(-((( (i - 1)/2 ) - mid_point)**2)*(1/(2*element2[5]**2)))*\
-                                        sin(2*pi*(( (i - 1)/2 ))*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 2: # SINC
-                                if (i - 1) <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * np.sinc(2*(( (i - 1)/2 ) - mid_point) / (element2[5]) )*\
-                                        sin(2*pi*( (i - 1)/2 )*element2[2] / self.sample_rate + element2[3]) )
-                                else:
-                                    break
-                            elif element2[1] == 3: # BLANK
-                                break
-                            elif element2[1] == 4: # WURST
-                                # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
-                                # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
-                                # WURST = at*sin(ph + phase_0)                            
-                                if (i - 1) <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * ( 1 - abs( sin( pi*( (i - 1)/2 - mid_point ) / element2[4] ) ) ** element2[9] )*\
-                                        sin(2*pi*( (i - 1)/2 * element2[2][0] / self.sample_rate + 0.5 * (element2[2][1] - element2[2][0])*\
-                                        ((i - 1)/2)**2  / element2[4] / self.sample_rate ) + element2[3] ) )
-                            elif element2[1] == 5: # SECH/TANH
-                                # at = Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n];
-                                # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
-                                # SECH/TANH = at*sin(ph + phase_0)
-                                freq_cen = ( element2[2][1] + element2[2][0] ) / 2
-                                if (i - 1) <= ( 2 * element2[4] ):
-                                    self.pnBuffer[i] = int( self.maxCAD / element2[8] * (1 / np.cosh( element2[10] * element2[4] * 2 **(element2[9] - 1) * ( ( (i - 1)/2 - mid_point ) / element2[4]  ) ** element2[9] ) ) * \
-                                        sin(2*pi*(element2[2][1] - element2[2][0]) / self.sample_rate / element2[10] * \
-                                        np.log( np.cosh( element2[10] * ( (i - 1)/2 - mid_point ) ) ) / 2 / np.tanh( element2[10] * mid_point ) + element2[3] + \
-                                        2 * pi * (i - 1)/2 * freq_cen / self.sample_rate ))
-                                else:
-                                    break
+    def buffer_view(self, samples):
+        """
+        Zero-copy int16 numpy view of the first `samples` samples of the
+        page-aligned DMA buffer self.pvBuffer
+        """
+        return np.frombuffer(self.pvBuffer, dtype = np.int16, count = int(samples))
 
-            return self.pvBuffer, self.pnBuffer
+    def pulse_samples(self, element, t, t_abs):
+        """
+        Vectorized AWG pulse synthesis for 'Single', 'Single Joined' and 'Multi' modes.
+        element is a row of convertion_to_numpy():
+        [channel, function, frequency (MHz), phase, length (samples), sigma (samples), start, delta_start, amp_coefficient, n_wurst, b_sech]
+        t is the sample index relative to the pulse start;
+        t_abs is the sample index of the channel in the whole buffer (carrier of SECH/TANH).
+        Return int16 samples, or None for BLANK and TEST pulses that are not filled in these modes
+        """
+        func = element[1]
+        freq = element[2]
+        phase = element[3]
+        length = element[4]
+        sigma = element[5]
+        mid_point = int( length/2 )
+        amp_scale = self.maxCAD / element[8]
+
+        if func == 0: # SINE
+            y = amp_scale * np.sin(2*np.pi*t*freq / self.sample_rate + phase)
+        elif func == 1: # GAUSS
+            y = amp_scale * np.exp(-((t - mid_point)**2)*(1/(2*sigma**2))) * \
+                np.sin(2*np.pi*t*freq / self.sample_rate + phase)
+        elif func == 2: # SINC
+            y = amp_scale * np.sinc(2*(t - mid_point) / sigma) * \
+                np.sin(2*np.pi*t*freq / self.sample_rate + phase)
+        elif func == 4: # WURST
+            # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
+            # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
+            # WURST = at*sin(ph + phase_0)
+            y = amp_scale * ( 1 - np.abs( np.sin( np.pi*( t - mid_point ) / length ) ) ** element[9] ) * \
+                np.sin(2*np.pi*( t * freq[0] / self.sample_rate + 0.5 * (freq[1] - freq[0]) * \
+                t**2 / length / self.sample_rate ) + phase)
+        elif func == 5: # SECH/TANH
+            # at = Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n];
+            # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
+            # SECH/TANH = at*sin(ph + phase_0)
+            b = element[10]
+            freq_cen = ( freq[1] + freq[0] ) / 2
+            y = amp_scale * ( 1 / np.cosh( b * length * 2 **(element[9] - 1) * ( ( t - mid_point ) / length ) ** element[9] ) ) * \
+                np.sin(2*np.pi*(freq[1] - freq[0]) / self.sample_rate / b * \
+                np.log( np.cosh( b * ( t - mid_point ) ) ) / 2 / np.tanh( b * mid_point ) + phase + \
+                2 * np.pi * t_abs * freq_cen / self.sample_rate)
+        else:
+            return None
+
+        # truncation towards zero and int16 wraparound, as int() stored into the c_short buffer
+        return y.astype(np.int64).astype(np.int16)
 
     def closest_power_of_two(self, x):
         """
@@ -4283,154 +4075,23 @@ class Spectrum_M4I_6631_X8:
             self.pvBuffer = pvAllocMemPageAligned (self.qwBufferSize.value)
             self.pnBuffer = cast (self.pvBuffer, ptr16)
 
+            buf = self.buffer_view( self.memsize )
+
             # run over defined pulses inside a sequence point
             for index, element in enumerate(arguments_array[0]):
-                # for DEER pulse with random phase
-                #rnd_phase = 2*pi*random.random()
-
-                if element == 0: # 'SINE'
-                    # always zero phase in Sine: i
-                    # one phase in Sine: i - pulse_start_smp[index]
-
-                    for i in range(pulse_start_smp[index], self.memsize):
-
-                        if i < (pulse_start_smp[index] ):
-                            pass
-                        elif ( i >= ( pulse_start_smp[index] ) and \
-                               i <= (pulse_start_smp[index] + pulse_length_smp[index] ) ):
-                            
-                            if pulse_phase_np[index] != 1000:
-                                # ( i - pulse_start_smp[index] ) for always zero phase
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * sin(2*pi*(( i - pulse_start_smp[index] ))*pulse_frequency[index] / self.sample_rate + pulse_phase_np[index] ) )
-
-                            else:
-                                # for DEER pulse with random phase
-                                rnd_phase = 2*pi*random.random()
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * sin(2*pi*(( i - pulse_start_smp[index] ))*pulse_frequency[index] / self.sample_rate + \
-                                                    pulse_phase_np[index] ) + rnd_phase )
-                        else:
-                            break
-
-                elif element == 1: # GAUSS
-                    # mid_point for GAUSS and SINC and WURST and SECH/TANH
-                    # always zero phase in Sine: i
-                    # one phase in Sine: i - pulse_start_smp[index]
-
-                    mid_point = int( pulse_start_smp[index] + ( pulse_length_smp[index] )/2 )
-
-                    for i in range(pulse_start_smp[index], self.memsize):
-                        if i < (pulse_start_smp[index] ):
-                            pass
-                        elif ( i >= ( pulse_start_smp[index] ) and \
-                               i <= (pulse_start_smp[index] + pulse_length_smp[index] ) ):
-                            
-                            if pulse_phase_np[index] != 1000:
-                                #self.full_buffer[point, i] 
-                                # ( i - pulse_start_smp[index] ) in Sine for always zero phase
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index]* exp(-((( i ) - mid_point)**2)*(1/(2*pulse_sigma_smp[index]**2)))*\
-                                                        sin(2*pi*(( i - pulse_start_smp[index] ))*pulse_frequency[index] / self.sample_rate + pulse_phase_np[index] ) )
-
-                            else:
-                                # for DEER pulse with random phase
-                                rnd_phase = 2*pi*random.random()
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * exp(-((( i ) - mid_point)**2)*(1/(2*pulse_sigma_smp[index]**2)))*\
-                                                        sin(2*pi*(( i - pulse_start_smp[index] ))*pulse_frequency[index] / self.sample_rate + pulse_phase_np[index] +\
-                                                        rnd_phase) )
-                        else:
-                            break
-
-                elif element == 2: # 'SINC'
-                    # mid_point for GAUSS and SINC and WURST and SECH/TANH
-                    # always zero phase in Sine: i
-                    # one phase in Sine: i - pulse_start_smp[index]
-
-                    mid_point = int( pulse_start_smp[index] + ( pulse_length_smp[index] )/2 )
-
-                    for i in range(pulse_start_smp[index], self.memsize):
-                        if i < (pulse_start_smp[index]):
-                            pass
-                        elif ( i >= ( pulse_start_smp[index] ) and \
-                               i <= (pulse_start_smp[index] + pulse_length_smp[index] ) ):
-                            
-                            if pulse_phase_np[index] != 1000:
-                                self.full_buffer[point, i] 
-                                # ( i - pulse_start_smp[index] ) in Sine for always zero phase
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * np.sinc(2*(( i ) - mid_point) / (pulse_sigma_smp[index]) )*\
-                                                           sin(2*pi*(( i - pulse_start_smp[index] ))*pulse_frequency[index] / self.sample_rate + pulse_phase_np[index] ) )
-
-                            else:
-                                # for DEER pulse with random phase
-                                rnd_phase = 2*pi*random.random()
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * np.sinc(2*(( i ) - mid_point) / (pulse_sigma_smp[index]) )*\
-                                                        sin(2*pi*(( i - pulse_start_smp[index] ))*pulse_frequency[index] / self.sample_rate + pulse_phase_np[index] +\
-                                                        rnd_phase) )
-                        else:
-                            break
-
-                elif element == 3: # BLANK
-                    pass
-
-                elif element == 4: # 'WURST'
-                    # mid_point for GAUSS and SINC and WURST and SECH/TANH
-                    # at = A*( 1 - abs( sin(pi*(t-tp/2)/tp) )^n )
-                    # ph = 2*pi*(Fstr*t + 0.5*( Ffin - Fstr )*t^2/tp )
-                    # WURST = at*sin(ph + phase_0)
-                    # ( i - pulse_start_smp[index] ) for 
-                    # always zero phase in Sine: i
-                    # one phase in Sine: i - pulse_start_smp[index]
-
-                    mid_point = int( pulse_start_smp[index] + ( pulse_length_smp[index] )/2 )
-
-                    for i in range(pulse_start_smp[index], self.memsize):
-                        if i < (pulse_start_smp[index]):
-                            pass
-                        elif ( i >= ( pulse_start_smp[index] ) and \
-                               i <= (pulse_start_smp[index] + pulse_length_smp[index] ) ):
-                            
-                            if pulse_phase_np[index] != 1000:
-                                # ( i - pulse_start_smp[index] ) in Sine for always zero phase
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * ( 1 - abs( sin( pi*( i - mid_point ) / pulse_length_smp[index] ) ) ** pulse_n_wurst[index] )*\
-                                                        sin(2*pi*( ( i - pulse_start_smp[index] ) * pulse_frequency[index][0] / self.sample_rate + 0.5 * \
-                                                        (pulse_frequency[index][1] - pulse_frequency[index][0]) * ( i - pulse_start_smp[index] )**2 \
-                                                        / pulse_length_smp[index] / self.sample_rate ) + pulse_phase_np[index] ))
-
-                            else:
-                                # for DEER pulse with random phase
-                                rnd_phase = 2*pi*random.random()
-                                self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * ( 1 - abs( sin( pi*( i - mid_point ) / pulse_length_smp[index] ) ) ** pulse_n_wurst[index] )*\
-                                                        sin(2*pi*( ( i - pulse_start_smp[index] ) * pulse_frequency[index][0] / self.sample_rate + 0.5 * \
-                                                        (pulse_frequency[index][1] - pulse_frequency[index][0]) * ( i - pulse_start_smp[index] )**2 \
-                                                        / pulse_length_smp[index] / self.sample_rate ) + pulse_phase_np[index] + rnd_phase ))
-
-                        else:
-                            break
-
-                elif element == 5: # 'SECH/TANH'
-                    # mid_point for GAUSS and SINC and WURST and SECH/TANH
-                    # at = A*Sech[b*tp*2^(n - 1) ((t - tp/2)/tp)^n]
-                    # ph = 2*Pi*bw/b*Log[Cosh[b*(t - tp/2)]]/2/Tanh[b*tp/2]
-                    # SECH = at*sin(ph + phase_0)
-                    # ( i - pulse_start_smp[index] ) for 
-                    # always zero phase in Sine: i
-                    # one phase in Sine: i - pulse_start_smp[index]
-
-                    mid_point = int( pulse_start_smp[index] + ( pulse_length_smp[index] )/2 )
-                    freq_cen = ( pulse_frequency[index][1] + pulse_frequency[index][0] ) / 2
-
-                    for i in range(pulse_start_smp[index], self.memsize):
-                        if i < (pulse_start_smp[index]):
-                            pass
-                        elif ( i >= ( pulse_start_smp[index] ) and \
-                               i <= (pulse_start_smp[index] + pulse_length_smp[index] ) ):
-                            
-                            # ( i - pulse_start_smp[index] ) in Sine for always zero phase
-                            # normalisation: relative mid-point (length/2), as in Insys_FPGA
-                            self.pnBuffer[i] = int( self.maxCAD / pulse_amp[index] * ( 1 / np.cosh( pulse_b_sech[index] * pulse_length_smp[index] * 2 ** (pulse_n_wurst[index] - 1)  * \
-                                ( ( i - mid_point ) / pulse_length_smp[index] )** pulse_n_wurst[index] ) ) *\
-                                sin(2*pi*(pulse_frequency[index][1] - pulse_frequency[index][0]) / self.sample_rate / pulse_b_sech[index] * np.log( np.cosh( pulse_b_sech[index] \
-                                    * ( i - mid_point )  ) ) / 2 / np.tanh( pulse_b_sech[index] * int( pulse_length_smp[index] / 2 ) ) + pulse_phase_np[index] + 2 * pi * i * freq_cen / self.sample_rate ))
-                        else:
-                            break
+                start = pulse_start_smp[index]
+                t = np.arange( max( min( pulse_length_smp[index], self.memsize - 1 - start ) + 1, 0 ) )
+                phase = pulse_phase_np[index]
+                if phase == 1000 and element != 5:
+                    # for DEER pulse with random phase
+                    phase = phase + 2*pi*random.random()
+
+                # [channel, function, frequency, phase, length, sigma, start, delta_start, amp, n_wurst, b_sech]
+                row = ( 0, element, pulse_frequency[index], phase, pulse_length_smp[index], pulse_sigma_smp[index], \
+                        start, pulse_delta_start_smp[index], pulse_amp[index], pulse_n_wurst[index], pulse_b_sech[index] )
+                wave = self.pulse_samples( row, t, t + start )
+                if wave is not None:
+                    buf[start:start + len(t)] = wave
 
             return self.pvBuffer, self.pnBuffer
 
@@ -20,6 +20,8 @@ from multiprocessing import Pipe, Process
 
 import numpy as np
 
+import atomize.general_modules.binary_data as binary
+import atomize.general_modules.csv_reader as csv_reader
 from atomize.control_center.awg_phasing_insys import Worker
 from atomize.epr_auto.engine.snapshot import CORRECTION_ATTRS, SWEEP_TYPES
 
@@ -366,8 +368,12 @@ def acquire_trace(worker_args, n_sweeps=1, script_test=False,
 
 def load_1d(path):
     """Load a worker 1-D save (iq_cor == 1 format: axis, I, Q columns,
-    '# '-commented header lines). Returns (axis, i, q) float arrays."""
-    arr = np.genfromtxt(path, dtype=float, delimiter=',', encoding='latin1')
+    '# '-commented header lines; or the same columns in a binary_data
+    container). Returns (axis, i, q) float arrays."""
+    if binary.is_binary(path):
+        arr = np.asarray(binary.read(path)['data'], dtype=float)
+    else:
+        arr = csv_reader.load(path)
     if arr.ndim != 2 or arr.shape[1] < 3:
         raise EngineError(f'{path}: expected a 3-column 1-D save, '
                           f'got shape {getattr(arr, "shape", None)}')
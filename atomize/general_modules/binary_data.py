@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chunked binary container for Atomize experiment data (numpy-only, no Qt).
+
+The CSV files written by `Saver_Opener.save_data` spend most of their save /
+load time formatting and parsing '%.6e' text and are 3-4x larger than the
+numbers they hold. This container keeps the same information in binary and is
+picked by the file extension (`EXT`, '.atd'); every loader recognizes it by
+its magic bytes, whatever the name.
+
+Layout (little-endian):
+
+    MAGIC (8 bytes) | uint32 n | JSON header (n bytes, space padded)
+    chunk: b'CHNK' | uint32 ndim | ndim x uint64 shape | raw C-order data
+    chunk: ...
+
+The JSON header carries the '# ' header text of the CSV (`header`), optional
+per-axis metadata (`axes`: [{'name', 'unit', 'start', 'step'}, ...]), the
+element `dtype`, the array `ndim` and whether the leading axis is a stack of
+frames (`frames`). A 3D save is stored as the frames the CSV path would write
+to name.csv, name_1.csv, ... (each frame transposed), in one file.
+
+Appending (mode 'a') writes another chunk; `read` joins the chunks along the
+row axis (axis 0 for 1D/2D data, axis 1 for a frame stack). A chunk cut short
+by a crash is dropped on reading, the ones before it stay readable.
+
+    binary_data.write(path, data, header='', axes=None, mode='w')
+    res = binary_data.read(path)    # {'data', 'header', 'axes', 'frames', ...}
+    binary_data.to_csv(path)        # CSV file(s) next to it, as save_data writes
+
+Converter: ``python -m atomize.general_modules.binary_data file.atd [out.csv]``.
+"""
+
+import os
+import sys
+import json
+import struct
+import numpy as np
+
+EXT = '.atd'
+MAGIC = b'\x93ATOMIZE'
+VERSION = 1
+
+_CHUNK = b'CHNK'
+# the data of the first chunk starts on this boundary
+_ALIGN = 64
+
+
+def is_binary(path):
+    """True when `path` is an existing file in this container format."""
+    try:
+        with open(path, 'rb') as fh:
+            return fh.read(len(MAGIC)) == MAGIC
+    except (OSError, TypeError):
+        return False
+
+
+def wants_binary(path):
+    """True when a save to `path` should use this container (by extension)."""
+    return str(path).lower().endswith(EXT)
+
+
+def _store_dtype(arr):
+    if arr.dtype.kind in 'fc':
+        return arr.dtype.newbyteorder('<')
+    return np.dtype('<f8')
+
+
+def _layout(data):
+    """The array as stored: a 3D input becomes the stack of transposed frames."""
+    data = np.asarray(data)
+    if data.ndim == 3:
+        return np.transpose(data, (0, 2, 1)), True
+    if data.ndim in (1, 2):
+        return data, False
+    raise ValueError(f'Cannot store a {data.ndim}D array')
+
+
+def _read_meta(fh):
+    if fh.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f'{getattr(fh, "name", "file")}: not an Atomize binary file')
+    (n,) = struct.unpack('<I', fh.read(4))
+    meta = json.loads(fh.read(n).decode('utf-8'))
+    if meta.get('version', 0) > VERSION:
+        raise ValueError(f'Unsupported binary file version {meta["version"]}')
+    return meta
+
+
+def _write_meta(fh, meta):
+    raw = json.dumps(meta).encode('utf-8')
+    pad = -(len(MAGIC) + 4 + len(raw)) % _ALIGN
+    raw += b' '*pad
+    fh.write(MAGIC + struct.pack('<I', len(raw)) + raw)
+
+
+def _write_chunk(fh, arr):
+    fh.write(_CHUNK + struct.pack('<I', arr.ndim) + struct.pack(f'<{arr.ndim}Q', *arr.shape))
+    fh.write(np.ascontiguousarray(arr).tobytes())
+
+
+def _chunk_shape(fh):
+    """Shape of the chunk at the position of `fh`, or None (no chunk)."""
+    tag = fh.read(8)
+    if len(tag) < 8 or tag[:4] != _CHUNK:
+        return None
+    (ndim,) = struct.unpack('<I', tag[4:])
+    raw = fh.read(8*ndim)
+    if len(raw) < 8*ndim:
+        return None
+    return struct.unpack(f'<{ndim}Q', raw)
+
+
+def write(path, data, header = '', axes = None, mode = 'w'):
+    """Write `data` (1D, 2D or 3D) to `path`. mode 'a' appends a chunk to an
+    existing container (any other file, e.g. the empty one made by
+    create_file_dialog, is started afresh); its shape must match apart from
+    the row axis and the header of the file is kept."""
+    arr, frames = _layout(data)
+    if mode == 'a' and is_binary(path):
+        with open(path, 'rb') as fh:
+            meta = _read_meta(fh)
+            first = _chunk_shape(fh)
+        if meta['ndim'] != arr.ndim or meta['frames'] != frames:
+            raise ValueError(f'{path}: cannot append a {np.ndim(data)}D array '
+                             f'to {meta["ndim"]}D data')
+        row_axis = 1 if frames else 0
+        if first is not None and any(a != b for k, (a, b) in enumerate(zip(first, arr.shape))
+                                     if k != row_axis):
+            raise ValueError(f'{path}: cannot append shape {arr.shape} to chunks '
+                             f'of shape {first}')
+        with open(path, 'ab') as fh:
+            _write_chunk(fh, arr.astype(meta['dtype'], copy=False))
+        return
+    dtype = _store_dtype(arr)
+    meta = {'format': 'atomize-chunked', 'version': VERSION,
+            'dtype': dtype.str, 'ndim': arr.ndim, 'frames': frames,
+            'header': str(header), 'axes': list(axes or [])}
+    with open(path, 'wb') as fh:
+        _write_meta(fh, meta)
+        _write_chunk(fh, arr.astype(dtype, copy=False))
+
+
+def iter_chunks(path):
+    """Yield the stored chunks of `path` one by one (as written)."""
+    with open(path, 'rb') as fh:
+        meta = _read_meta(fh)
+        dtype = np.dtype(meta['dtype'])
+        size = os.fstat(fh.fileno()).st_size
+        while True:
+            shape = _chunk_shape(fh)
+            if shape is None:
+                return
+            count = int(np.prod(shape))
+            if size - fh.tell() < count*dtype.itemsize:
+                return                               # torn tail of a crashed append
+            yield np.fromfile(fh, dtype=dtype, count=count).reshape(shape)
+
+
+def read(path):
+    """Read a container. Returns a dict:
+
+        {'data', 'header', 'header_lines', 'axes', 'frames', 'dtype', 'chunks'}
+
+    `data` holds every chunk joined along the row axis; `header_lines` is the
+    header text split into lines, as header_view.read_header gives them for a
+    CSV."""
+    with open(path, 'rb') as fh:
+        meta = _read_meta(fh)
+    chunks = list(iter_chunks(path))
+    row_axis = 1 if meta['frames'] else 0
+    if not chunks:
+        data = np.empty((0,)*meta['ndim'], dtype=meta['dtype'])
+    elif len(chunks) == 1:
+        data = chunks[0]
+    else:
+        data = np.concatenate(chunks, axis=row_axis)
+    header = meta.get('header', '')
+    return {'data': data, 'header': header,
+            'header_lines': header.split('\n') if header else [],
+            'axes': meta.get('axes', []), 'frames': meta['frames'],
+            'dtype': meta['dtype'], 'chunks': len(chunks)}
+
+
+def read_header(path):
+    """The header text of a container as a list of lines (no data is read)."""
+    with open(path, 'rb') as fh:
+        header = _read_meta(fh).get('header', '')
+    return header.split('\n') if header else []
+
+
+def csv_header(path):
+    """The header of a container as the '# ' comment lines of the CSV."""
+    return [f'# {line}\n' for line in read_header(path)]
+
+
+def to_csv(path, csv_path = None):
+    """Convert a container to the CSV file(s) save_data would have written
+    (name.csv, name_1.csv, ... for a frame stack). Returns the written paths."""
+    res = read(path)
+    if csv_path is None:
+        csv_path = os.path.splitext(path)[0] + '.csv'
+    data = res['data']
+    frames = data if res['frames'] else [data]
+    base = csv_path.rsplit('.', 1)[0]
+    written = []
+    for i, frame in enumerate(frames):
+        name = csv_path if i == 0 else f'{base}_{i}.csv'
+        np.savetxt(name, frame, fmt='%.6e', delimiter=',', newline='\n',
+                   header=res['header'], footer='', comments='# ')
+        written.append(name)
+    return written
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print('usage: python -m atomize.general_modules.binary_data file.atd [out.csv]')
+        return 2
+    for name in to_csv(*sys.argv[1:]):
+        print(name)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
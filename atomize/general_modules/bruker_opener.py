@@ -24,6 +24,15 @@ shaped array (complex when applicable): (nx,) for 1D, (ny, nx) for 2D.
 
 The reader is hardware-agnostic and headless (no Qt), so it is reusable for
 any Bruker trace — T1/T2 relaxation, CW spectra, ESEEM, DEER, etc.
+
+Lazy mode (`open(path, lazy=True)`) maps the binary file instead of reading
+it: `data` is a read-only `np.memmap` in the file's own byte order, so a
+dataset of several GB opens at once and only the rows that are indexed are
+read from the disk. Complex BES3T data are mapped through a structured
+('re', 'im') dtype; for float formats this is viewed as a complex array
+without a copy, integer formats stay structured. `materialize(data, index)`
+and `split_iq(data, index)` turn (a slice of) either form into native
+float64 / complex128 arrays in one pass. 1D `channels` are always in memory.
 """
 
 import os
@@ -33,20 +42,53 @@ import numpy as np
 _BES3T_FMT = {'D': 'f8', 'F': 'f4', 'I': 'i4', 'S': 'i2', 'C': 'i1', 'B': 'i1'}
 
 
+def _map(path, dtype, count, shape):
+    """Read-only memmap of the first `count` items of `path`, reshaped."""
+    size = os.path.getsize(path)//dtype.itemsize
+    if size < count:
+        raise ValueError(f'{os.path.basename(path)} holds {size} points, '
+                         f'the descriptor needs {count}')
+    return np.memmap(path, dtype=dtype, mode='r', shape=(count,)).reshape(shape)
+
+
+def materialize(data, index=Ellipsis):
+    """`data[index]` as a native float64 (real) or complex128 array. Accepts
+    the eager arrays as well as the lazy memmaps, structured ones included."""
+    part = data[index]
+    if part.dtype.names:                         # ('re', 'im') integer pairs
+        out = np.empty(part.shape, dtype=np.complex128)
+        out.real = part['re']
+        out.imag = part['im']
+        return out
+    return np.array(part, dtype=np.complex128 if part.dtype.kind == 'c' else np.float64)
+
+
+def split_iq(data, index=Ellipsis):
+    """(I, Q) float64 arrays of `data[index]`, each filled straight from the
+    (possibly mapped) data; Q is zeros for real data."""
+    part = data[index]
+    if part.dtype.names:
+        return part['re'].astype(np.float64), part['im'].astype(np.float64)
+    if part.dtype.kind == 'c':
+        return part.real.astype(np.float64), part.imag.astype(np.float64)
+    return part.astype(np.float64), np.zeros(part.shape)
+
+
 class Bruker_Opener:
 
     # ------------------------------------------------------------------ public
-    def open(self, path):
-        """Open a Bruker file (BES3T or ESP/WinEPR); dispatch on the extension."""
+    def open(self, path, lazy=False):
+        """Open a Bruker file (BES3T or ESP/WinEPR); dispatch on the extension.
+        lazy=True maps the data instead of reading it (see the module doc)."""
         ext = os.path.splitext(path)[1].lower()
         if ext in ('.dsc', '.dta', '.xgf', '.ygf', '.zgf'):
-            return self.read_bes3t(path)
+            return self.read_bes3t(path, lazy=lazy)
         if ext in ('.par', '.spc'):
-            return self.read_winepr(path)
+            return self.read_winepr(path, lazy=lazy)
         raise ValueError(f'Not a recognized Bruker file: {path}')
 
     # ------------------------------------------------------------------ BES3T
-    def read_bes3t(self, path):
+    def read_bes3t(self, path, lazy=False):
         dsc, dta = self._pair(path, '.dsc', '.dta')
         P = self._parse_dsc(self._read_text(dsc))
 
@@ -58,14 +100,24 @@ class Bruker_Opener:
         ypts = int(float(P.get('YPTS', 1)))
         ndim = 2 if ypts > 1 else 1
 
-        flat = np.fromfile(dta, dtype=np.dtype(endian + rfmt)).astype(np.float64)
         n = xpts*ypts
-        if is_cplx:
-            flat = flat[:2*n]
-            data = flat[0::2] + 1j*flat[1::2]
+        shape = (ypts, xpts) if ndim == 2 else (xpts,)
+        if lazy:
+            if is_cplx:
+                pair = np.dtype([('re', endian + rfmt), ('im', endian + rfmt)])
+                data = _map(dta, pair, n, shape)
+                if rfmt[0] == 'f':                   # zero-copy complex view
+                    data = data.view(np.dtype(endian + 'c' + str(2*int(rfmt[1]))))
+            else:
+                data = _map(dta, np.dtype(endian + rfmt), n, shape)
         else:
-            data = flat[:n]
-        data = data.reshape(ypts, xpts) if ndim == 2 else data.reshape(xpts)
+            flat = np.fromfile(dta, dtype=np.dtype(endian + rfmt)).astype(np.float64)
+            if is_cplx:
+                flat = flat[:2*n]
+                data = flat[0::2] + 1j*flat[1::2]
+            else:
+                data = flat[:n]
+            data = data.reshape(shape)
 
         x = self._bes3t_axis(P, 'X', xpts, endian,
                              self._companion(dta, '.xgf'))
@@ -99,7 +151,7 @@ class Bruker_Opener:
         return mn + np.arange(npts)*wid/(npts - 1)
 
     # ------------------------------------------------------------ ESP / WinEPR
-    def read_winepr(self, path):
+    def read_winepr(self, path, lazy=False):
         par, spc = self._pair(path, '.par', '.spc')
         P = self._parse_par(self._read_text(par))
 
@@ -110,10 +162,14 @@ class Bruker_Opener:
         ny = int(float(P.get('SSY', 1)))
         ndim = 2 if ny > 1 else 1
 
-        flat = np.fromfile(spc, dtype=dtype).astype(np.float64)
         if nx <= 0:
-            nx = flat.size // max(ny, 1)
-        data = (flat[:nx*ny].reshape(ny, nx) if ndim == 2 else flat[:nx])
+            nx = os.path.getsize(spc)//dtype.itemsize//max(ny, 1)
+        shape = (ny, nx) if ndim == 2 else (nx,)
+        if lazy:
+            data = _map(spc, dtype, nx*ny, shape)
+        else:
+            flat = np.fromfile(spc, dtype=dtype).astype(np.float64)
+            data = flat[:nx*ny].reshape(shape)
 
         x, x_name, x_unit = self._winepr_axis(P, nx)
         channels = self._channels(data, False, 'intensity', ndim)
@@ -140,8 +196,9 @@ class Bruker_Opener:
         if ndim != 1:
             return [(ord_name, data)]            # 2D handled by the caller
         if is_cplx:
-            return [('real', np.real(data)), ('imag', np.imag(data))]
-        return [(ord_name, np.asarray(data, dtype=float))]
+            re, im = split_iq(data)
+            return [('real', re), ('imag', im)]
+        return [(ord_name, split_iq(data)[0])]
 
     @staticmethod
     def _parse_dsc(text):
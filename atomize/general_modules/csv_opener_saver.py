@@ -9,6 +9,9 @@ from PyQt6.QtWidgets import QFileDialog, QDialog, QApplication, QSizeGrip, QLine
 from PyQt6 import QtCore
 from PyQt6.QtCore import QTimer
 import atomize.main.local_config as lconf
+import atomize.general_modules.binary_data as binary
+import atomize.general_modules.csv_reader as csv_reader
+from atomize.general_modules.scan_writer import ScanWriter
 
 class Saver_Opener():
     def __init__(self):
@@ -139,10 +142,15 @@ class Saver_Opener():
                 pass
             os.remove( filename )
 
-    def save_data(self, filename, data, header = '', mode = 'w'):
+    def save_data(self, filename, data, header = '', mode = 'w', axes = None):
+        # a name ending in binary.EXT ('.atd') selects the chunked binary container;
+        # axes ([{'name', 'unit', 'start', 'step'}, ...]) is only stored there
         if self.test_flag != 'test':
             if (filename != 'None') and (filename != ''):
-                if len( data.shape ) == 2:
+                if binary.wants_binary(filename):
+                    binary.write(filename, data, header = header, axes = axes, mode = mode)
+
+                elif len( data.shape ) == 2:
                     with open(filename, mode) as file_for_save:
                         np.savetxt(
                             file_for_save, 
@@ -181,15 +189,9 @@ class Saver_Opener():
     def open_1d(self, file_path, header = 0):
         if self.test_flag != 'test':
 
-            header_array = []
-            file_to_read = open(file_path, 'r', errors = 'ignore')
-            for i, line in enumerate(file_to_read):
-                if i is header: break
-                temp = line.split(":")
-                header_array.append(temp)
-            file_to_read.close()
+            header_array = self._header_array(file_path, header)
 
-            temp = np.genfromtxt(file_path, dtype = float, delimiter = ',', encoding = 'latin1')
+            temp = self._read_array(file_path)
             data = np.transpose(temp)
             return header_array, data
 
@@ -199,15 +201,9 @@ class Saver_Opener():
     def open_2d(self, file_path, header = 0):
         if self.test_flag != 'test':
 
-            header_array = []
-            file_to_read = open(file_path, 'r', errors = 'ignore')
-            for i, line in enumerate(file_to_read):
-                if i is header: break
-                temp=line.split(":")
-                header_array.append(temp)
-            file_to_read.close()
+            header_array = self._header_array(file_path, header)
 
-            temp = np.genfromtxt(file_path, dtype = float, delimiter = ',', encoding = 'latin1')
+            temp = self._read_array(file_path)
             data = temp
             return header_array, data
 
@@ -217,21 +213,61 @@ class Saver_Opener():
     def open_2d_appended(self, file_path, header = 0, chunk_size = 1):
         if self.test_flag != 'test':
 
-            header_array = []
-            file_to_read = open(file_path, 'r', errors = 'ignore')
-            for i, line in enumerate(file_to_read):
-                if i is header: break
-                temp=line.split(":")
-                header_array.append(temp)
-            file_to_read.close()
-
-            temp = np.genfromtxt(file_path, dtype = float, delimiter = ',', encoding = 'latin1')
-            data = np.array_split(temp, chunk_size)
+            header_array, parts = self.iter_2d_appended(file_path, header = header, chunk_size = chunk_size)
+            data = list(parts)
             return header_array, data
 
         elif self.test_flag == 'test':
             return self.test_header_array, self.test_data_2d
 
+    def iter_2d_appended(self, file_path, header = 0, chunk_size = 1):
+        # as open_2d_appended, but the chunks are read from the file one by one
+        if self.test_flag != 'test':
+
+            header_array = self._header_array(file_path, header)
+
+            if binary.is_binary(file_path):
+                parts = iter( np.array_split(binary.read(file_path)['data'], chunk_size) )
+            else:
+                parts = csv_reader.iter_parts(file_path, chunk_size)
+            return header_array, parts
+
+        elif self.test_flag == 'test':
+            return self.test_header_array, iter(self.test_data_2d)
+
+    def _header_array(self, file_path, header):
+        # a binary file gives the '# ' lines its CSV export would start with
+        if binary.is_binary(file_path):
+            return [line.split(":") for line in binary.csv_header(file_path)[:header]]
+
+        header_array = []
+        file_to_read = open(file_path, 'r', errors = 'ignore')
+        for i, line in enumerate(file_to_read):
+            if i is header: break
+            temp = line.split(":")
+            header_array.append(temp)
+        file_to_read.close()
+        return header_array
+
+    def _read_array(self, file_path):
+        if binary.is_binary(file_path):
+            return binary.read(file_path)['data']
+        return csv_reader.load(file_path)
+
+    def create_scan_writer(self, name, header = '', axes = None):
+        # crash-safe per-scan journal of a running experiment in the autosave
+        # directory (scan_writer); inert in test runs. The control-center
+        # workers flag a dry run with general.test_flag only (sys.argv unset)
+        general = sys.modules.get('atomize.general_modules.general_functions')
+        if self.test_flag != 'test' and getattr(general, 'test_flag', None) != 'test':
+            return ScanWriter(lconf.load_autosave(), name, header = header, axes = axes)
+        else:
+            return ScanWriter(None, name)
+
+    def convert_to_csv(self, file_path, csv_path = None):
+        # CSV file(s) of a binary save, as save_data would have written them
+        return binary.to_csv(file_path, csv_path)
+
     def FileDialog(self, directory = '', mode = 'Open', fmt = '', name_filters = None,
                    multiple = False):
 
@@ -468,6 +504,16 @@ class Saver_Opener():
         # set format: an explicit filter list wins, else the single-suffix filter
         if name_filters:
             self.dialog.setNameFilters(list(name_filters))
+        elif fmt == 'csv':
+            # CSV or the chunked binary container (binary_data), picked by the suffix
+            bin_fmt = binary.EXT.lstrip('.')
+            self.dialog.setDefaultSuffix(fmt)
+            if mode == 'Open':
+                self.dialog.setNameFilters([f'{fmt} (*.{fmt} *.{bin_fmt})'])
+            else:
+                self.dialog.setNameFilters([f'{fmt} (*.{fmt})', f'binary (*.{bin_fmt})'])
+                self.dialog.filterSelected.connect(
+                    lambda name: self.dialog.setDefaultSuffix(bin_fmt if bin_fmt in name else fmt))
         elif fmt != '':
             self.dialog.setDefaultSuffix(fmt)
             self.dialog.setNameFilters([f'{fmt} (*.{fmt})'])
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fast reader for the CSV files Atomize writes (numpy-only, no Qt).
+
+`Saver_Opener.save_data` writes a block of '# ' comment lines followed by
+comma-separated '%.6e' values. `np.genfromtxt` parses such a file token by
+token in Python, which takes seconds for 10^6 values. This reader walks the
+'# ' header once and hands the numeric block to the C parser of `np.loadtxt`
+with a fixed float dtype. That is about 5x faster, and the values and the
+shape are the same as genfromtxt gives (a single row or column comes back 1D).
+Files the C parser refuses, such as empty fields from the trailing comma of a
+pyqtgraph export or ragged rows, go through genfromtxt as before, with NaN
+for the missing values.
+
+    header, data = csv_reader.read(path)     # '# ' lines (raw) and the array
+    data = csv_reader.load(path)             # the array alone
+    for part in csv_reader.iter_parts(path, 10):
+        ...                                  # np.array_split(data, 10), streamed
+
+`iter_parts` reads the file block by block: only one part is in memory at a
+time, and it never holds the whole text and the whole array together.
+`skip_header` drops that many leading lines first (e.g. the column-name line
+of a pyqtgraph export).
+"""
+
+import itertools
+import numpy as np
+
+# the header is UTF-8 text (e.g. 'µs'); the numbers are ASCII
+ENCODING = 'utf-8'
+
+
+def _skip(fh, skip_header):
+    for _ in range(skip_header):
+        if not fh.readline():
+            break
+
+
+def _read_header(fh):
+    """Consume the leading '#' lines of `fh`; leave it at the first data line."""
+    header = []
+    while True:
+        pos = fh.tell()
+        line = fh.readline()
+        if not line.startswith('#'):
+            fh.seek(pos)
+            return header
+        header.append(line)
+
+
+def _parse(src):
+    """Float array of CSV text (a file positioned at the data, or a list of
+    lines), 1D for a single row or column as genfromtxt gives it."""
+    pos = src.tell() if hasattr(src, 'tell') else None
+    try:
+        return np.loadtxt(src, dtype=float, delimiter=',', comments='#')
+    except ValueError:
+        # empty fields / ragged rows: genfromtxt fills them with NaN
+        if pos is not None:
+            src.seek(pos)
+        return np.genfromtxt(src, dtype=float, delimiter=',')
+
+
+def read(path, skip_header = 0):
+    """The '#' header lines of `path` (raw, with the newline) and its data."""
+    with open(path, 'r', encoding=ENCODING, errors='replace') as fh:
+        _skip(fh, skip_header)
+        header = _read_header(fh)
+        return header, _parse(fh)
+
+
+def load(path, skip_header = 0):
+    """The data of `path` as a float array (header lines skipped)."""
+    return read(path, skip_header)[1]
+
+
+def count_rows(path, skip_header = 0):
+    """Number of data rows of `path` (no '#' lines, no blank lines)."""
+    with open(path, 'r', encoding=ENCODING, errors='replace') as fh:
+        _skip(fh, skip_header)
+        return sum(1 for line in fh if line.strip() and not line.startswith('#'))
+
+
+def iter_rows(path, rows, skip_header = 0):
+    """Yield 2D float blocks of `rows` data rows each (the last one shorter)."""
+    with open(path, 'r', encoding=ENCODING, errors='replace') as fh:
+        _skip(fh, skip_header)
+        lines = (line for line in fh if line.strip() and not line.startswith('#'))
+        while True:
+            block = list(itertools.islice(lines, rows))
+            if not block:
+                return
+            yield np.atleast_2d(_parse(block)).reshape(len(block), -1)
+
+
+def iter_parts(path, parts, skip_header = 0):
+    """Yield the parts `np.array_split(load(path), parts)` would give, reading
+    one part at a time."""
+    n = count_rows(path, skip_header)
+    if n <= 1:                                   # a 1D row is split by columns
+        yield from np.array_split(load(path, skip_header), parts)
+        return
+    size, extra = divmod(n, parts)
+    with open(path, 'r', encoding=ENCODING, errors='replace') as fh:
+        _skip(fh, skip_header)
+        lines = (line for line in fh if line.strip() and not line.startswith('#'))
+        ncols = 1
+        for k in range(parts):
+            block = list(itertools.islice(lines, size + (k < extra)))
+            if not block:                        # more parts than rows
+                yield np.empty((0,) if ncols == 1 else (0, ncols), dtype=float)
+                continue
+            data = np.atleast_2d(_parse(block)).reshape(len(block), -1)
+            ncols = data.shape[1]
+            yield data[:, 0] if ncols == 1 else data
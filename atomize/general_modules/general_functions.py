@@ -4,7 +4,9 @@
 import sys
 import time
 import atexit
+import itertools
 import threading
+import contextlib
 from threading import Thread
 import configparser
 import numpy as np
@@ -22,11 +24,19 @@ _plotter_instance = None
 # is the "thread version"; experimental scripts leave it off and opt in per call.
 _async_default = False
 
+# When True, float64 / complex128 frames are sent to the plotter as float32 /
+# complex64 (see set_plotting_float32). Integer frames always keep their dtype.
+_plot_float32 = False
+
+# Frames the plot connection may have in flight (see set_plotting_ring); 1 is
+# the one-frame 'ok' handshake.
+_plot_slots = 1
+
 def _plotter():
     """Lazy LivePlotClient singleton. Connects on first call, not at import."""
     global _plotter_instance
     if _plotter_instance is None:
-        _plotter_instance = LivePlotClient()
+        _plotter_instance = LivePlotClient(slots=_plot_slots, float32=_plot_float32)
     return _plotter_instance
 
 def set_plotting_async(enabled=True):
@@ -39,6 +49,27 @@ def set_plotting_async(enabled=True):
     global _async_default
     _async_default = bool(enabled)
 
+def set_plotting_float32(enabled=True):
+    """Send double-precision plot frames as float32 / complex64 for THIS
+    process. Live plots are display-only, so this halves the shared-memory copy
+    and the receiver copy of big 2D frames; the arrays held by the script and
+    written to disk are never touched. plot_1d frames keep float64, since they
+    carry the x axis (epoch seconds of a time axis, field, frequency)."""
+    global _plot_float32
+    _plot_float32 = bool(enabled)
+    if _plotter_instance is not None:
+        _plotter_instance.float32 = _plot_float32
+
+def set_plotting_ring(slots=8):
+    """Let the plot connection of THIS process queue up to `slots` frames
+    while the GUI draws them, instead of waiting for each one. It pays off for
+    an acquisition loop with work of its own between big frames and costs
+    throughput when the GUI keeps up, so it is off by default (slots=1). Call
+    once before the first plot of the process; the connection keeps the
+    setting it was opened with."""
+    global _plot_slots
+    _plot_slots = max(1, int(slots))
+
 def _in_test():
     return test_flag == 'test'
 
@@ -102,13 +133,40 @@ def scans(num_of_scans):
         yield index
         index += 1
 
-# Plotting guards. Above these sizes the data is strided down for *display only*
+# Plotting guards. Above these sizes the data is decimated for *display only*
 # (the arrays held by the script and written to disk are never modified). The
 # caps sit well under the LivePlotClient shared-memory limit and keep pyqtgraph
 # from freezing the GUI on multi-million-point payloads.
 _PLOT_MAX_POINTS_1D = 2_000_000
 _PLOT_MAX_CELLS_2D = 4_000_000
 
+# Display decimation per plot name (None: every plot without its own entry),
+# as (method, max points / cells or None for the caps above); see
+# set_plot_decimation.
+_DECIMATION_METHODS = ('minmax', 'lttb', 'stride')
+_plot_decimation = {None: ('minmax', None)}
+
+def set_plot_decimation(method='minmax', strname=None, max_points=None):
+    """Choose how plot `strname` (every plot when None) is reduced for display
+    once it exceeds `max_points` samples (1D) or cells (2D); max_points=None
+    keeps the 2 M point / 4 M cell caps. The reduction runs in the script
+    process before the shared-memory copy, so it also bounds the frame size.
+
+    'minmax' (default) keeps the minimum and the maximum of every bucket, so
+    narrow echoes and spikes survive at any zoom-out; 2D images keep the more
+    extreme of each block's minimum and maximum. 'lttb' (Largest-Triangle-
+    Three-Buckets, 1D only; 2D uses 'minmax') keeps the visually dominant point
+    of every bucket and follows the shape of smooth curves more closely.
+    'stride' is the former plain striding, which can alias peaks away."""
+    if method not in _DECIMATION_METHODS:
+        raise ValueError(f"Unknown decimation method {method!r}; "
+                         f"expected one of {_DECIMATION_METHODS}")
+    _plot_decimation[strname] = (method, None if max_points is None else int(max_points))
+
+def _decimation_for(strname, default_cap):
+    method, cap = _plot_decimation.get(strname, _plot_decimation[None])
+    return method, default_cap if cap is None else cap
+
 def _notify(text):
     """Push a line to the main-window log regardless of test/normal mode."""
     print(f'print {text}', flush=True)
@@ -203,38 +261,117 @@ def _get_plot_worker():
         atexit.register(_plot_worker.flush)
     return _plot_worker
 
-def _downsample_1d(xd, yd, max_points):
-    """Stride (xd, yd) down so each curve has <= max_points samples. Returns
+def _bucket_bounds(n, buckets):
+    """Start index of each of `buckets` near-equal buckets over range(n), plus
+    n as the closing bound."""
+    return (np.arange(buckets + 1, dtype=np.int64) * n) // buckets
+
+def _bucket_reduce(ufunc, y, bounds):
+    """ufunc.reduceat over the sample axis of y (curves, n) for each bucket."""
+    return ufunc.reduceat(y, bounds[:-1], axis=-1)
+
+def _minmax_indices(y, max_points):
+    """Sorted sample indices keeping the minimum and the maximum of every
+    bucket of every curve in y (curves, n); at most max_points indices."""
+    curves, n = y.shape
+    width = -(-n // max(1, max_points // (2 * curves)))
+    full = n // width
+    # whole buckets as a (curves, buckets, width) view, plus a shorter tail
+    blocks = y[:, :full * width].reshape(curves, full, width)
+    starts = np.arange(full) * width
+    picks = [np.argmin(blocks, axis=-1) + starts, np.argmax(blocks, axis=-1) + starts]
+    if full * width < n:
+        tail = y[:, full * width:]
+        picks = [np.concatenate((p, f(tail, axis=-1)[:, None] + full * width), axis=1)
+                 for p, f in zip(picks, (np.argmin, np.argmax))]
+    return np.sort(np.concatenate(picks), axis=0).T.reshape(-1)
+
+def _lttb_indices(x, y, max_points):
+    """Sample indices of a Largest-Triangle-Three-Buckets reduction of the
+    curves y (curves, n) over x (n,). Vectorized: the triangle of each bucket
+    is spanned by the mean points of its two neighbouring buckets rather than
+    by the previously selected point, which makes every bucket independent.
+    The first and last samples are always kept; at most max_points indices."""
+    curves, n = y.shape
+    buckets = max(1, (max_points - 2) // curves)
+    bounds = 1 + _bucket_bounds(n - 2, buckets)
+    counts = np.diff(bounds)
+    xm = _bucket_reduce(np.add, x[None, :], bounds)[0] / counts
+    ym = _bucket_reduce(np.add, y, bounds) / counts
+    # neighbour means, with the end samples standing in at both edges
+    ax = np.concatenate(([x[0]], xm[:-1]))
+    ay = np.concatenate((y[:, :1], ym[:, :-1]), axis=1)
+    cx = np.concatenate((xm[1:], [x[-1]]))
+    cy = np.concatenate((ym[:, 1:], y[:, -1:]), axis=1)
+    bucket = np.repeat(np.arange(buckets), counts)
+    xs = x[1:n - 1]
+    area = np.abs((ax[bucket] - cx[bucket]) * (y[:, 1:n - 1] - ay[:, bucket])
+                  - (ax[bucket] - xs) * (cy[:, bucket] - ay[:, bucket]))
+    # per-bucket argmax: the last maximal sample of each bucket
+    best = np.maximum.reduceat(area, bounds[:-1] - 1, axis=-1)
+    hit = area == best[:, bucket]
+    pos = np.arange(1, n - 1)
+    idx = np.maximum.reduceat(np.where(hit, pos, -1), bounds[:-1] - 1, axis=-1)
+    # an all-NaN bucket has no maximum; keep its first sample
+    idx = np.where(idx < 0, bounds[:-1], idx)
+    idx = np.sort(idx, axis=0).T.reshape(-1)
+    return np.concatenate(([0], idx, [n - 1]))
+
+def _downsample_1d(xd, yd, max_points, method='minmax'):
+    """Decimate (xd, yd) so each curve has <= max_points samples. Returns
     (xd, yd, step); step == 1 leaves the inputs untouched. yd may be 1D (one
     curve) or 2D / a tuple of two arrays (two curves) — the last axis is the
-    sample axis in every case, and xd is strided to match."""
+    sample axis in every case, and xd is reduced to match. The kept samples
+    are shared by all curves, so two curves keep one x axis; 'minmax' and
+    'lttb' keep the real x of every sample, so non-uniform axes stay exact."""
     shape = np.shape(yd)
     n = shape[-1] if shape else 0
     if n <= max_points:
         return xd, yd, 1
     step = int(np.ceil(n / max_points))
-    return np.asarray(xd)[..., ::step], np.asarray(yd)[..., ::step], step
+    xd = np.asarray(xd)
+    yd = np.asarray(yd)
+    if method == 'stride' or np.iscomplexobj(yd) or yd.dtype.kind not in 'iuf':
+        return xd[..., ::step], yd[..., ::step], step
+    y = yd.reshape(-1, n)
+    if method == 'lttb' and n > 2 and max_points > 2 * y.shape[0]:
+        x = xd.reshape(-1, n)[0].astype(np.float64)
+        idx = _lttb_indices(x, y.astype(np.float64), max_points)
+    else:
+        idx = _minmax_indices(y, max_points)
+    return xd[..., idx], yd[..., idx], step
 
-def _downsample_2d(data, start_step, max_cells):
-    """Stride a 2D image down to <= max_cells, scaling start_step so the axes
-    stay correct. Returns (data, start_step, factor); factor == 1 is a no-op.
+def _downsample_2d(data, start_step, max_cells, method='minmax'):
+    """Decimate a 2D image down to <= max_cells, scaling start_step so the
+    axes stay correct. Returns (data, start_step, factor); factor == 1 is a
+    no-op. 'minmax' (and 'lttb') replaces every factor x factor block with the
+    more extreme of its minimum and maximum (the one further from the block
+    mean), so a one-pixel peak of either sign survives; 'stride' keeps every
+    factor-th row and column.
 
     A 3D array is treated as a stack of frames (n_frames, ny, nx) — e.g. the
     real/imag pair of a complex 2D result that plot_2d shows as toggleable
-    frames; only the two image axes are strided and every frame is kept."""
+    frames; only the two image axes are reduced and every frame is kept."""
     arr = np.asarray(data)
     if arr.ndim >= 3:
         size = int(np.prod(arr.shape[-2:]))
-        if size <= max_cells:
-            return data, start_step, 1
-        factor = int(np.ceil(np.sqrt(size / max_cells)))
-        data_ds = arr[..., ::factor, ::factor]
     else:
         size = int(np.prod(arr.shape)) if arr.shape else 0
-        if size <= max_cells:
-            return data, start_step, 1
-        factor = int(np.ceil(np.sqrt(size / max_cells)))
-        data_ds = arr[::factor, ::factor]
+    if size <= max_cells:
+        return data, start_step, 1
+    factor = int(np.ceil(np.sqrt(size / max_cells)))
+    if method == 'stride' or np.iscomplexobj(arr) or arr.dtype.kind not in 'iuf':
+        data_ds = arr[..., ::factor, ::factor]
+    else:
+        ny, nx = arr.shape[-2:]
+        by, bx = -(-ny // factor), -(-nx // factor)
+        pad = [(0, 0)] * (arr.ndim - 2) + [(0, by * factor - ny), (0, bx * factor - nx)]
+        blocks = np.pad(arr, pad, mode='edge').reshape(
+            arr.shape[:-2] + (by, factor, bx, factor))
+        lo = blocks.min(axis=(-3, -1))
+        hi = blocks.max(axis=(-3, -1))
+        mean = blocks.mean(axis=(-3, -1))
+        data_ds = np.where(hi - mean >= mean - lo, hi, lo)
     if start_step is None:
         new_ss = ((0, factor), (0, factor))
     else:
@@ -267,7 +404,7 @@ def _dispatch_plot(target, args, kwargs, pr, get_first=None):
             _notify(f"plot skipped: empty or non-numeric data ({e!r})")
             return None
 
-    if pr == 'None':
+    if pr == 'None' or _in_batch():
         _safe_call(target, args, kwargs)
         return None
 
@@ -279,10 +416,11 @@ def _dispatch_plot(target, args, kwargs, pr, get_first=None):
 
 def _plot_1d_impl(strname, xd, yd, label, xname, xscale, yname, yscale,
                   scatter, timeaxis, vline, pr, text):
-    xd, yd, step = _downsample_1d(xd, yd, _PLOT_MAX_POINTS_1D)
+    method, cap = _decimation_for(strname, _PLOT_MAX_POINTS_1D)
+    xd, yd, step = _downsample_1d(xd, yd, cap, method)
     if step > 1:
-        _notify(f"plot '{strname}': downsampled {step}x for display "
-                f"(> {_PLOT_MAX_POINTS_1D} points); saved data is unaffected")
+        _notify(f"plot '{strname}': downsampled {step}x ({method}) for display "
+                f"(> {cap} points); saved data is unaffected")
     kwargs = {'label': label, 'xname': xname, 'xscale': xscale,
               'yname': yname, 'yscale': yscale, 'scatter': scatter,
               'timeaxis': timeaxis, 'vline': vline, 'text': text}
@@ -321,10 +459,11 @@ def append_1d(strname, value, start_step=(0, 1), label='label', xname='X',
 
 def _plot_2d_impl(strname, data, start_step, xname, xscale, yname, yscale,
                   zname, zscale, pr, text):
-    data, start_step, factor = _downsample_2d(data, start_step, _PLOT_MAX_CELLS_2D)
+    method, cap = _decimation_for(strname, _PLOT_MAX_CELLS_2D)
+    data, start_step, factor = _downsample_2d(data, start_step, cap, method)
     if factor > 1:
-        _notify(f"plot '{strname}': downsampled {factor}x per axis for display "
-                f"(> {_PLOT_MAX_CELLS_2D} cells); saved data is unaffected")
+        _notify(f"plot '{strname}': downsampled {factor}x per axis ({method}) for display "
+                f"(> {cap} cells); saved data is unaffected")
     kwargs = {'start_step': start_step, 'xname': xname, 'xscale': xscale,
               'yname': yname, 'yscale': yscale, 'zname': zname,
               'zscale': zscale, 'text': text}
@@ -406,9 +545,9 @@ def update_2d(strname, data, lo, hi, start_step=None,
     lo, hi = int(lo), int(hi)
     if lo >= hi:
         return None if pr == 'None' and not _async_default else _ASYNC_HANDLE
-    # Above the display cap the full-frame path stride-downsamples the image,
-    # which a column-range patch cannot represent — fall back to a full replot.
-    if int(np.prod(arr.shape[-2:])) > _PLOT_MAX_CELLS_2D:
+    # Above the display cap the full-frame path decimates the image, which a
+    # column-range patch cannot represent — fall back to a full replot.
+    if int(np.prod(arr.shape[-2:])) > _decimation_for(strname, _PLOT_MAX_CELLS_2D)[1]:
         return plot_2d(strname, data, start_step=start_step, xname=xname,
                        xscale=xscale, yname=yname, yscale=yscale, zname=zname,
                        zscale=zscale, pr=pr, text=text)
@@ -425,12 +564,58 @@ def update_2d(strname, data, lo, hi, start_step=None,
     kwargs = {'start_step': start_step, 'xname': xname, 'xscale': xscale,
               'yname': yname, 'yscale': yscale, 'zname': zname,
               'zscale': zscale, 'text': text}
-    if pr == 'None':
+    if pr == 'None' or _in_batch():
         _safe_call(_drain_update_2d, args, kwargs)
         return None
     _get_plot_worker().submit(strname, _drain_update_2d, args, kwargs)
     return _ASYNC_HANDLE
 
+# Operations whose frames must all arrive (each carries new points / columns);
+# a batch holding one of them is never coalesced with a later batch.
+_INCREMENTAL_OPS = frozenset(('append_y', 'append_xy', 'append_z', 'update_z'))
+_batch_ids = itertools.count()
+_batch_local = threading.local()
+
+def _in_batch():
+    return getattr(_batch_local, 'depth', 0) > 0
+
+@contextlib.contextmanager
+def plot_batch(pr='None'):
+    """
+    Send every plot call made inside the block (plot_1d, plot_2d, update_2d,
+    append_1d, append_2d, text_label, plot_remove) as ONE frame: one shared-
+    memory payload, one meta index and one ack instead of one round trip per
+    plot, and the plot window applies them in a single repaint. Inside the
+    block the calls only collect their data; the arrays are read when the
+    block exits.
+
+    The batch is sent synchronously, or handed to the coalescing plot worker
+    when `pr` is given or set_plotting_async(True) is on. Batches of full
+    replots coalesce with the next batch of the same plots; a batch carrying
+    an append or a partial update is always delivered.
+    """
+    if _in_test():
+        yield
+        return
+    client = _plotter()
+    _batch_local.depth = getattr(_batch_local, 'depth', 0) + 1
+    client.begin_batch()
+    try:
+        yield
+    finally:
+        _batch_local.depth -= 1
+        items = client.end_batch()
+    if not items:
+        return
+    if pr == 'None' and not _async_default:
+        _safe_call(client.send_batch, (items,), {})
+        return
+    if any(meta.get('operation') in _INCREMENTAL_OPS for meta, _ in items):
+        key = ('batch', next(_batch_ids))
+    else:
+        key = ('batch',) + tuple(str(meta.get('name')) for meta, _ in items)
+    _get_plot_worker().submit(key, client.send_batch, (items,), {})
+
 def text_label(strlabel, text, value, pr='None'):
     if _in_test():
         return None
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Crash-safe per-scan autosave of a running experiment (numpy-only, no Qt).
+
+The experiment workers keep the accumulated data in memory and ask for a file
+name only when the run ends, so a crash or power cut during a long run loses
+all of it. `ScanWriter` journals the data while the run goes on:
+
+    writer = ScanWriter(directory, 'DEER', header='...')
+    for k in scans:
+        ...                                  # acquire, data = running mean
+        writer.append(k, data)               # returns at once
+    writer.finish()                          # after the final save_data
+
+Each `append` hands a copy of the running mean after scan `k` to a background
+thread, which appends it as a chunk to a binary_data container (the journal),
+fsyncs it and then replaces the JSON checkpoint index (`<name>.idx`, written
+to a temporary file, fsynced and renamed over the old one). The index names
+the journal file, the chunk holding the last complete checkpoint and its scan
+count, so whatever is cut off by a crash, the index always points at data that
+reached the disk. If the disk falls behind, only the newest pending snapshot
+is written (each one supersedes the previous). Every `MAX_CHUNKS` chunks the
+journal is compacted to the last checkpoint in a new generation file, so it
+holds at most MAX_CHUNKS snapshots.
+
+`finish()` drains the thread and removes the journal and its index, so a clean
+run leaves nothing behind; `close()` keeps them. `ScanWriter.pending(directory)`
+lists the journals of interrupted runs and `ScanWriter.resume(index)` reloads
+one: the mean, the accumulated sum and the scan count.
+
+A writer created with directory=None (test runs) does nothing. An error in the
+thread (disk full, ...) or an autosave directory that cannot be created stops
+the journaling, never the experiment; it is kept in `error`.
+"""
+
+import os
+import json
+import time
+import threading
+import numpy as np
+
+import atomize.general_modules.binary_data as binary
+
+INDEX_EXT = '.idx'
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return                                   # not supported (Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _safe_name(name):
+    keep = ''.join(c if (c.isalnum() or c in '-_') else '_' for c in str(name))
+    return keep or 'experiment'
+
+
+class ScanWriter():
+
+    # journal chunks before the journal is compacted to the last checkpoint
+    MAX_CHUNKS = 8
+
+    def __init__(self, directory, name, header = '', axes = None):
+        self.error = None
+        self.path = None
+        self._pending = None
+        self._thread = None
+        if directory is None:
+            return
+        try:
+            os.makedirs(directory, exist_ok = True)
+        except OSError as e:
+            self.error = e                       # unwritable autosave: no journal
+            return
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(directory, f'{_safe_name(name)}_{stamp}_{os.getpid()}')
+        self.path = base + INDEX_EXT
+        self._base = base
+        self._header = str(header)
+        self._axes = list(axes or [])
+        self._gen = 0
+        self._chunks = 0
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target = self._run, name = 'ScanWriter', daemon = True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------ public
+    def append(self, scans, data, count = None):
+        """Queue the running mean `data` after `scans` completed scans. `count`
+        is the number of averaged passes when it differs from the scan count
+        (e.g. two per scan for a there-and-back sweep)."""
+        if self._thread is None or self.error is not None:
+            return
+        snap = (int(scans), int(scans if count is None else count),
+                np.array(data, dtype = float))
+        with self._cond:
+            self._pending = snap
+            self._cond.notify()
+
+    def close(self):
+        """Write the pending snapshot and stop the thread; the journal stays."""
+        if self._thread is None:
+            return self.error
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+        return self.error
+
+    def finish(self):
+        """close() and remove the journal: the run has been saved for good."""
+        error = self.close()
+        if self.path is not None:
+            for path in (self._journal(self._gen), self.path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return error
+
+    @staticmethod
+    def pending(directory):
+        """Index paths of the journals left by interrupted runs, oldest first."""
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            return []
+        paths = [os.path.join(directory, n) for n in names if n.endswith(INDEX_EXT)]
+        return sorted(paths, key = os.path.getmtime)
+
+    @staticmethod
+    def resume(index_path):
+        """Reload the last checkpoint of a journal. Returns a dict:
+
+            {'data', 'sum', 'scans', 'count', 'header', 'axes', 'name'}
+
+        `data` is the running mean after `scans` scans and `sum` = data*count,
+        the accumulated sum to continue from."""
+        with open(index_path, 'r') as fh:
+            idx = json.load(fh)
+        journal = os.path.join(os.path.dirname(index_path), idx['journal'])
+        for i, chunk in enumerate(binary.iter_chunks(journal)):
+            if i == idx['chunk']:
+                break
+        else:
+            raise ValueError(f'{journal}: checkpoint {idx["chunk"]} is missing')
+        chunk = chunk.reshape(idx['shape'])
+        return {'data': chunk, 'sum': chunk*idx['count'], 'scans': idx['scans'],
+                'count': idx['count'], 'header': idx.get('header', ''),
+                'axes': idx.get('axes', []), 'name': idx.get('name', '')}
+
+    # ------------------------------------------------------------------ thread
+    def _journal(self, gen):
+        return f'{self._base}.{gen}{binary.EXT}'
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closing:
+                    self._cond.wait()
+                snap, self._pending = self._pending, None
+                closing = self._closing
+            if snap is not None and self.error is None:
+                try:
+                    self._write(*snap)
+                except Exception as e:
+                    self.error = e
+            if closing:
+                with self._cond:
+                    if self._pending is None:
+                        return
+
+    def _write(self, scans, count, data):
+        if self._chunks >= self.MAX_CHUNKS:
+            # compact: the last checkpoint alone in the next generation file
+            old = self._journal(self._gen)
+            self._gen += 1
+            self._chunks = 0
+            self._write_chunk(data, mode = 'w')
+            self._write_index(scans, count, data.shape)
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+            return
+        self._write_chunk(data, mode = 'a' if self._chunks else 'w')
+        self._write_index(scans, count, data.shape)
+
+    def _write_chunk(self, data, mode):
+        # stored flat: the shape of each checkpoint is in the index
+        path = self._journal(self._gen)
+        binary.write(path, data.ravel(), header = self._header, axes = self._axes, mode = mode)
+        with open(path, 'rb+') as fh:
+            os.fsync(fh.fileno())
+        self._chunks += 1
+
+    def _write_index(self, scans, count, shape):
+        idx = {'journal': os.path.basename(self._journal(self._gen)),
+               'chunk': self._chunks - 1, 'shape': list(shape),
+               'scans': scans, 'count': count,
+               'name': os.path.basename(self._base), 'header': self._header,
+               'axes': self._axes, 'time': time.time()}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump(idx, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(os.path.dirname(self.path))
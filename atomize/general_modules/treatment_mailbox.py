@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared-memory mailbox for "Send to Data Treatment" (numpy + stdlib; the
+notification uses QtNetwork, imported when it is used).
+
+The main window and the 2D tool hand plots to the standalone treatment windows,
+which run in their own processes. This used to go through a CSV file in libs/
+(parsed back with genfromtxt, '%.6e' precision) and a directory watcher. The
+mailbox keeps the arrays in a shared-memory block instead:
+
+    MAGIC (8 bytes) | state (uint32) | uint32 n | JSON (n bytes) | arrays
+
+The JSON carries the caller's metadata (labels, colours, axis names, ...) and
+the layout of the arrays ([key, dtype, shape, offset], each array on a 64-byte
+boundary). Every send gets a block of its own (named after the pid and a
+sequence number), since the main window and the 2D tool both post 1D curves.
+A small pointer block under the fixed name of the mailbox `kind` holds the
+name of the newest one, so a window started after the send still finds it.
+The state word is set to PENDING only after everything else is written;
+`receive` copies the arrays out, at full precision, and sets it to CONSUMED,
+so the mailbox is one-shot as before.
+
+    treatment_mailbox.send(KIND_2D, {'i': i, 'q': q}, geom=[x0, dx, y0, dy])
+    treatment_mailbox.notify(KIND_2D)        # wake a window that is open
+    res = treatment_mailbox.receive(KIND_2D)     # {'arrays', 'meta'} or None
+
+`send_curves` / `receive_curves` do the same for the 1D curves [(label, x, y),
+...] of a plot (x and y per curve, no NaN padding).
+
+The sending process owns its blocks and releases them itself (they are kept
+away from the resource tracker, which would unlink a name on exit): a block
+stays alive until the next send of the same kind from that process or until
+the sender exits. A receiving window listens with
+`listen(kind, callback)`, a QLocalServer named after the mailbox; `notify`
+connects to it and the window loads at once, without polling the disk.
+"""
+
+import os
+import json
+import atexit
+import struct
+import inspect
+import itertools
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# 1D curves for the 1D tool / DEER; 2D images for the 2D tool
+KIND_1D = 'treatment'
+KIND_2D = 'treatment_2d'
+
+MAGIC = b'\x93ATMBOX1'
+EMPTY, PENDING, CONSUMED = 0, 1, 2
+
+_STATE = struct.Struct('<I')
+_ALIGN = 64
+_HEAD = len(MAGIC) + 2*_STATE.size
+# the pointer block: MAGIC | version (odd while written) | length | name
+_PTR_MAGIC = b'\x93ATMPTR1'
+_PTR_SIZE = 256
+_PTR_HEAD = len(_PTR_MAGIC) + 2*_STATE.size
+# data blocks sent by this process, by kind, and the pointer blocks it holds
+_OWNED = {}
+_POINTERS = {}
+_SEQ = itertools.count()
+
+
+def block_name(kind):
+    """System-wide name of the mailbox `kind` (per user; short for macOS): the
+    pointer block and the local server of the receiving window."""
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', '')
+    return f'atz_{kind}_{user}'
+
+
+# Python >= 3.13 can keep a block away from the resource tracker
+_TRACK_ARG = 'track' in inspect.signature(shared_memory.SharedMemory).parameters
+_TRACKER = not _TRACK_ARG and os.name != 'nt'
+
+
+def _tracker(call, shm):
+    # the blocks are released explicitly: the resource tracker of Python < 3.13
+    # would unlink them when the process exits, whatever name they carry then
+    from multiprocessing import resource_tracker
+    getattr(resource_tracker, call)(shm._name, 'shared_memory')
+
+
+def _attach(name):
+    if _TRACK_ARG:
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if _TRACKER:
+        _tracker('unregister', shm)
+    return shm
+
+
+def _new(name, size):
+    if _TRACK_ARG:
+        return shared_memory.SharedMemory(name=name, create=True, size=size, track=False)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    if _TRACKER:
+        _tracker('unregister', shm)
+    return shm
+
+
+def _unlink(shm):
+    if _TRACKER:
+        _tracker('register', shm)                # unlink() unregisters it again
+    try:
+        shm.unlink()
+    except OSError:
+        pass
+
+
+def _release(kind):
+    shm = _OWNED.pop(kind, None)
+    if shm is not None:
+        shm.close()
+        _unlink(shm)
+
+
+@atexit.register
+def _release_all():
+    for kind in list(_OWNED):
+        _release(kind)
+    for shm in _POINTERS.values():
+        shm.close()
+    _POINTERS.clear()
+
+
+def _pointer(kind):
+    """The pointer block of `kind`, kept open by every sender (on Windows a
+    block lives as long as a handle to it). It is never unlinked: any sender
+    may be the last to write it, and it is 256 bytes."""
+    shm = _POINTERS.get(kind)
+    if shm is None:
+        name = block_name(kind)
+        try:
+            shm = _new(name, _PTR_SIZE)
+        except FileExistsError:
+            shm = _attach(name)
+        _POINTERS[kind] = shm
+    return shm
+
+
+def _write_pointer(kind, name):
+    buf = _pointer(kind).buf
+    raw = name.encode('ascii')
+    version = _STATE.unpack_from(buf, len(_PTR_MAGIC))[0] if \
+        bytes(buf[:len(_PTR_MAGIC)]) == _PTR_MAGIC else 0
+    _STATE.pack_into(buf, len(_PTR_MAGIC), (version | 1) + 2)       # odd: writing
+    buf[:len(_PTR_MAGIC)] = _PTR_MAGIC
+    _STATE.pack_into(buf, len(_PTR_MAGIC) + _STATE.size, len(raw))
+    buf[_PTR_HEAD:_PTR_HEAD + len(raw)] = raw
+    _STATE.pack_into(buf, len(_PTR_MAGIC), (version | 1) + 3)       # even: done
+
+
+def _read_pointer(kind):
+    """Name of the newest data block of `kind`, or None."""
+    try:
+        shm = _POINTERS.get(kind) or _attach(block_name(kind))
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+    try:
+        buf = shm.buf
+        for _ in range(100):
+            if len(buf) < _PTR_HEAD or bytes(buf[:len(_PTR_MAGIC)]) != _PTR_MAGIC:
+                return None
+            version = _STATE.unpack_from(buf, len(_PTR_MAGIC))[0]
+            n = _STATE.unpack_from(buf, len(_PTR_MAGIC) + _STATE.size)[0]
+            raw = bytes(buf[_PTR_HEAD:_PTR_HEAD + min(n, _PTR_SIZE - _PTR_HEAD)])
+            if not version & 1 and version == _STATE.unpack_from(buf, len(_PTR_MAGIC))[0]:
+                return raw.decode('ascii', errors='replace') or None
+        return None
+    finally:
+        del buf
+        if shm is not _POINTERS.get(kind):
+            shm.close()
+
+
+def send(kind, arrays, **meta):
+    """Post `arrays` ({key: ndarray}) and the JSON-serialisable `meta` to the
+    mailbox `kind`, replacing what it held. Returns the data block name."""
+    arrays = {str(k): np.ascontiguousarray(a) for k, a in arrays.items()}
+    layout, size = [], 0
+    for key, a in arrays.items():
+        layout.append([key, a.dtype.str, list(a.shape), size])
+        size += -(-a.nbytes // _ALIGN)*_ALIGN
+    raw = json.dumps({'meta': meta, 'arrays': layout}).encode('utf-8')
+    start = -(-(_HEAD + len(raw)) // _ALIGN)*_ALIGN
+    # a block of its own per send: two windows may post to the same kind
+    name = f'{block_name(kind)}_{os.getpid():x}_{next(_SEQ):x}'
+    shm = _new(name, max(start + size, 1))
+    buf = shm.buf
+    buf[:len(MAGIC)] = MAGIC
+    _STATE.pack_into(buf, len(MAGIC) + _STATE.size, len(raw))
+    buf[_HEAD:_HEAD + len(raw)] = raw
+    for (key, dt, shape, off), a in zip(layout, arrays.values()):
+        view = np.ndarray(shape, dtype=dt, buffer=buf, offset=start + off)
+        view[...] = a
+        del view
+    _STATE.pack_into(buf, len(MAGIC), PENDING)   # last: the block is complete
+    del buf
+    _write_pointer(kind, name)
+    _release(kind)                               # our previous send of this kind
+    _OWNED[kind] = shm
+    return name
+
+
+def _read(kind, consume):
+    name = _read_pointer(kind)
+    if name is None:
+        return None
+    try:
+        shm = _attach(name)
+    except (FileNotFoundError, OSError, ValueError):
+        return None                              # the sender has exited
+    try:
+        buf = shm.buf
+        if len(buf) < _HEAD or bytes(buf[:len(MAGIC)]) != MAGIC:
+            return None
+        if _STATE.unpack_from(buf, len(MAGIC))[0] != PENDING:
+            return None
+        n = _STATE.unpack_from(buf, len(MAGIC) + _STATE.size)[0]
+        head = json.loads(bytes(buf[_HEAD:_HEAD + n]).decode('utf-8'))
+        if not consume:
+            return {'arrays': {}, 'meta': head['meta']}
+        start = -(-(_HEAD + n) // _ALIGN)*_ALIGN
+        arrays = {}
+        for key, dt, shape, off in head['arrays']:
+            view = np.ndarray(shape, dtype=dt, buffer=buf, offset=start + off)
+            arrays[key] = view.copy()
+            del view
+        _STATE.pack_into(buf, len(MAGIC), CONSUMED)
+        return {'arrays': arrays, 'meta': head['meta']}
+    finally:
+        del buf
+        shm.close()
+
+
+def receive(kind):
+    """Take the pending content of the mailbox `kind`: {'arrays': {key:
+    ndarray}, 'meta': {...}}, or None when nothing new was sent."""
+    return _read(kind, consume=True)
+
+
+def pending(kind):
+    """True when the mailbox `kind` holds content not received yet."""
+    return _read(kind, consume=False) is not None
+
+
+def discard(kind):
+    """Mark the pending content of `kind` as received (a malformed send)."""
+    name = _read_pointer(kind)
+    if name is None:
+        return
+    try:
+        shm = _attach(name)
+    except (FileNotFoundError, OSError, ValueError):
+        return
+    try:
+        if len(shm.buf) >= _HEAD and bytes(shm.buf[:len(MAGIC)]) == MAGIC:
+            _STATE.pack_into(shm.buf, len(MAGIC), CONSUMED)
+    finally:
+        shm.close()
+
+
+def send_curves(curves, colors = None, xname = ''):
+    """Post 1D curves [(label, x, y), ...] to the 1D mailbox, with optional
+    'r,g,b' colour strings and the X axis name+unit."""
+    arrays = {}
+    for k, (_, x, y) in enumerate(curves):
+        arrays[f'x{k}'] = np.asarray(x, dtype=float)
+        arrays[f'y{k}'] = np.asarray(y, dtype=float)
+    return send(KIND_1D, arrays, labels=[str(c[0]) for c in curves],
+                colors=[str(c) for c in (colors or [])], xname=str(xname))
+
+
+def receive_curves():
+    """Take the pending 1D curves: ([(label, x, y), ...], meta) or None."""
+    res = receive(KIND_1D)
+    if res is None:
+        return None
+    arrays, meta = res['arrays'], res['meta']
+    labels = meta.get('labels', [])
+    curves = []
+    while f'x{len(curves)}' in arrays:
+        k = len(curves)
+        label = labels[k] if k < len(labels) else f'curve {k}'
+        curves.append((label, arrays[f'x{k}'], arrays[f'y{k}']))
+    return curves, meta
+
+
+def notify(kind, timeout = 200):
+    """Tell a window listening on `kind` that the mailbox has new content.
+    Returns False when no window listens (it reads the mailbox on start)."""
+    from PyQt6.QtNetwork import QLocalSocket
+    sock = QLocalSocket()
+    sock.connectToServer(block_name(kind))
+    if not sock.waitForConnected(timeout):
+        return False
+    sock.write(b'n')
+    sock.waitForBytesWritten(timeout)
+    sock.disconnectFromServer()
+    return True
+
+
+def listen(kind, callback, parent = None):
+    """A QLocalServer that calls `callback()` whenever `notify(kind)` is sent."""
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtNetwork import QLocalServer
+
+    server = QLocalServer(parent)
+    name = block_name(kind)
+    QLocalServer.removeServer(name)              # stale socket of a crashed window
+
+    def accept():
+        while server.hasPendingConnections():
+            conn = server.nextPendingConnection()
+            conn.disconnected.connect(conn.deleteLater)
+            conn.readyRead.connect(conn.readAll)
+        # after the sender's slot returns
+        QTimer.singleShot(0, callback)
+
+    server.newConnection.connect(accept)
+    server.listen(name)
+    return server
@@ -3,17 +3,40 @@ import threading
 import time
 import json
 import uuid
+import struct
+import contextlib
+import collections
 import warnings
 import numpy as np
 import logging
 from PyQt6.QtNetwork import QLocalSocket, QAbstractSocket
 from PyQt6.QtCore import QCoreApplication, QSharedMemory
+from atomize.main import protocol
 
 logging.root.setLevel(logging.WARNING)
 
+# Ring-mode ack: b'ok' followed by the little-endian sequence number of the
+# slot the receiver has just copied out of shared memory.
+RING_ACK = struct.Struct('<2sI')
+# Frames in the ring start on a cache-line boundary.
+RING_ALIGN = 64
+# Arrays packed into one batch payload start on this boundary.
+BATCH_ALIGN = 16
+# Array dtypes that cross the shared memory as they are; anything else is
+# sent as float64. The receiver reinterprets the block with meta['dtype'] and
+# only converts when pyqtgraph cannot take the array directly (complex).
+WIRE_DTYPES = frozenset(np.dtype(t) for t in (
+    'float64', 'float32', 'int8', 'uint8', 'int16', 'uint16', 'int32',
+    'complex64', 'complex128'))
+# Display-only downcast applied in float32 mode (see LivePlotClient.float32).
+_FLOAT32_DTYPES = {np.dtype('float64'): np.float32, np.dtype('complex128'): np.complex64}
+# Operations whose array holds an x axis next to the data: never downcast.
+_EXACT_OPERATIONS = frozenset({'plot_xy'})
+
 class LivePlotClient(object):
     
-    def __init__(self, timeout=2000, size=2**28):
+    def __init__(self, timeout=2000, size=2**28, slots=1, float32=False,
+                 version=protocol.PROTOCOL_VERSION):
         # from 06-08-2021; Freezing GUI when import general module
         
         #self.app = QCoreApplication.instance()
@@ -60,15 +83,80 @@ class LivePlotClient(object):
         # leftover byte should an 'ok' ever arrive split across reads.
         self._acks_pending = 0
         self._ack_carry = 0
+        # Ring-buffer mode (slots > 1): the shared block is used as a FIFO ring
+        # of variable-size regions, one per frame in flight. Every frame carries
+        # a 'slot' sequence number and the byte 'offset' of its array; the
+        # receiver acks each one with RING_ACK naming that sequence number, so
+        # an ack frees exactly the region it belongs to and a late ack can
+        # never be mistaken for another frame's. Up to `slots` frames can be
+        # queued while the receiver drains them, instead of one full GUI round
+        # trip per send. slots=1, the default, keeps the strict
+        # one-frame-in-flight 'ok' handshake: the ring only pays off when the
+        # sender has work of its own between frames (bench_liveplot.py, 2D
+        # float64 512x2048: 332 vs 279 frames/s with --render-ms 2 --work-ms 2),
+        # and is slower when the receiver keeps up (436 vs 654 frames/s, p99
+        # 10.7 vs 4.3 ms with --render-ms 0).
+        self.slots = max(1, int(slots))
+        self._ring = collections.OrderedDict()   # seq -> (offset, nbytes)
+        self._ring_head = 0
+        self._ring_seq = 0
+        self._ack_buf = bytearray()
+        # Send float64 / complex128 frames as float32 / complex64. Every frame
+        # on this connection is display-only, so single precision halves the
+        # memcpy and the receiver copy of the data. A plot_xy frame carries its
+        # x axis in the array (epoch seconds of a time axis, a field or
+        # frequency axis far from zero), so it always keeps float64.
+        self.float32 = bool(float32)
+        # Per-thread batch being collected by batch() / begin_batch(): a list
+        # of (meta, arr) sends plus the nesting depth. Only the thread that
+        # opened the batch is diverted; the plot worker keeps sending directly.
+        self._batch_local = threading.local()
+        # Wire protocol version agreed with the receiver (see protocol.py):
+        # 2 sends variable-length binary meta headers with interned strings,
+        # 1 the fixed 320-byte JSON frames. A version 1 receiver predates the
+        # ring and batch frames too, so it gets the one-frame handshake and
+        # batches sent item by item.
+        self.version = self._negotiate(version)
+        self._encoder = protocol.FrameEncoder() if self.version >= 2 else None
+        if self.version < 2:
+            self.slots = 1
         
         atexit.register(self.close)
 
+    def _negotiate(self, version):
+        """Propose `version` with a hello frame and return the version the
+        receiver answers with (1 if it does not know the hello)."""
+        if version < 2:
+            return 1
+        self.sock.write(protocol.hello_frame(version))
+        self.sock.flush()
+        reply = b''
+        deadline = time.monotonic() + self.timeout / 1000.0
+        while len(reply) < 2:
+            remaining = deadline - time.monotonic()
+            if self.sock.bytesAvailable() == 0 and (remaining <= 0 or
+                    not self.sock.waitForReadyRead(max(1, int(remaining * 1000)))):
+                logging.warning("Timeout: Receiver did not answer the protocol hello for %s ms" % self.timeout)
+                # Its late answer is paid off like a late version 1 'ok'.
+                self._acks_pending = 1
+                self._ack_carry = len(reply)
+                return 1
+            reply += bytes(self.sock.read(2 - len(reply)))
+        return min(version, protocol.parse_hello_reply(reply))
+
     def close(self):
+        # Let the receiver copy out any queued ring frames before the block
+        # goes away.
+        self.flush()
         self.shared_mem.detach()
 
     def send_to_plotter(self, meta, arr=None):
         if not self.is_connected:
             return
+        items = getattr(self._batch_local, 'items', None)
+        if items is not None:
+            items.append((meta, arr))
+            return
         # Both the AtomizePlotWorker daemon thread (async pr= plots) and the
         # caller's own thread (synchronous plot / incremental append) reach
         # this method on the SAME LivePlotClient. Serialise the whole
@@ -76,8 +164,84 @@ class LivePlotClient(object):
         # race: concurrent QSharedMemory.lock() ("QSharedMemory::lock: already
         # locked") and interleaved 320-byte meta writes that steal each
         # other's ack ("Receiver did not send 'ok'").
+        meta, arr = self._pack_frame(meta, arr)
         with self._send_lock:
-            self._send_to_plotter_locked(meta, arr)
+            self._send_locked(meta, [(0, arr)] if arr is not None else [])
+
+    def begin_batch(self):
+        """Start collecting this thread's sends instead of sending them (see
+        batch). Nested calls join the outermost batch."""
+        local = self._batch_local
+        local.depth = getattr(local, 'depth', 0) + 1
+        if local.depth == 1:
+            local.items = []
+
+    def end_batch(self):
+        """Stop collecting and return the collected (meta, arr) sends; the
+        inner end of a nested batch returns an empty list."""
+        local = self._batch_local
+        local.depth -= 1
+        if local.depth > 0:
+            return []
+        items, local.items = local.items, None
+        return items
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Collect every plot operation made by this thread inside the block
+        and send them, on exit, as ONE frame: all arrays in one shared-memory
+        payload with a single meta index and a single ack, applied by the
+        receiver in one pass (so one repaint). Arrays are read when the block
+        exits."""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            items = self.end_batch()
+        self.send_batch(items)
+
+    def send_batch(self, items):
+        """Send (meta, arr) pairs collected by begin_batch / end_batch as one
+        'batch' frame. The payload holds every array (BATCH_ALIGN-aligned)
+        followed by the index: the item metas as concatenated protocol frames
+        whose 'offset' is relative to the payload start. A version 1 receiver
+        gets the items one frame each."""
+        if not items or not self.is_connected:
+            return
+        if self._encoder is None:
+            for meta, arr in items:
+                meta, arr = self._pack_frame(meta, arr)
+                with self._send_lock:
+                    self._send_locked(meta, [(0, arr)] if arr is not None else [])
+            return
+        metas = []
+        parts = []
+        pos = 0
+        for meta, arr in items:
+            meta, arr = self._pack_frame(meta, arr)
+            if arr is not None:
+                pos = -(-pos // BATCH_ALIGN) * BATCH_ALIGN
+                meta['offset'] = pos
+                parts.append((pos, arr))
+                pos += arr.nbytes
+            metas.append(meta)
+        pos = -(-pos // BATCH_ALIGN) * BATCH_ALIGN
+        with self._send_lock:
+            # The index defines interned strings, so it is encoded under the
+            # lock, in socket order, and forgotten again if it is not sent.
+            mark = self._encoder.mark()
+            index = b''.join(self._encoder.encode(meta) for meta in metas)
+            if pos + len(index) > self.shared_mem.size():
+                self._encoder.rollback(mark)
+                raise ValueError("Batch too big %s > %s" % (pos + len(index), self.shared_mem.size()))
+            parts.append((pos, np.frombuffer(index, dtype=np.uint8)))
+            meta = {
+                'operation': 'batch',
+                'count': len(metas),
+                'index_offset': pos,
+                'index_size': len(index),
+            }
+            self._send_locked(meta, parts)
 
     def _drain_acks(self):
         """Wait until every sent frame has been acked ('ok', 2 bytes each) or
@@ -97,42 +261,94 @@ class LivePlotClient(object):
         if self._acks_pending < 0:
             self._acks_pending = 0
 
-    def _send_to_plotter_locked(self, meta, arr=None):
+    def _pack_frame(self, meta, arr=None):
+        """Fill in the array fields of `meta` and return (meta, array in its
+        wire dtype), or (meta, None) for an operation without an array."""
         if meta.get("name") is None:
             meta["name"] = "*"
+        if arr is None:
+            meta['arrsize'] = 0
+            return meta, None
+        # Normalize to a contiguous array of a wire dtype without an extra copy
+        # when the caller already handed us one (the live-plot case); it is
+        # then transferred into the shared block with a single np.copyto. This
+        # replaces the former np.array + .astype + .tobytes + slice-assign chain
+        # (four ~20 MB copies of a 2D frame, three of them holding the GIL) that
+        # was stalling the measurement thread; np.copyto releases the GIL for
+        # the memcpy.
+        arr = self._wire_array(arr, exact=meta.get('operation') in _EXACT_OPERATIONS)
+        if arr.nbytes > self.shared_mem.size():
+            raise ValueError("Array too big %s > %s" % (arr.nbytes, self.shared_mem.size()))
+        meta['arrsize'] = arr.nbytes
+        meta['dtype'] = str(arr.dtype)
+        meta['shape'] = arr.shape
+        return meta, arr
 
-        # If the previous frame's ack timed out, the receiver may still be
-        # copying that frame out of shared memory. Never overwrite the block
-        # while an ack is outstanding, or the old meta gets rendered with this
-        # frame's array.
-        self._drain_acks()
-
-        if arr is not None:
-            # Normalize to a contiguous float64 array without an extra copy when the
-            # caller already handed us one (the live-plot case), then transfer it into
-            # the shared block with a single np.copyto. This replaces the former
-            # np.array + .astype + .tobytes + slice-assign chain (four ~20 MB copies of
-            # a 2D frame, three of them holding the GIL) that was stalling the
-            # measurement thread; np.copyto releases the GIL for the memcpy.
-            arr = np.ascontiguousarray(arr, dtype=np.float64)
-            arrsize = arr.nbytes
-            if arrsize > self.shared_mem.size():
-                raise ValueError("Array too big %s > %s" % (arrsize, self.shared_mem.size()))
-            
-            meta['arrsize'] = arrsize
-            meta['dtype'] = str(arr.dtype)
-            meta['shape'] = arr.shape
-            
-            if self.shared_mem.lock():
-                try:
-                    ptr = self.shared_mem.data()
-                    dst = np.frombuffer(memoryview(ptr).cast('B')[:arrsize], dtype=np.float64)
-                    np.copyto(dst, arr.reshape(-1))
-                finally:
-                    self.shared_mem.unlock()
+    def _send_locked(self, meta, parts):
+        """Copy `parts`, a list of (byte offset within the frame, contiguous
+        array), into the shared block and send the meta frame, using the ring
+        (slots > 1) or the strict one-frame handshake."""
+        nbytes = max((rel + a.nbytes for rel, a in parts), default=0)
+        if self.slots > 1:
+            offset = self._ring_reserve(nbytes)
+            seq = self._ring_seq
+            self._ring_seq = (seq + 1) & 0xFFFFFFFF
+            meta['slot'] = seq
+            meta['offset'] = offset
         else:
-            meta['arrsize'] = 0
+            # If the previous frame's ack timed out, the receiver may still be
+            # copying that frame out of shared memory. Never overwrite the block
+            # while an ack is outstanding, or the old meta gets rendered with
+            # this frame's array.
+            self._drain_acks()
+            offset = 0
+        meta['arrsize'] = nbytes
 
+        if nbytes and self.shared_mem.lock():
+            try:
+                block = memoryview(self.shared_mem.data()).cast('B')
+                for rel, a in parts:
+                    start = offset + rel
+                    dst = np.frombuffer(block[start:start + a.nbytes], dtype=a.dtype)
+                    np.copyto(dst, a.reshape(-1))
+            finally:
+                self.shared_mem.unlock()
+
+        self.sock.write(self._encode_meta(meta))
+        self.sock.flush()
+
+        if self.slots > 1:
+            self._ring[seq] = (offset, nbytes)
+            if nbytes:
+                self._ring_head = -(-(offset + nbytes) // RING_ALIGN) * RING_ALIGN
+            # Pick up whatever acks are already here without waiting; the next
+            # send only blocks if the ring is actually full.
+            self._read_ring_acks(0)
+        else:
+            self._acks_pending += 1
+            self._drain_acks()
+            self.sock.waitForBytesWritten(1000)
+
+    def _wire_array(self, arr, exact=False):
+        """Contiguous array in its native dtype when that is a wire dtype
+        (int16 / int32 digitizer frames stay 2-4x smaller than float64),
+        otherwise float64; float64 / complex128 become float32 / complex64 in
+        float32 mode unless `exact` (the array holds an axis). No copy when the
+        input already qualifies."""
+        arr = np.asarray(arr)
+        dtype = arr.dtype if arr.dtype in WIRE_DTYPES else np.dtype(np.float64)
+        if self.float32 and not exact:
+            dtype = _FLOAT32_DTYPES.get(dtype, dtype)
+        return np.ascontiguousarray(arr, dtype=dtype)
+
+    def _encode_meta(self, meta):
+        if self._encoder is not None:
+            return self._encoder.encode(meta)
+        return self._encode_legacy(meta)
+
+    @staticmethod
+    def _encode_legacy(meta):
+        """Version 1 frame: the meta as JSON padded to 320 bytes."""
         meta_json = json.dumps(meta).encode('utf-8')
         # The descriptive label ('value') is the only user-controlled
         # variable-length field. update_z carries extra 'index'/'full_shape'
@@ -148,15 +364,77 @@ class LivePlotClient(object):
         if len(meta_json) > 320:
             raise ValueError("meta object is too large (> 320 char)")
 
-        meta_bytes = meta_json.ljust(320, b' ') 
+        return meta_json.ljust(320, b' ')
 
-        self.sock.write(meta_bytes)
-        self.sock.flush()
+    def _read_ring_acks(self, wait_ms=0):
+        """Consume every RING_ACK available on the socket (waiting up to
+        `wait_ms` for the first byte) and free the slots they name. Returns
+        False when nothing arrived within the wait. Acks for slots that are no
+        longer tracked (reclaimed after a timeout) are ignored."""
+        if self.sock.bytesAvailable() == 0 and not self.sock.waitForReadyRead(wait_ms):
+            return False
+        self._ack_buf += bytes(self.sock.readAll())
+        size = RING_ACK.size
+        n = len(self._ack_buf) - len(self._ack_buf) % size
+        for _, seq in RING_ACK.iter_unpack(bytes(self._ack_buf[:n])):
+            self._ring.pop(seq, None)
+        del self._ack_buf[:n]
+        return True
 
-        self._acks_pending += 1
-        self._drain_acks()
+    def _ring_fit(self, nbytes):
+        """Byte offset of a free region of `nbytes` in the ring, or None if
+        the in-flight frames leave no contiguous gap that large. In-flight
+        regions are allocated in FIFO order, so the used part of the ring is
+        the single arc from the oldest region (tail) up to the head. The ring
+        wraps back to offset 0 as soon as the frame fits below the tail, which
+        keeps the touched part of the 256 MB block (and so the page/cache
+        working set of both processes) down to the frames actually in flight."""
+        if nbytes == 0:
+            return 0
+        tail = next((off for off, size in self._ring.values() if size), None)
+        if tail is None:
+            self._ring_head = 0
+            return 0
+        head = self._ring_head
+        if head > tail:
+            if tail >= nbytes:
+                return 0
+            if self.shared_mem.size() - head >= nbytes:
+                return head
+            return None
+        if tail - head >= nbytes:
+            return head
+        return None
+
+    def _ring_reserve(self, nbytes):
+        """Wait until a slot and `nbytes` of ring space are free. On timeout
+        the oldest in-flight slot is reclaimed (the receiver is gone or stuck),
+        matching the legacy path, which overwrites the block after the ack
+        timeout rather than blocking the measurement forever."""
+        deadline = time.monotonic() + self.timeout / 1000.0
+        self._read_ring_acks(0)
+        while True:
+            if len(self._ring) < self.slots:
+                offset = self._ring_fit(nbytes)
+                if offset is not None:
+                    return offset
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._read_ring_acks(max(1, int(remaining * 1000))):
+                if time.monotonic() >= deadline:
+                    logging.warning("Timeout: Receiver did not free a slot for %s ms" % self.timeout)
+                    self._ring.popitem(last=False)
 
-        self.sock.waitForBytesWritten(1000)
+    def flush(self):
+        """Wait (bounded by the timeout) until the receiver has acked every
+        queued ring frame."""
+        if self.slots == 1 or not self.is_connected:
+            return
+        with self._send_lock:
+            deadline = time.monotonic() + self.timeout / 1000.0
+            while self._ring:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._read_ring_acks(max(1, int(remaining * 1000))):
+                    break
 
     def plot_y(self, name, arr, extent=None, start_step=(0, 1), label=''):
         arr = np.asarray(arr)
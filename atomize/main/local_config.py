@@ -60,3 +60,8 @@ def load_scripts(src):
             print("During copying configs file the error occures: Permission denied.")
 
     return  os.path.join( config_dir, '..')
+
+def load_autosave():
+    # per-scan journals of running experiments (general_modules.scan_writer)
+    app_name = "atomize-itc"
+    return os.path.join( get_user_documents_dir(), app_name, "autosave" )
@@ -14,6 +14,8 @@ from PyQt6.QtGui import QColor
 from atomize.main.main_window import MainWindow, NameList
 from atomize.general_modules.gui_style import apply_app_style, CHECKBOX_STYLE
 import atomize.general_modules.last_dir as ldir
+import atomize.general_modules.csv_reader as csv_reader
+import atomize.general_modules.treatment_mailbox as mailbox
 os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
 
 ###
@@ -34,11 +36,11 @@ class MyExtendedNameList(NameList):
     def send_to_treatment(self):
         """
         Hand the selected plot off to the standalone Data Treatment window.
-        1D plots (docks with named curves) go to the 1D tool via
-        libs/treatment_buffer.csv; 2D image plots go to the 2D tool via
-        libs/treatment_buffer_2d.npz. Either way this is the cross-process
-        bridge the standalone windows read (they cannot see the main window's
-        in-memory plots directly); they pick it up with "Load from plot".
+        1D plots (docks with named curves) go to the 1D tool, 2D image plots
+        to the 2D tool, through the shared-memory treatment_mailbox. It is the
+        cross-process bridge the standalone windows read (they cannot see the
+        main window's in-memory plots directly); an open window is notified
+        and loads at once, a new one reads it on start or on "Load from plot".
         """
         index = self.namelist_view.currentIndex()
         item = self.namelist_model.itemFromIndex(index)
@@ -60,12 +62,10 @@ class MyExtendedNameList(NameList):
                 'Nothing to send for "%s" (no 1D curves or 2D image).' % name)
 
     def _send_1d_to_treatment(self, name, dock):
-        """Interleaved x0, y0, x1, y1, ... columns padded with NaN; a
-        '# labels:' header line names the curves."""
-        labels = []
-        columns = []
+        """Post the raw curves, with their labels, on-screen colours and the X
+        axis name, to the 1D treatment mailbox."""
+        curves = []
         colors = []
-        maxlen = 0
         used_colors = getattr(dock, 'used_colors', {})
         for label in dock.curves:
             x, y = dock.get_raw_data(label)
@@ -73,8 +73,7 @@ class MyExtendedNameList(NameList):
             y = np.asarray(y, dtype=float)
             if x.size == 0:
                 continue
-            labels.append(str(label).replace('|', '/'))
-            columns.append((x, y))
+            curves.append((str(label), x, y))
             # carry the on-screen colour so Data Treatment can show each curve in
             # exactly the colour the plot used, regardless of load order
             pen = used_colors.get(label)
@@ -83,17 +82,11 @@ class MyExtendedNameList(NameList):
                 colors.append('%d,%d,%d' % (c.red(), c.green(), c.blue()))
             except Exception:
                 colors.append('')
-            maxlen = max(maxlen, x.size, y.size)
 
-        if not columns:
+        if not curves:
             self.window.text_errors.appendPlainText('No data in "%s".' % name)
             return
 
-        buf = np.full((maxlen, 2*len(columns)), np.nan)
-        for i, (x, y) in enumerate(columns):
-            buf[:x.size, 2*i] = x
-            buf[:y.size, 2*i + 1] = y
-
         # carry the X axis name+unit so the 1D tool can label and SI-prefix it
         # (a time axis in 's' then reads in ns rather than raw 2e-9).
         xname = ''
@@ -105,21 +98,20 @@ class MyExtendedNameList(NameList):
         except Exception:
             xname = ''
 
-        buffer_path = os.path.join(self.window.path_to_main, 'treatment_buffer.csv')
-        header = 'Atomize data treatment buffer\nlabels: ' + '|'.join(labels)
-        if any(colors):
-            header += '\ncolors: ' + '|'.join(colors)
-        if xname:
-            header += '\nxname: ' + xname.replace('\n', ' ')
-        np.savetxt(buffer_path, buf, delimiter=',', fmt='%.6e', header=header, comments='# ')
+        try:
+            mailbox.send_curves(curves, colors = colors, xname = xname.replace('\n', ' '))
+        except Exception as e:
+            self.window.text_errors.appendPlainText('Could not send "%s": %s' % (name, e))
+            return
+        mailbox.notify(mailbox.KIND_1D)
 
         self.window.text_errors.appendPlainText('Sent "%s" to Data Treatment buffer.' % name)
         if self.window.process_treatment.state() == QtCore.QProcess.ProcessState.NotRunning:
             self.window.start_treatment_control()
 
     def _send_2d_to_treatment(self, name, dock):
-        """Dump the selected 2D image (and its axis geometry) to
-        libs/treatment_buffer_2d.npz for the 2D Data Treatment window. The
+        """Post the selected 2D image (and its axis geometry) to the 2D
+        treatment mailbox for the 2D Data Treatment window. The
         image stack is (frames, nX, nY); frame 0 = real/I, frame 1 = imag/Q.
         We transpose each frame back to the tool's [trace, point] layout."""
         full = getattr(dock.img_view, 'image', None)
@@ -150,10 +142,13 @@ class MyExtendedNameList(NameList):
         except Exception:
             ynm, ysc = 'Y', ''
 
-        buffer_path = os.path.join(self.window.path_to_main, 'treatment_buffer_2d.npz')
-        np.savez(buffer_path, i=i, q=q,
-                 geom=np.array([x0, dx, y0, dy], dtype=float),
-                 labels=np.array([str(xnm), str(xsc), str(ynm), str(ysc)]))
+        try:
+            mailbox.send(mailbox.KIND_2D, {'i': i, 'q': q}, geom = [x0, dx, y0, dy],
+                         labels = [str(xnm), str(xsc), str(ynm), str(ysc)])
+        except Exception as e:
+            self.window.text_errors.appendPlainText('Could not send "%s": %s' % (name, e))
+            return
+        mailbox.notify(mailbox.KIND_2D)
 
         self.window.text_errors.appendPlainText(
             'Sent 2D "%s" to Data Treatment (2D) buffer.' % name)
@@ -169,16 +164,8 @@ class MyExtendedNameList(NameList):
         self.open_dir = os.path.dirname(filename)
         ldir.save('data', self.open_dir)      # remember the data folder
 
-        header_lines = []
-
-        with open(file_path, 'r') as file_to_read:
-            for line in file_to_read:
-                if line.startswith('#'):
-                    header_lines.append(line)
-                else:
-                    break
-
-        header_count = len(header_lines)
+        # '#' header lines and data in one pass (csv_reader)
+        header_lines, temp = csv_reader.read(file_path)
         header_text = "".join(header_lines)
 
         start_field_match = re.search(r'Start\s*Field\s*[:=]\s*([+-]?\d*\.\d+|[+-]?\d+)', header_text, re.IGNORECASE)
@@ -196,8 +183,6 @@ class MyExtendedNameList(NameList):
         start_field = float(start_field_match.group(1)) if start_field_match else 0
         field_step = float(field_step_match.group(1)) if field_step_match else 1
 
-        temp = np.genfromtxt(file_path, dtype = float, delimiter = ',', skip_header = header_count) 
-
         data_modified = temp.copy()
 
         data_modified[:, 0] = data_modified[:, 0] - data_modified[:, 0]
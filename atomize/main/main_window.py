@@ -26,11 +26,14 @@ from PyQt6.QtWidgets import QFileDialog, QMessageBox, QListView, QDockWidget, QV
 from PyQt6.QtNetwork import QLocalServer
 from PyQt6 import QtCore, QtGui
 from pyqtgraph.dockarea import DockArea
+from atomize.main.client import RING_ACK
+from atomize.main import protocol
 import atomize.main.queue as queue
 import atomize.main.codeeditor as codeedit
 import atomize.main.local_config as lconf
 import atomize.general_modules.csv_opener_saver as openfile
 import atomize.general_modules.last_dir as ldir
+import atomize.general_modules.csv_reader as csv_reader
 os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
 
 class MainWindow(QMainWindow):
@@ -80,6 +83,8 @@ class MainWindow(QMainWindow):
         self.conns = []
         self.shared_mems = []
         self.recv_buffers = {}   # id(conn) -> bytearray of un-parsed meta-frame bytes
+        self.ring_conns = set()  # id(conn) of clients using the multi-slot ring
+        self.decoders = {}       # id(conn) -> protocol.FrameDecoder of version 2 clients
         signal.signal(signal.SIGINT, self.close)
         self.system = platform.system()
         self.system_encoding = locale.getpreferredencoding()
@@ -217,6 +222,8 @@ class MainWindow(QMainWindow):
         conn.readyRead.connect(lambda: self.read_from(conn, memory))
         conn.disconnected.connect(memory.detach)
         conn.disconnected.connect(lambda: self.recv_buffers.pop(id(conn), None))
+        conn.disconnected.connect(lambda: self.ring_conns.discard(id(conn)))
+        conn.disconnected.connect(lambda: self.decoders.pop(id(conn), None))
         conn.write(b'ok')
 
     def read_from(self, conn, memory):
@@ -234,27 +241,64 @@ class MainWindow(QMainWindow):
         # across fragment boundaries. EVERY 320-byte frame is acked with exactly one
         # 'ok' (the client counts them), so the per-frame handshake keeps the client
         # at most one frame ahead and the array in shared memory always pairs with
-        # the meta being processed.
+        # the meta being processed. A ring-mode client keeps up to N frames queued,
+        # each in its own region of the block; those acks carry the frame's slot
+        # number so the client frees exactly that region.
         buf = self.recv_buffers.get(id(conn))
         if buf is None:
             buf = bytearray()
             self.recv_buffers[id(conn)] = buf
         buf += bytes(conn.readAll())
 
-        while len(buf) >= 320:
-            frame = bytes(buf[:320])
-            del buf[:320]
+        # A client that negotiated protocol version 2 (see protocol.py) sends
+        # length-prefixed binary meta frames instead; the switch can happen in
+        # the middle of buf, right after the hello, so the decoder is looked
+        # up again for every frame.
+        while True:
+            decoder = self.decoders.get(id(conn))
+            if decoder is not None:
+                try:
+                    self.meta = decoder.next_frame(buf)
+                except protocol.ProtocolError:
+                    # Length-prefixed, so the stream stays in sync; the
+                    # client reclaims the unacked slot on its own timeout.
+                    logging.exception('LivePlot: malformed frame')
+                    continue
+                if self.meta is None:
+                    break
+            else:
+                if len(buf) < protocol.LEGACY_FRAME:
+                    break
+                frame = bytes(buf[:protocol.LEGACY_FRAME])
+                del buf[:protocol.LEGACY_FRAME]
 
-            try:
-                self.meta = json.loads(frame.decode())
-            except (json.decoder.JSONDecodeError, UnicodeDecodeError):
-                #print('error')
-                # Still ack the unparseable frame: the client counts one 'ok'
-                # per frame sent, and a silently dropped ack would leave it
-                # waiting out its full timeout on every later frame.
-                conn.write(b'ok')
-                conn.flush()
-                continue
+                try:
+                    self.meta = json.loads(frame.decode())
+                except (json.decoder.JSONDecodeError, UnicodeDecodeError):
+                    #print('error')
+                    # Still ack the unparseable frame: the client counts one 'ok'
+                    # per frame sent, and a silently dropped ack would leave it
+                    # waiting out its full timeout on every later frame. A
+                    # ring-mode client acks by slot number, which is unknown here;
+                    # it reclaims that slot on its own timeout instead.
+                    if id(conn) not in self.ring_conns:
+                        conn.write(b'ok')
+                        conn.flush()
+                    continue
+
+                if self.meta.get('operation') == 'hello':
+                    version = min(int(self.meta.get('version', 1)), protocol.PROTOCOL_VERSION)
+                    if version >= 2:
+                        self.decoders[id(conn)] = protocol.FrameDecoder()
+                    conn.write(protocol.hello_reply(version))
+                    conn.flush()
+                    continue
+
+            # Ring-buffer clients tag every frame with a 'slot' sequence number
+            # and the byte 'offset' of its array in the shared block.
+            slot = self.meta.get('slot')
+            if slot is not None:
+                self.ring_conns.add(id(conn))
 
             if self.meta['arrsize'] != 0:
                 memory.lock()
@@ -262,11 +306,16 @@ class MainWindow(QMainWindow):
                     raw_data = memory.data()
                     if raw_data is not None:
                         # Slice and create a view directly without copying yet
-                        ba = raw_data[:self.meta['arrsize']]
-                        # interpreted as the correct dtype
-                        arr = np.frombuffer(ba, dtype = self.meta['dtype'])
-                        # Reshape first, THEN copy while still LOCKED to ensure data integrity
-                        arr = arr.reshape(self.meta['shape']).copy()
+                        offset = self.meta.get('offset', 0)
+                        ba = raw_data[offset:offset + self.meta['arrsize']]
+                        if self.meta['operation'] == 'batch':
+                            # raw payload; do_batch slices the items out of it
+                            arr = np.frombuffer(ba, dtype = np.uint8).copy()
+                        else:
+                            # interpreted as the correct dtype
+                            arr = np.frombuffer(ba, dtype = self.meta['dtype'])
+                            # Reshape first, THEN copy while still LOCKED to ensure data integrity
+                            arr = arr.reshape(self.meta['shape']).copy()
                     else:
                         arr = None
                 finally:
@@ -284,7 +333,10 @@ class MainWindow(QMainWindow):
             # below: without the flush the 2 bytes sit in Qt's write buffer until
             # the event loop resumes after the render, tripping the client-side
             # "Receiver did not send 'ok'" timeout on big 2D frames.
-            conn.write(b'ok')
+            if slot is None:
+                conn.write(b'ok')
+            else:
+                conn.write(RING_ACK.pack(b'ok', slot))
             conn.flush()
 
             # The frame is already acked and its array already copied out of
@@ -292,11 +344,49 @@ class MainWindow(QMainWindow):
             # loop: any sibling frame already coalesced into buf would otherwise
             # go unparsed and unacked, stalling the sending client for its full
             # timeout. Catch, log, and keep draining the buffer.
+            if self.meta['operation'] == 'batch':
+                self.do_batch(arr, decoder)
+                continue
             try:
                 self.do_operation(arr)
             except Exception:
                 logging.exception('LivePlot do_operation failed on a frame')
 
+    def do_batch(self, payload, decoder=None):
+        """
+        Apply every plot operation of one 'batch' frame (LivePlotClient.batch).
+        The payload holds the item arrays followed by an index of the item
+        metas (protocol frames); each array is a view into the payload copy,
+        reinterpreted with the item's dtype and shape. All items are applied
+        in this one readyRead pass, so the plots they touch repaint together,
+        once. A broken frame or item is logged and skipped: raising here would
+        leave the sibling frames of the read buffer unparsed and unacked.
+        """
+        meta = self.meta
+        # version 1 clients never send batch frames; no shared block, no payload
+        if payload is None or decoder is None:
+            logging.warning('LivePlot: batch frame without a payload or protocol')
+            return
+        try:
+            # The index shares the connection's interned strings, so it is
+            # decoded with the decoder of the connection it came from.
+            i0 = meta['index_offset']
+            index = decoder.decode_all(payload[i0:i0 + meta['index_size']].tobytes())
+        except (protocol.ProtocolError, KeyError, TypeError, ValueError):
+            logging.warning('LivePlot: unreadable batch index')
+            return
+        for item in index:
+            try:
+                if item['arrsize'] != 0:
+                    o = item['offset']
+                    arr = payload[o:o + item['arrsize']].view(item['dtype']).reshape(item['shape'])
+                else:
+                    arr = None
+                self.meta = item
+                self.do_operation(arr)
+            except Exception:
+                logging.exception('LivePlot do_operation failed on a batch item')
+
     def do_operation(self, arr = None):
         def clear(name):
             self.namelist[name].clear()
@@ -311,6 +401,12 @@ class MainWindow(QMainWindow):
         operation = meta['operation']
         name = meta['name']
 
+        # Frames arrive in their native dtype (int16 / int32 / float32 are
+        # drawn as they are); pyqtgraph cannot draw complex data, so those
+        # show their real part, taken as a view only here at display time.
+        if arr is not None and np.iscomplexobj(arr):
+            arr = arr.real
+
         if name in self.namelist:
             pw = self.namelist[name]
             #if pw.closed:
@@ -405,31 +501,16 @@ class MainWindow(QMainWindow):
             scat = meta['Scatter']
             taxis = meta['TimeAxis']
             verline = meta['Vline']
-            
-            xs, ys = pw.get_raw_data(label)
-            new_ys = list(ys)
-            new_ys.append(meta['value'])
-            start_step = meta['start_step']
-            if start_step is not None:
-                x0, dx = start_step
-                nx = len(new_ys)
-                xs = np.linspace(x0, x0 + (nx - 1)*dx, nx)
-                pw.plot(xs, new_ys, name=label, xname=xnam, xscale =xscal, yname=ynam,\
-                 yscale =yscal, scatter=scat, timeaxis=taxis, vline=verline)
-            else:
-                pw.plot(new_ys, name=label, xname=xnam, xscale =xscal, yname=ynam,\
-                 yscale =yscal, scatter=scat, timeaxis=taxis, vline=verline)
+
+            pw.append_point(label, meta['value'], start_step=meta['start_step'],\
+             xname=xnam, xscale =xscal, yname=ynam, yscale =yscal, scatter=scat,\
+             timeaxis=taxis, vline=verline)
 
 
         elif operation == 'append_xy':
             label = meta['label']
-            xs, ys = pw.get_raw_data(label)
             xn, yn = meta['value']
-            new_xs = list(xs)
-            new_xs.append(xn)
-            new_ys = list(ys)
-            new_ys.append(yn)
-            pw.plot(new_xs, new_ys, parametric=True, name=label, scatter='False')
+            pw.append_point(label, yn, x=xn, parametric=True, scatter='False')
 
 
         elif operation == 'update_z':
@@ -445,6 +526,10 @@ class MainWindow(QMainWindow):
             if store is None or store.shape != full_shape:
                 store = np.zeros(full_shape, dtype=arr.dtype)
                 pw._z_store = store
+            elif not np.can_cast(arr.dtype, store.dtype):
+                # e.g. a float patch into a store built from an int16 frame
+                store = store.astype(np.result_type(store, arr))
+                pw._z_store = store
             store[..., i0:i0 + arr.shape[-1]] = arr
             start_step = meta['start_step']
             xnam = meta['Xname']
@@ -469,14 +554,6 @@ class MainWindow(QMainWindow):
 
 
         elif operation == 'append_z':
-            image = pw.get_data()
-            if image is None:
-                image = np.array([arr])
-            else:
-                try:
-                    image = np.vstack((np.transpose(image), [arr]))
-                except ValueError:
-                    image = np.array([arr])
             start_step = meta['start_step']
             xnam = meta['Xname']
             xscal = meta['X']
@@ -488,10 +565,10 @@ class MainWindow(QMainWindow):
                 (x0, dx), (y0, dy) = start_step
                 pw.setAxisLabels(xname=xnam, xscale =xscal, yname=ynam, yscale =yscal,\
                  zname=znam, zscale =zscal)
-                pw.setImage(image, pos=(x0, y0), scale=(dx, dy), axes={'y':0, 'x':1}, autoLevels=False)
+                pw.append_row(arr, pos=(x0, y0), scale=(dx, dy))
             else:
                 pw.setAxisLabels(xname=xnam, xscale =xscal, yname=ynam, yscale =yscal)
-                pw.setImage(image, axes={'y':0, 'x':1}, autoLevels=False)
+                pw.append_row(arr)
 
 
         elif operation == 'label':
@@ -1436,7 +1513,7 @@ class NameList(QDockWidget):
         header_text = "".join(header_lines)
 
         # read data
-        temp = np.genfromtxt(file_path, dtype = float, delimiter = ',', skip_header = 1, comments = '#') 
+        temp = csv_reader.load(file_path, skip_header = 1)
         data = np.transpose(temp)
 
         # universal name
@@ -1487,19 +1564,10 @@ class NameList(QDockWidget):
         self.open_dir = os.path.dirname(filename)
         ldir.save('data', self.open_dir)      # remember the data folder
 
-        header_lines = []
-
-        with open(file_path, 'r') as file_to_read:
-            for line in file_to_read:
-                if line.startswith('#'):
-                    header_lines.append(line)
-                else:
-                    break
-
-        header_count = len(header_lines)
+        # '#' header lines and data in one pass (csv_reader)
+        header_lines, temp = csv_reader.read(file_path)
         header_text = "".join(header_lines)
 
-        temp = np.genfromtxt(file_path, dtype = float, delimiter = ',', skip_header = header_count) 
         data = temp
 
         #name_plot = datetime.now().strftime('%d-%m-%Y %H:%M:%S')
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LivePlot wire protocol, version 2: variable-length binary meta headers.
+
+Version 1 frames are a 320-byte space-padded JSON object per plot operation
+(LivePlotClient._encode_legacy). Version 2 replaces them with a length-prefixed
+binary header:
+
+    <I   body length
+    <BBBBBIQQ  operation, flags, dtype, ndim, number of fields, slot,
+               offset, arrsize
+    <Q * ndim shape
+    fields
+
+Every field is a key id byte (255: the key follows as <B length + UTF-8),
+a value type byte and the value. Plot names, curve labels, axis names and
+units repeat on every frame, so they are interned per connection: the first
+frame that uses a string defines it (id + bytes), later frames only send the
+2-byte id. Free text ('value') is sent inline. A frame can be any size, so
+labels are never trimmed.
+
+The version is negotiated right after the shared-memory key: a client that
+speaks version 2 sends a version 1 'hello' frame carrying the highest version
+it understands. A receiver that knows the hello answers b'v' + version and
+reads binary frames from then on; an older receiver treats it as an unknown
+operation on '*' and answers the usual b'ok', and the client stays on
+version 1. Clients that never send a hello are served version 1, as before.
+"""
+
+import json
+import struct
+import numpy as np
+
+PROTOCOL_VERSION = 2
+# Version 1 meta frame size.
+LEGACY_FRAME = 320
+
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<BBBBBIQQ')
+# Header flags
+F_SLOT = 1
+DIM = struct.Struct('<Q')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_STR_DEF = struct.Struct('<HH')
+
+OPERATIONS = ('', 'plot_y', 'plot_z', 'plot_xy', 'append_y', 'append_xy',
+              'append_z', 'update_z', 'label', 'clear', 'close', 'remove',
+              'batch', 'hello')
+_OP_CODES = {op: i for i, op in enumerate(OPERATIONS)}
+# Operation code for a name outside OPERATIONS; the name follows as the
+# 'operation' field.
+_OP_OTHER = 255
+
+DTYPES = (None, 'float64', 'float32', 'int8', 'uint8', 'int16', 'uint16',
+          'int32', 'complex64', 'complex128')
+_DTYPE_CODES = {dt: i for i, dt in enumerate(DTYPES)}
+
+KEYS = ('name', 'label', 'value', 'start_step', 'rank', 'X', 'Y', 'Z',
+        'Xname', 'Yname', 'Zname', 'Scatter', 'TimeAxis', 'Vline', 'index',
+        'full_shape', 'count', 'index_offset', 'index_size', 'version',
+        'operation')
+_KEY_IDS = {key: i for i, key in enumerate(KEYS)}
+# Key id of a field whose key is not in KEYS; the key follows as <B length +
+# UTF-8 bytes.
+_KEY_INLINE = 255
+# Keys carried by the fixed header instead of fields.
+_HEADER_KEYS = frozenset(('operation', 'dtype', 'shape', 'slot', 'offset', 'arrsize'))
+# Keys whose string values are interned.
+INTERNED = frozenset(('name', 'label', 'X', 'Y', 'Z', 'Xname', 'Yname', 'Zname',
+                      'Scatter', 'TimeAxis', 'Vline'))
+# Strings interned per connection before further ones are sent inline.
+MAX_STRINGS = 4096
+
+# Value types
+T_NONE = 0
+T_INT = 1
+T_FLOAT = 2
+T_STR_REF = 3
+T_STR_DEF = 4
+T_STR = 5
+T_FLOATS = 6
+T_INTS = 7
+T_JSON = 8
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def hello_frame(version=PROTOCOL_VERSION):
+    """Version 1 frame proposing `version` to the receiver."""
+    meta = {'name': '*', 'operation': 'hello', 'version': version, 'arrsize': 0}
+    return json.dumps(meta).encode('utf-8').ljust(LEGACY_FRAME, b' ')
+
+
+def hello_reply(version):
+    return b'v' + bytes((version,))
+
+
+def parse_hello_reply(reply):
+    """Version agreed by the receiver from its 2-byte answer to hello_frame;
+    b'ok' (a receiver without the hello) means version 1."""
+    if len(reply) == 2 and reply[:1] == b'v':
+        return reply[1]
+    return 1
+
+
+class FrameEncoder(object):
+    """Client half of one connection: encodes meta dicts into version 2
+    frames and keeps the interned string table the receiver mirrors.
+    Frames must reach the socket in the order they were encoded."""
+
+    def __init__(self):
+        self.strings = {}
+        # (key, string) -> encoded field, for interned strings already sent
+        self._refs = {}
+
+    def mark(self):
+        """Opaque state to pass to rollback() if the frames encoded after
+        this call are never sent."""
+        return len(self.strings)
+
+    def rollback(self, mark):
+        if len(self.strings) > mark:
+            self.strings = {s: i for s, i in self.strings.items() if i < mark}
+            self._refs.clear()
+
+    def encode(self, meta):
+        parts = []
+        nfields = 0
+        operation = meta.get('operation', '')
+        op = _OP_CODES.get(operation, _OP_OTHER)
+        refs = self._refs
+        for key, value in meta.items():
+            if key in _HEADER_KEYS and not (key == 'operation' and op == _OP_OTHER):
+                continue
+            if type(value) is str:
+                field = refs.get((key, value))
+                if field is not None:
+                    parts.append(field)
+                    nfields += 1
+                    continue
+            kid = _KEY_IDS.get(key)
+            if kid is None:
+                kb = key.encode('utf-8')
+                parts.append(_U8.pack(_KEY_INLINE))
+                parts.append(_U8.pack(len(kb)))
+                parts.append(kb)
+            else:
+                parts.append(_U8.pack(kid))
+            value = self._value(value, key in INTERNED)
+            if kid is not None and value[0] == T_STR_REF:
+                refs[key, meta[key]] = parts[-1] + value
+            parts.append(value)
+            nfields += 1
+        if nfields > 255:
+            raise ProtocolError('too many meta fields (%d)' % nfields)
+
+        shape = tuple(meta.get('shape', ()))
+        dtype = meta.get('dtype')
+        slot = meta.get('slot')
+        head = HEADER.pack(op, F_SLOT if slot is not None else 0,
+                           _DTYPE_CODES[dtype], len(shape), nfields,
+                           slot or 0, meta.get('offset', 0), meta.get('arrsize', 0))
+        body = b''.join([head, *(DIM.pack(n) for n in shape), *parts])
+        return LENGTH.pack(len(body)) + body
+
+    def _value(self, value, intern):
+        if value is None:
+            return _U8.pack(T_NONE)
+        if isinstance(value, str):
+            raw = value.encode('utf-8')
+            if intern and len(raw) <= 0xFFFF:
+                sid = self.strings.get(value)
+                if sid is not None:
+                    return _U8.pack(T_STR_REF) + _U16.pack(sid)
+                if len(self.strings) < MAX_STRINGS:
+                    sid = len(self.strings)
+                    self.strings[value] = sid
+                    return _U8.pack(T_STR_DEF) + _STR_DEF.pack(sid, len(raw)) + raw
+            return _U8.pack(T_STR) + _U32.pack(len(raw)) + raw
+        if isinstance(value, (bool, np.bool_)):
+            return self._json(value)
+        if isinstance(value, (int, np.integer)):
+            if -2**63 <= value < 2**63:
+                return _U8.pack(T_INT) + _I64.pack(value)
+            return self._json(value)
+        if isinstance(value, (float, np.floating)):
+            return _U8.pack(T_FLOAT) + _F64.pack(value)
+        if isinstance(value, (list, tuple, np.ndarray)):
+            try:
+                arr = np.asarray(value)
+            except ValueError:
+                arr = None
+            if arr is not None and arr.ndim <= 255 and arr.dtype.kind in 'iuf':
+                if arr.dtype.kind == 'f':
+                    tag, arr = T_FLOATS, arr.astype('<f8', copy=False)
+                elif arr.size == 0 or (arr.min() >= -2**63 and arr.max() < 2**63):
+                    tag, arr = T_INTS, arr.astype('<i8', copy=False)
+                else:
+                    return self._json(value)
+                return b''.join([_U8.pack(tag), _U8.pack(arr.ndim),
+                                 *(_U32.pack(n) for n in arr.shape), arr.tobytes()])
+        return self._json(value)
+
+    @staticmethod
+    def _json(value):
+        raw = json.dumps(value).encode('utf-8')
+        return _U8.pack(T_JSON) + _U32.pack(len(raw)) + raw
+
+
+class FrameDecoder(object):
+    """Receiver half of one connection: the mirror of FrameEncoder."""
+
+    def __init__(self):
+        self.strings = []
+
+    def next_frame(self, buf):
+        """Remove one whole frame from the front of the bytearray `buf` and
+        return its meta dict, or None if `buf` does not hold a whole frame
+        yet. A malformed frame is consumed and raises ProtocolError."""
+        if len(buf) < LENGTH.size:
+            return None
+        n = LENGTH.unpack_from(buf)[0]
+        end = LENGTH.size + n
+        if len(buf) < end:
+            return None
+        body = bytes(buf[LENGTH.size:end])
+        del buf[:end]
+        return self.decode(body)
+
+    def decode_all(self, data):
+        """Meta dicts of the frames concatenated in `data` (a batch index)."""
+        buf = bytearray(data)
+        metas = []
+        while buf:
+            meta = self.next_frame(buf)
+            if meta is None:
+                raise ProtocolError('truncated frame')
+            metas.append(meta)
+        return metas
+
+    def decode(self, body):
+        try:
+            op, flags, dt, ndim, nfields, slot, offset, arrsize = HEADER.unpack_from(body)
+            pos = HEADER.size
+            shape = [DIM.unpack_from(body, pos + DIM.size*i)[0] for i in range(ndim)]
+            pos += DIM.size * ndim
+            meta = {}
+            if op != _OP_OTHER:
+                meta['operation'] = OPERATIONS[op]
+            for _ in range(nfields):
+                kid = body[pos]
+                pos += 1
+                if kid == _KEY_INLINE:
+                    n = body[pos]
+                    key = body[pos + 1:pos + 1 + n].decode('utf-8')
+                    pos += 1 + n
+                else:
+                    key = KEYS[kid]
+                meta[key], pos = self._value(body, pos + 1, body[pos])
+        except (struct.error, IndexError, UnicodeDecodeError, ValueError) as e:
+            raise ProtocolError('malformed frame: %s' % e) from None
+        meta['arrsize'] = arrsize
+        if arrsize:
+            meta['dtype'] = DTYPES[dt]
+            meta['shape'] = shape
+            meta['offset'] = offset
+        if flags & F_SLOT:
+            meta['slot'] = slot
+        return meta
+
+    def _value(self, body, pos, tag):
+        if tag == T_NONE:
+            return None, pos
+        if tag == T_INT:
+            return _I64.unpack_from(body, pos)[0], pos + 8
+        if tag == T_FLOAT:
+            return _F64.unpack_from(body, pos)[0], pos + 8
+        if tag == T_STR_REF:
+            return self.strings[_U16.unpack_from(body, pos)[0]], pos + 2
+        if tag == T_STR_DEF:
+            sid, n = _STR_DEF.unpack_from(body, pos)
+            pos += _STR_DEF.size
+            value = body[pos:pos + n].decode('utf-8')
+            if sid != len(self.strings):
+                raise ProtocolError('string %d defined out of order' % sid)
+            self.strings.append(value)
+            return value, pos + n
+        if tag in (T_STR, T_JSON):
+            n = _U32.unpack_from(body, pos)[0]
+            pos += 4
+            raw = body[pos:pos + n]
+            if tag == T_STR:
+                return raw.decode('utf-8'), pos + n
+            return json.loads(raw), pos + n
+        if tag in (T_FLOATS, T_INTS):
+            ndim = body[pos]
+            pos += 1
+            shape = [_U32.unpack_from(body, pos + 4*i)[0] for i in range(ndim)]
+            pos += 4 * ndim
+            count = int(np.prod(shape, dtype=np.int64))
+            arr = np.frombuffer(body, dtype='<f8' if tag == T_FLOATS else '<i8',
+                                count=count, offset=pos)
+            return arr.reshape(shape).tolist(), pos + 8*count
+        raise ProtocolError('unknown value type %d' % tag)
@@ -11,6 +11,7 @@ from pyqtgraph.dockarea import Dock
 from PyQt6 import QtWidgets, QtCore, QtGui, sip
 import atomize.main.local_config as lconf
 import atomize.general_modules.last_dir as ldir
+import atomize.general_modules.csv_reader as csv_reader
 
 pg.setConfigOption('background', (63,63,97))
 pg.setConfigOption('leftButtonPan', False)
@@ -35,6 +36,100 @@ def si_cursor_label(value, unit, precision=5):
     num = f"{value:.{precision}g}"
     return f"{num} {u}" if u else num
 
+class GrowableCurve:
+    """Preallocated x/y store behind a curve that is built point by point
+    (append_y / append_xy). Capacity doubles when full, so an append is O(1)
+    amortized instead of rebuilding the whole curve as a Python list; the
+    curve is redrawn from views of the filled part, never from a copy."""
+
+    def __init__(self, xs=(), ys=(), capacity=1024):
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        self.n = min(len(xs), len(ys))
+        size = max(capacity, 2 * self.n)
+        self.x = np.empty(size)
+        self.y = np.empty(size)
+        self.x[:self.n] = xs[:self.n]
+        self.y[:self.n] = ys[:self.n]
+        # start_step the x values were generated from (None for explicit x)
+        self.start_step = None
+
+    def append(self, x, y):
+        if self.n == len(self.y):
+            self.x = np.concatenate((self.x, np.empty_like(self.x)))
+            self.y = np.concatenate((self.y, np.empty_like(self.y)))
+        self.x[self.n] = x
+        self.y[self.n] = y
+        self.n += 1
+
+    def restep(self, start_step):
+        """Regenerate every x as x0 + i*dx when the sweep axis changed."""
+        x0, dx = start_step
+        self.x[:self.n] = x0 + dx * np.arange(self.n)
+        self.start_step = tuple(start_step)
+
+    def view(self):
+        return self.x[:self.n], self.y[:self.n]
+
+    def owns(self, curve):
+        """True if `curve` still shows this store, i.e. nothing replotted or
+        cleared it since the last append."""
+        y = getattr(curve, 'yData', None)
+        return y is not None and y.base is self.y and len(y) == self.n
+
+class GrowableImage:
+    """Row buffer behind an image built row by row (append_z). Capacity
+    doubles when full, so a row is written in place instead of re-stacking
+    (and transposing) the whole image; the running min/max give the levels
+    without rescanning the image."""
+
+    def __init__(self, ncols, rows=None, dtype=np.float64, capacity=64):
+        rows = np.empty((0, ncols), dtype) if rows is None else np.asarray(rows)
+        self.n = rows.shape[0]
+        self.buf = np.empty((max(capacity, 2 * self.n), ncols), rows.dtype)
+        self.buf[:self.n] = rows
+        self.lo, self.hi = np.inf, -np.inf
+        if self.n:
+            self._update_levels(rows)
+
+    @property
+    def ncols(self):
+        return self.buf.shape[1]
+
+    def _update_levels(self, values):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)   # all-NaN row
+            lo, hi = np.nanmin(values), np.nanmax(values)
+        if lo < self.lo:
+            self.lo = float(lo)
+        if hi > self.hi:
+            self.hi = float(hi)
+
+    def append(self, row):
+        row = np.asarray(row).ravel()
+        if not np.can_cast(row.dtype, self.buf.dtype):
+            self.buf = self.buf.astype(np.result_type(self.buf, row))
+        if self.n == len(self.buf):
+            grown = np.empty((2 * len(self.buf), self.ncols), self.buf.dtype)
+            grown[:self.n] = self.buf[:self.n]
+            self.buf = grown
+        self.buf[self.n] = row
+        self.n += 1
+        self._update_levels(row)
+
+    def view(self):
+        return self.buf[:self.n]
+
+    def levels(self):
+        """(min, max) of every row so far, or None while degenerate."""
+        if np.isfinite(self.lo) and np.isfinite(self.hi) and self.hi > self.lo:
+            return self.lo, self.hi
+        return None
+
+    def owns(self, image):
+        """True if `image` (the array the view shows) is still this store."""
+        return image is not None and image.base is self.buf and image.shape[0] == self.n
+
 def get_widget(rank, name):
     return {
         1: CrosshairDock,
@@ -919,6 +1014,7 @@ class CrosshairDock(CloseableDock):
         self.used_symbols = {}
         self.used_brush = {}
         self.curves = {}
+        self.append_stores = {}
 
         self.plot_item = self.plot_widget.getPlotItem()
         self.plot_item.ctrl.fftCheck.toggled.connect(self.on_fft_toggled)
@@ -1320,7 +1416,7 @@ class CrosshairDock(CloseableDock):
             header_array.append(temp)
         file_to_read.close()
 
-        temp = np.genfromtxt(file_path, dtype = float, delimiter = ',', skip_header = 1, comments = '#') 
+        temp = csv_reader.load(file_path, skip_header = 1)
         data = np.transpose(temp)
         name_plot = os.path.splitext(os.path.basename(file_path))[0]
 
@@ -1573,6 +1669,35 @@ class CrosshairDock(CloseableDock):
         self.plot_widget._clear_ruler()
         self.plot_widget.clear()
 
+    def append_point(self, name, y, x=None, start_step=None, **kwargs):
+        """Append one point to curve `name` (created on the first point). x is
+        explicit (append_xy), generated from start_step as x0 + i*dx
+        (append_y), or the point index. The curve keeps a GrowableCurve, so
+        the cost per point no longer grows with the length of the trace."""
+        store = self.append_stores.get(name)
+        curve = self.curves.get(name)
+        owned = store is not None and curve is not None and store.owns(curve)
+        if not owned:
+            # first point, or the curve was replotted / cleared in between:
+            # continue from whatever it shows now
+            store = GrowableCurve(*self.get_raw_data(name))
+            self.append_stores[name] = store
+        if x is None:
+            if start_step is not None:
+                if store.start_step != tuple(start_step):
+                    store.restep(start_step)
+                x0, dx = start_step
+                x = x0 + dx * store.n
+            else:
+                x = store.n
+        store.append(x, y)
+        if owned and kwargs.get('vline', 'False') == 'False':
+            # the curve already carries its pen / symbols and the axes their
+            # labels: only the data changed
+            curve.setData(*store.view())
+        else:
+            self.plot(*store.view(), name=name, **kwargs)
+
     def get_data(self, label):
         if label in self.curves:
             return self.curves[label].getData()
@@ -1667,6 +1792,8 @@ class CrossSectionDock(CloseableDock):
         #self.plot_item.ctrlMenu.setStyleSheet("QMenu::item:selected {background-color: rgb(40, 40, 40); } QMenu::item { color: rgb(211, 194, 78); } QMenu {background-color: rgb(42, 42, 64); }")
         self.auto_levels = 0
         self.set_image = 0
+        # GrowableImage behind append_z, see append_row
+        self.row_store = None
         self.click_count = 1
         view.setAspectLocked(lock=False)
         self.ui = self.img_view.ui
@@ -2069,6 +2196,25 @@ class CrossSectionDock(CloseableDock):
         self.update_cross_section_set_data()
         self.set_image = 1
 
+    def append_row(self, row, **kwargs):
+        """Append one row to the image (append_z). Rows go into a
+        GrowableImage and the view is refreshed from a view of its filled
+        part; if anything else was drawn in between, the store restarts from
+        the image on screen (or empty, when the row length no longer fits)."""
+        row = np.asarray(row).ravel()
+        store = self.row_store
+        if store is None or store.ncols != row.size or not store.owns(self.img_view.image):
+            shown = self.get_data()
+            rows = None
+            if shown is not None and shown.ndim == 2 and shown.shape[0] == row.size:
+                rows = np.transpose(shown)
+            store = self.row_store = GrowableImage(row.size, rows, dtype=row.dtype)
+        store.append(row)
+        levels = store.levels()
+        if levels is not None and self.color_mode == 'default':
+            kwargs['levels'] = levels
+        self.setImage(store.view(), axes={'y':0, 'x':1}, **kwargs)
+
     def setTitle(self, text):
         self.plot_item.setTitle(text)
 
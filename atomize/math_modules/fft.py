@@ -2,8 +2,46 @@
 # -*- coding: utf-8 -*-
 
 import sys
+from functools import lru_cache
 import numpy as np
 
+import atomize.math_modules.signal_processing as sigproc
+
+# scipy.fft is optional (pip install -e .[math]); it adds multithreading
+# (workers=) and native single precision to the batch path. Probe it cheaply --
+# find_spec does NOT import scipy -- and import it on the first transform, so
+# importing this module stays numpy-only. Without it the batch path falls back
+# to numpy.fft (workers ignored).
+import importlib.util
+SCIPY_AVAILABLE = importlib.util.find_spec('scipy') is not None
+_SFFT = None
+
+
+def _backend():
+    """scipy.fft when available, else None (numpy.fft)."""
+    global _SFFT
+    if _SFFT is None and SCIPY_AVAILABLE:
+        import scipy.fft as _SFFT
+    return _SFFT
+
+
+# Live previews transform the same geometry frame after frame, so the
+# apodization window and the shifted frequency axis are built once per
+# (n, window) and (n, spacing) and shared read-only.
+@lru_cache(maxsize=64)
+def _window(n, name, param):
+    w = sigproc.apodization_window(n, name, param)
+    w.flags.writeable = False
+    return w
+
+
+@lru_cache(maxsize=64)
+def _freq_axis(n, d):
+    f = np.fft.fftshift(np.fft.fftfreq(n, d))
+    f.flags.writeable = False
+    return f
+
+
 class Fast_Fourier():
 
     def __init__(self):
@@ -177,6 +215,84 @@ class Fast_Fourier():
             else:
                 return np.array( (np.transpose( np.real(data) ), np.transpose( np.imag(data) )) )
     
+    @staticmethod
+    def freq_axis(n, d):
+        """Frequency axis of an n-point transform with sample spacing `d`, in
+        fftshift order (ascending, zero at index n//2). Cached per (n, d) and
+        returned read-only."""
+        return _freq_axis(int(n), float(d))
+
+    @staticmethod
+    def spectrum(data, n=None, axis=-1, window='None', wparam=8.6,
+                 workers=None, float32=False):
+        """Complex spectrum of `data` along `axis`, in fftshift order.
+
+        `data` is real or complex, 1D or a stack of traces. It is multiplied
+        by the apodization `window` (a signal_processing.apodization_window
+        name, cached per length) while it is copied into an n-point buffer,
+        which zero-fills it in the same pass (n defaults to the trace length;
+        see signal_processing.zerofill_length); the transform then runs in
+        that buffer. Real input takes the half-length real transform and
+        fills the negative frequencies by conjugate symmetry. `workers` sets
+        the scipy.fft thread count (-1 = all CPUs; ignored without scipy);
+        `float32` computes in single precision and returns complex64.
+        """
+        data = np.moveaxis(np.asarray(data), axis, -1)
+        n0 = data.shape[-1]
+        n = n0 if n is None else int(n)
+        real = not np.iscomplexobj(data)
+        if float32:
+            rtype, ctype = np.float32, np.complex64
+        else:
+            rtype, ctype = np.float64, np.complex128
+        m = min(n0, n)
+        buf = np.zeros(data.shape[:-1] + (n,), dtype=rtype if real else ctype)
+        if window != 'None':
+            np.multiply(data[..., :m], _window(n0, window, float(wparam))[:m],
+                        out=buf[..., :m], casting='unsafe')
+        else:
+            buf[..., :m] = data[..., :m]
+        sfft = _backend()
+        kw = {} if sfft is None or workers is None else {'workers': workers}
+        h = n//2
+        if real:
+            half = (sfft.rfft(buf, axis=-1, **kw) if sfft is not None
+                    else np.fft.rfft(buf, axis=-1).astype(ctype, copy=False))
+            # fftshift of the full spectrum: negative bins (conjugates of the
+            # positive ones) first, then 0 .. (n-1)//2
+            sp = np.empty(data.shape[:-1] + (n,), dtype=ctype)
+            np.conjugate(half[..., h:0:-1], out=sp[..., :h])
+            sp[..., h:] = half[..., :n - h]
+        else:
+            sp = (sfft.fft(buf, axis=-1, overwrite_x=True, **kw) if sfft is not None
+                  else np.fft.fft(buf, axis=-1).astype(ctype, copy=False))
+            sp = np.fft.fftshift(sp, axes=-1)
+        return np.moveaxis(sp, -1, axis)
+
+    def fft_batch(self, data_i, data_q, sample_spacing, zerofill='None',
+                  window='None', wparam=8.6, workers=None, float32=False):
+        """Batch FFT of I+iQ traces (rows of a 2D array) along the last axis.
+
+        Same conventions as fft(..., re='True') -- sample_spacing in ns gives
+        a frequency axis in MHz, NaN input gives all-NaN output -- plus the
+        zero-fill choice of signal_processing.zerofill_length ('None', 'x2',
+        ..., 'Next pow2'), an apodization window, scipy.fft workers and
+        float32 output. data_q None transforms the real data_i. Returns
+        (freq, real, imag); freq is the shared read-only axis of freq_axis.
+        """
+        data_i = np.asarray(data_i)
+        if np.isnan(data_i).any() or (data_q is not None and np.isnan(data_q).any()):
+            nan_array = np.full_like(data_i, np.nan, dtype=float)
+            return nan_array, nan_array, nan_array
+        data = data_i if data_q is None else data_i + 1j*np.asarray(data_q)
+        n = sigproc.zerofill_length(data.shape[-1], zerofill)
+        sp = self.spectrum(data, n, window=window, wparam=wparam,
+                           workers=workers, float32=float32)
+        freq = self.freq_axis(n, sample_spacing*10**(-3))
+        if float32:
+            freq = freq.astype(np.float32)
+        return freq, sp.real, sp.imag
+
     def fft(self, x_axis, data_i, data_q, sample_spacing, re = 'False'):
         if self.test_flag != 'test':
             if re == 'False':
@@ -185,13 +301,9 @@ class Fast_Fourier():
                     nan_array = np.full_like(data_i, np.nan, dtype=float)
                     return nan_array, nan_array
 
-                data = data_i + 1j*data_q
-                sp = np.fft.fft( data )
+                sp = np.fft.fftshift( np.fft.fft( data_i + 1j*data_q ), axes = -1 )
 
-                freq = np.fft.fftfreq(x_axis.shape[-1], sample_spacing*10**(-3))
-                i = np.argsort(freq)
-
-                return freq[i], np.abs( sp[i] )
+                return self.freq_axis(x_axis.shape[-1], sample_spacing*10**(-3)).copy(), np.abs( sp )
 
             elif re == 'True':
 
@@ -199,27 +311,9 @@ class Fast_Fourier():
                     nan_array = np.full_like(data_i, np.nan, dtype=float)
                     return nan_array, nan_array, nan_array
 
-                data = data_i + 1j*data_q
-
-                if len( data_i.shape ) == 1:
-                    sp = np.fft.fft( data )
-                    freq = np.fft.fftfreq(x_axis.shape[-1], sample_spacing*10**(-3))
-                    i = np.argsort(freq)
-
-                    sp.real = sp.real[i]
-                    sp.imag = sp.imag[i]
-
-                    return freq[i], sp.real, sp.imag
-
-                else:
-                    sp = np.fft.fft( data, axis = 1 )
-                    freq = np.fft.fftfreq(x_axis.shape[-1], sample_spacing*10**(-3))
-                    i = np.argsort(freq)
-
-                    sp.real = sp.real[:,i]
-                    sp.imag = sp.imag[:,i]
+                sp = np.fft.fftshift( np.fft.fft( data_i + 1j*data_q, axis = -1 ), axes = -1 )
 
-                    return freq[i], sp.real, sp.imag
+                return self.freq_axis(x_axis.shape[-1], sample_spacing*10**(-3)).copy(), sp.real, sp.imag
 
         elif self.test_flag == 'test':
             if re == 'False':
@@ -228,13 +322,9 @@ class Fast_Fourier():
                     nan_array = np.full_like(data_i, np.nan, dtype=float)
                     return nan_array, nan_array
 
-                data = data_i + 1j*data_q
-                sp = np.fft.fft( data )
-
-                freq = np.fft.fftfreq(x_axis.shape[-1], sample_spacing*10**(-3))
-                i = np.argsort(freq)
+                sp = np.fft.fftshift( np.fft.fft( data_i + 1j*data_q ), axes = -1 )
 
-                return freq[i], np.abs( sp[i] )
+                return self.freq_axis(x_axis.shape[-1], sample_spacing*10**(-3)).copy(), np.abs( sp )
 
             elif re == 'True':
                 
@@ -242,27 +332,9 @@ class Fast_Fourier():
                     nan_array = np.full_like(data_i, np.nan, dtype=float)
                     return nan_array, nan_array, nan_array
 
-                data = data_i + 1j*data_q
-
-                if len( data_i.shape ) == 1:
-                    sp = np.fft.fft( data )
-                    freq = np.fft.fftfreq(x_axis.shape[-1], sample_spacing*10**(-3))
-                    i = np.argsort(freq)
-
-                    sp.real = sp.real[i]
-                    sp.imag = sp.imag[i]
-
-                    return freq[i], sp.real, sp.imag
-
-                else:
-                    sp = np.fft.fft( data, axis = 1 )
-                    freq = np.fft.fftfreq(x_axis.shape[-1], sample_spacing*10**(-3))
-                    i = np.argsort(freq)
-
-                    sp.real = sp.real[:,i]
-                    sp.imag = sp.imag[:,i]
+                sp = np.fft.fftshift( np.fft.fft( data_i + 1j*data_q, axis = -1 ), axes = -1 )
 
-                    return freq[i], sp.real, sp.imag
+                return self.freq_axis(x_axis.shape[-1], sample_spacing*10**(-3)).copy(), sp.real, sp.imag
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,8 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import sys
+from concurrent.futures import as_completed
 import numpy as np
 
+import atomize.math_modules.parallel as par
+
 # scipy is an optional dependency (pip install -e .[math]) and the slowest
 # import here (~0.6 s on Windows). Probe availability cheaply -- find_spec does
 # NOT import scipy -- and defer the real import to the functions that fit, so
@@ -158,16 +161,35 @@ class math():
 
     def default_guess(self, model, x, y):
         """Build a reasonable initial guess for the requested model."""
-        return list(self._models()[model][2](x, y))
+        return [float(g) for g in self._models()[model][2](x, y)]
+
+    def default_guesses(self, model, x, Y):
+        """Initial guesses for a stack of traces sharing the axis x.
+
+        Y is (n_traces, n_points). The guess builders work along the last
+        axis, so the whole stack is seeded in one vectorized pass; row i of
+        the returned (n_traces, n_params) array equals
+        default_guess(model, x, Y[i]).
+        """
+        x = np.asarray(x, dtype=float)
+        Y = np.atleast_2d(np.asarray(Y, dtype=float))
+        cols = self._models()[model][2](x, Y)
+        return np.column_stack([np.broadcast_to(np.asarray(c, dtype=float), Y.shape[:1])
+                                for c in cols])
 
     ###############################################################
     # Initial-guess heuristics
     ###############################################################
+    # The builders work along the last axis of y, so the same code seeds one
+    # trace (default_guess) or a (n_traces, n_points) stack sharing x in one
+    # pass (default_guesses); the entries come back as scalars or per-trace
+    # arrays.
     def _guess_linear(self, x, y):
+        y = np.asarray(y, dtype=float)
         try:
-            a, b = np.polyfit(x, y, 1)
+            a, b = np.polyfit(x, y.T, 1)
         except Exception:
-            a, b = 1.0, float(np.mean(y))
+            a, b = 1.0, np.mean(y, axis=-1)
         return [a, b]
 
     # Baseline (plateau) + amplitude + characteristic decay time, estimated
@@ -178,22 +200,22 @@ class math():
     # where span/3 would seed the time constant orders of magnitude too slow
     # and push curve_fit into a degenerate local minimum.
     def _decay_scale(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
         n = len(x)
         m = max(3, n // 20)                      # endpoint window (~5% of pts)
-        b = float(np.median(y[-m:]))             # plateau
-        a = float(np.median(y[:m]) - b)          # amplitude (signed)
+        b = np.median(y[..., -m:], axis=-1)      # plateau
+        a = np.median(y[..., :m], axis=-1) - b   # amplitude (signed)
         span = float(x[-1] - x[0]) or 1.0
-        dy = np.asarray(y, dtype=float) - float(y[0])
-        tot = float(y[-1] - y[0])
-        if tot == 0.0:
-            return a, b, span/3.0
-        frac = dy/tot
-        idx = int(np.argmax(frac >= 0.5))        # first half-recovery crossing
-        if idx <= 0:
-            return a, b, span/3.0
+        tot = y[..., -1] - y[..., 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = (y - y[..., :1])/tot[..., None]
+        idx = np.argmax(frac >= 0.5, axis=-1)    # first half-recovery crossing
         step = float(x[1] - x[0]) if n > 1 else 1.0
-        tc = float(x[idx] - x[0])
-        return a, b, max(tc, abs(step))
+        tc = np.maximum(x[idx] - x[0], abs(step))
+        # no change at all, or no crossing found
+        tc = np.where((tot == 0.0) | (idx <= 0), span/3.0, tc)
+        return a, b, tc
 
     def _guess_exponential(self, x, y):
         a, b, tc = self._decay_scale(x, y)
@@ -213,16 +235,19 @@ class math():
         return [a/2.0, tc*2.0,   0.7,  a/2.0, tc/3.0,    b]
 
     def _guess_peak(self, x, y):
-        b = float(np.median(y))
-        idx = int(np.argmax(np.abs(y - b)))
-        a = float(y[idx] - b)
-        x0 = float(x[idx])
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        b = np.median(y, axis=-1)
+        idx = np.argmax(np.abs(y - b[..., None]), axis=-1)
+        a = np.take_along_axis(y, idx[..., None], axis=-1)[..., 0] - b
+        x0 = x[idx]
         width = float(abs(x[-1] - x[0]))/10.0 or 1.0
         return [a, x0, width, b]
 
     def _guess_damped_sine(self, x, y):
-        b = float(np.mean(y))
-        a = float(np.max(y) - np.min(y))/2.0
+        y = np.asarray(y, dtype=float)
+        b = np.mean(y, axis=-1)
+        a = (np.max(y, axis=-1) - np.min(y, axis=-1))/2.0
         span = float(x[-1] - x[0]) or 1.0
         return [a, span/2.0, 1.0/span, 0.0, b]
 
@@ -231,62 +256,172 @@ class math():
 
         A low-order polynomial trend (≈ the decay envelope) is removed first,
         then the k largest rFFT peaks are picked. Used to seed the ESEEM
-        modulation frequencies so the multi-parameter fits converge.
+        modulation frequencies so the multi-parameter fits converge. Returns
+        an array of shape y.shape[:-1] + (k,).
         """
         x = np.asarray(x, dtype=float)
         y = np.asarray(y, dtype=float)
         n = len(x)
         span = float(x[-1] - x[0]) or 1.0
-        fallback = [1.0/span]*k
+        out = np.full(y.shape[:-1] + (k,), 1.0/span)
         if n < 8:
-            return fallback
+            return out
         dt = span/(n - 1)
         try:
-            trend = np.poly1d(np.polyfit(x, y, 3))(x)
+            trend = (np.vander(x, 4) @ np.polyfit(x, y.T, 3)).T
         except Exception:
-            trend = float(np.mean(y))
-        sp = np.abs(np.fft.rfft(y - trend))
+            trend = np.mean(y, axis=-1, keepdims=True)
+        sp = np.abs(np.fft.rfft(y - trend, axis=-1))
         freqs = np.fft.rfftfreq(n, dt)
-        sp[:2] = 0.0   # kill DC + residual trend bins
-        picked = []
+        sp[..., :2] = 0.0   # kill DC + residual trend bins
         df = freqs[1] if len(freqs) > 1 else 0.0
-        for idx in np.argsort(sp)[::-1]:
-            f = float(freqs[idx])
-            if f <= 0 or sp[idx] <= 0:
-                continue
-            if all(abs(f - pf) > df for pf in picked):
-                picked.append(f)
-            if len(picked) >= k:
-                break
-        while len(picked) < k:
-            picked.append(1.0/span)
-        return picked
+        order = np.argsort(sp, axis=-1)[..., ::-1]
+        sp = sp.reshape(-1, sp.shape[-1])
+        for row, spr, idxs in zip(out.reshape(-1, k), sp,
+                                  order.reshape(sp.shape)):
+            picked = []
+            for idx in idxs:
+                f = float(freqs[idx])
+                if f <= 0 or spr[idx] <= 0:
+                    continue
+                if all(abs(f - pf) > df for pf in picked):
+                    picked.append(f)
+                if len(picked) >= k:
+                    break
+            row[:len(picked)] = picked
+        return out
 
     def _guess_eseem_stretched_1(self, x, y):
-        b = float(y[-1]); a = float(y[0] - b); span = float(x[-1] - x[0]) or 1.0
-        f = self._estimate_freqs(x, y, 1)[0]
+        y = np.asarray(y, dtype=float)
+        b = y[..., -1]; a = y[..., 0] - b; span = float(x[-1] - x[0]) or 1.0
+        f = self._estimate_freqs(x, y, 1)[..., 0]
         #     a, Tm,      beta, c, m,   f, phi, tau_m
         return [a, span/3.0, 1.5, b, 0.2, f, 0.0, span/2.0]
 
     def _guess_eseem_stretched_2(self, x, y):
-        b = float(y[-1]); a = float(y[0] - b); span = float(x[-1] - x[0]) or 1.0
-        f1, f2 = self._estimate_freqs(x, y, 2)
+        y = np.asarray(y, dtype=float)
+        b = y[..., -1]; a = y[..., 0] - b; span = float(x[-1] - x[0]) or 1.0
+        f = self._estimate_freqs(x, y, 2)
         return [a, span/3.0, 1.5, b,
-                0.2, f1, 0.0, span/2.0,
-                0.1, f2, 0.0, span/2.0]
+                0.2, f[..., 0], 0.0, span/2.0,
+                0.1, f[..., 1], 0.0, span/2.0]
 
     def _guess_eseem_exp_1(self, x, y):
-        b = float(y[-1]); a = float(y[0] - b); span = float(x[-1] - x[0]) or 1.0
-        f = self._estimate_freqs(x, y, 1)[0]
+        y = np.asarray(y, dtype=float)
+        b = y[..., -1]; a = y[..., 0] - b; span = float(x[-1] - x[0]) or 1.0
+        f = self._estimate_freqs(x, y, 1)[..., 0]
         #     a, Tm,      c, m,   f, phi, tau_m
         return [a, span/3.0, b, 0.2, f, 0.0, span/2.0]
 
     def _guess_eseem_exp_2(self, x, y):
-        b = float(y[-1]); a = float(y[0] - b); span = float(x[-1] - x[0]) or 1.0
-        f1, f2 = self._estimate_freqs(x, y, 2)
+        y = np.asarray(y, dtype=float)
+        b = y[..., -1]; a = y[..., 0] - b; span = float(x[-1] - x[0]) or 1.0
+        f = self._estimate_freqs(x, y, 2)
         return [a, span/3.0, b,
-                0.2, f1, 0.0, span/2.0,
-                0.1, f2, 0.0, span/2.0]
+                0.2, f[..., 0], 0.0, span/2.0,
+                0.1, f[..., 1], 0.0, span/2.0]
+
+    ###############################################################
+    # Analytic Jacobians d y / d p, (n_points, n_params) in the param_names
+    # order. Passed to curve_fit as `jac` (fit(..., jac=True), fit_many) in
+    # place of its forward-difference estimate, which costs one extra model
+    # evaluation per parameter per iteration -- 8-12 for the ESEEM models.
+    # The abs() guards of the models are differentiated through sign().
+    ###############################################################
+    def _jacobians(self):
+        return {
+            'Linear':                self._jac_linear,
+            'Exponential':           self._jac_exponential,
+            'Bi-exponential':        self._jac_biexponential,
+            'Stretched exponential': self._jac_stretched,
+            'Stretched exponential + exponential': self._jac_stretched_plus_exp,
+            'Gaussian':              self._jac_gaussian,
+            'Lorentzian':            self._jac_lorentzian,
+            'Damped sine':           self._jac_damped_sine,
+            'Tm + ESEEM (stretched, 1 freq)':
+                lambda x, a, tm, beta, c, *mod: self._jac_eseem(x, a, tm, beta, mod),
+            'Tm + ESEEM (stretched, 2 freq)':
+                lambda x, a, tm, beta, c, *mod: self._jac_eseem(x, a, tm, beta, mod),
+            'Tm + ESEEM (mono-exp, 1 freq)':
+                lambda x, a, tm, c, *mod: self._jac_eseem(x, a, tm, None, mod),
+            'Tm + ESEEM (mono-exp, 2 freq)':
+                lambda x, a, tm, c, *mod: self._jac_eseem(x, a, tm, None, mod),
+        }
+
+    @staticmethod
+    def _columns(x, *cols):
+        """Stack scalar / per-point derivative columns into (len(x), n)."""
+        return np.stack(np.broadcast_arrays(x, *cols)[1:], axis=-1).astype(float)
+
+    @staticmethod
+    def _stretch_terms(u, beta):
+        """e = exp(-w), e*w and e*w*ln(u) for w = u**beta, continued by their
+        limits (0) at u = 0 and where e underflows, e.g. for an excursion to
+        beta < 0, so that a flat model never gets a NaN derivative."""
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            w = u**beta
+            e = np.exp(-w)
+            live = (e > 0) & (u > 0)
+            ew = np.where(live, e*w, 0.0)
+            return e, ew, ew*np.log(np.where(live, u, 1.0))
+
+    def _jac_linear(self, x, a, b):
+        return self._columns(x, x, 1.0)
+
+    def _jac_exponential(self, x, a, k, b):
+        e = np.exp(-x/k)
+        return self._columns(x, e, a*e*x/k**2, 1.0)
+
+    def _jac_biexponential(self, x, a1, k1, a2, k2, b):
+        e1, e2 = np.exp(-x/k1), np.exp(-x/k2)
+        return self._columns(x, e1, a1*e1*x/k1**2, e2, a2*e2*x/k2**2, 1.0)
+
+    def _jac_stretched(self, x, a, k, beta, b):
+        e, ew, ewl = self._stretch_terms(x/k, beta)
+        return self._columns(x, e, a*beta*ew/k, -a*ewl, 1.0)
+
+    def _jac_stretched_plus_exp(self, x, a1, k1, beta, a2, k2, b):
+        e1, ew, ewl = self._stretch_terms(np.abs(x)/np.abs(k1), beta)
+        e2 = np.exp(-x/k2)
+        return self._columns(x, e1, a1*beta*ew/k1, -a1*ewl, e2, a2*e2*x/k2**2, 1.0)
+
+    def _jac_gaussian(self, x, a, x0, sigma, b):
+        d = x - x0
+        g = np.exp(-d**2/(2.0*sigma**2))
+        return self._columns(x, g, a*g*d/sigma**2, a*g*d**2/sigma**3, 1.0)
+
+    def _jac_lorentzian(self, x, a, x0, gamma, b):
+        q = (x - x0)/gamma
+        den = 1.0 + q**2
+        return self._columns(x, 1.0/den, 2.0*a*q/(gamma*den**2),
+                             2.0*a*q**2/(gamma*den**2), 1.0)
+
+    def _jac_damped_sine(self, x, a, k, f, phi, b):
+        e = np.exp(-x/k)
+        th = 2.0*np.pi*f*x + phi
+        s, c = e*np.sin(th), e*np.cos(th)
+        return self._columns(x, s, a*s*x/k**2, 2.0*np.pi*a*c*x, a*c, 1.0)
+
+    def _jac_eseem(self, x, a, tm, beta, mod_params):
+        """ESEEM models: columns a, Tm, [beta], c, then m, f, phi, tau_m per
+        modulation term; beta None selects the mono-exponential envelope."""
+        ax = np.abs(x)
+        e, ew, ewl = self._stretch_terms(ax/np.abs(tm), 1.0 if beta is None else beta)
+        env = a*e
+        mod = 1.0
+        mod_cols = []
+        for m, f, phi, taum in zip(*[iter(mod_params)]*4):
+            th = 2.0*np.pi*f*x + phi
+            damp = np.exp(-ax/np.abs(taum))
+            c, s = np.cos(th)*damp, np.sin(th)*damp
+            mod = mod + m*c
+            mod_cols += [env*c, -2.0*np.pi*env*m*s*x, -env*m*s,
+                         env*m*c*ax/(taum*np.abs(taum))]
+        cols = [e*mod, a*ew*mod*(1.0 if beta is None else beta)/tm]
+        if beta is not None:
+            cols.append(-a*ewl*mod)
+        cols.append(1.0)
+        return self._columns(x, *cols, *mod_cols)
 
     ###############################################################
     # Generic least-squares fit
@@ -294,13 +429,15 @@ class math():
     # parameter name treated as the constant baseline offset, per model
     _OFFSET_NAMES = ('b', 'c')
 
-    def fit(self, model, x, y, guess=None, no_offset=False):
+    def fit(self, model, x, y, guess=None, no_offset=False, jac=False):
         """
         Fit (x, y) with the named model using scipy.optimize.curve_fit.
 
         no_offset: when True, the model's constant baseline term (the parameter
         named 'b' or 'c') is fixed at 0 and removed from the free parameters, so
         the curve is forced through the baseline instead of floating it.
+        jac: when True, curve_fit uses the model's analytic Jacobian instead of
+        finite differences (fewer model evaluations per iteration).
 
         Returns a dict:
             y_fit       : model evaluated at x with the best-fit parameters
@@ -318,6 +455,7 @@ class math():
         x = np.asarray(x, dtype=float)
         y = np.asarray(y, dtype=float)
         func, names, _ = self._models()[model]
+        jac_func = self._jacobians().get(model) if jac else None
 
         if guess is None or len(guess) != len(names):
             guess = self.default_guess(model, x, y)
@@ -330,6 +468,7 @@ class math():
                                if nm in self._OFFSET_NAMES), None)
         if offset_idx is None:
             fit_func, fit_names, fit_guess = func, names, guess
+            fit_jac = jac_func
         else:
             oi = offset_idx
 
@@ -338,10 +477,18 @@ class math():
                 full.insert(oi, 0.0)
                 return func(xx, *full)
 
+            fit_jac = None
+            if jac_func is not None:
+                def fit_jac(xx, *p):
+                    full = list(p)
+                    full.insert(oi, 0.0)
+                    return np.delete(jac_func(xx, *full), oi, axis=1)
+
             fit_names = [nm for j, nm in enumerate(names) if j != oi]
             fit_guess = [g for j, g in enumerate(guess) if j != oi]
 
-        popt, pcov = optimize.curve_fit(fit_func, x, y, p0=fit_guess, maxfev=100000)
+        kw = {} if fit_jac is None else {'jac': fit_jac}
+        popt, pcov = optimize.curve_fit(fit_func, x, y, p0=fit_guess, maxfev=100000, **kw)
         perr = np.sqrt(np.abs(np.diag(pcov)))
         names = fit_names
 
@@ -364,6 +511,111 @@ class math():
             'stats': stats,
         }
 
+    # goodness-of-fit columns of the fit_many table
+    _TABLE_STATS = ('rmse', 'adj_r_squared', 'aicc', 'bic', 'durbin_watson')
+
+    def fit_many(self, model, x, Y, guesses=None, n_jobs=None, no_offset=False,
+                 jac=True, progress=None):
+        """
+        Fit every trace of a stack with the named model.
+
+        Y is a (n_traces, n_points) array, or a list of 1D traces of any length.
+        x is one axis shared by all traces, or one axis per trace (2D array /
+        list). guesses is one initial-guess list for all traces, one per trace
+        (None entries allowed), or None: the default guesses of a stack on a
+        shared axis are then built in one vectorized pass (default_guesses).
+
+        n_jobs: worker processes (None/1 serial, -1 all CPUs); the traces are
+        fitted in a process pool and collected as they finish.
+        jac: use the analytic model Jacobians (see fit).
+        progress: optional callable(i, result, error) called in this process as
+        each trace finishes, in completion order -- result is the fit() dict of
+        trace i, or None with the error message when that fit failed.
+
+        Returns a dict:
+            param_names : fitted parameter names (offset dropped with no_offset)
+            table       : structured array, one row per trace: 'ok', each
+                          parameter, '<name>_err', 'r_squared' and the
+                          goodness-of-fit columns rmse, adj_r_squared, aicc,
+                          bic, durbin_watson (NaN where the fit failed)
+            results     : per-trace fit() dicts (None where the fit failed)
+            errors      : {trace index: error message}
+        """
+        if not SCIPY_AVAILABLE:
+            raise RuntimeError("scipy is required for fitting. Install with: pip install -e .[math]")
+        names = self.param_names(model)
+        ys = [np.asarray(y, dtype=float) for y in Y]
+        n = len(ys)
+        try:
+            xa = np.asarray(x, dtype=float)
+        except ValueError:                     # ragged per-trace axes
+            xa = None
+        shared = xa is not None and xa.ndim == 1
+        xs = [xa]*n if shared else [np.asarray(xi, dtype=float) for xi in x]
+        if len(xs) != n:
+            raise ValueError("x holds %d axes for %d traces" % (len(xs), n))
+
+        if guesses is None:
+            if shared and n and all(y.shape == xa.shape for y in ys):
+                guesses = self.default_guesses(model, xa, np.vstack(ys))
+            else:
+                guesses = [None]*n             # built per trace by fit()
+        elif len(guesses) and guesses[0] is not None and np.ndim(guesses[0]) == 0:
+            # one guess for every trace
+            guesses = [guesses]*n
+        if len(guesses) != n:
+            raise ValueError("%d guesses for %d traces" % (len(guesses), n))
+
+        offset = (next((nm for nm in names if nm in self._OFFSET_NAMES), None)
+                  if no_offset else None)
+        fit_names = [nm for nm in names if nm != offset]
+        dtype = ([('ok', bool)] + [(nm, float) for nm in fit_names]
+                 + [(nm + '_err', float) for nm in fit_names]
+                 + [('r_squared', float)] + [(k, float) for k in self._TABLE_STATS])
+        table = np.zeros(n, dtype=dtype)
+        for key in dtype[1:]:
+            table[key[0]] = np.nan
+        results, errors = [None]*n, {}
+
+        def collect(i, res, err):
+            if err is None:
+                results[i] = res
+                row = table[i]
+                row['ok'] = True
+                for nm, v, e in zip(res['param_names'], res['popt'], res['perr']):
+                    row[nm], row[nm + '_err'] = v, e
+                row['r_squared'] = res['r_squared']
+                for k in self._TABLE_STATS:
+                    row[k] = res['stats'][k]
+            else:
+                err = errors[i] = str(err) or type(err).__name__
+            if progress is not None:
+                progress(i, res, err)
+
+        args = [(model, xs[i], ys[i], None if g is None else list(g), no_offset, jac)
+                for i, g in enumerate(guesses)]
+        workers = par.resolve_workers(n_jobs, n)
+        if workers == 1:
+            for i, a in enumerate(args):
+                try:
+                    res, err = _fit_job(*a), None
+                except Exception as e:
+                    res, err = None, e
+                collect(i, res, err)
+        else:
+            futures = {par.submit(workers, _fit_job, *a): i
+                       for i, a in enumerate(args)}
+            try:
+                for fut in as_completed(futures):
+                    err = fut.exception()
+                    collect(futures[fut], None if err else fut.result(), err)
+            finally:
+                for fut in futures:
+                    fut.cancel()
+
+        return {'param_names': fit_names, 'table': table,
+                'results': results, 'errors': errors}
+
     @staticmethod
     def _goodness_of_fit(y, residuals, ss_res, r_squared, n_params):
         """Goodness-of-fit / model-selection diagnostics from the residuals.
@@ -428,5 +680,10 @@ class math():
 
         return model_data, residuals, r_squared
 
+def _fit_job(model, x, y, guess, no_offset, jac):
+    """One trace of math.fit_many (runs in a worker process)."""
+    return math().fit(model, x, y, guess=guess, no_offset=no_offset, jac=jac)
+
+
 if __name__ == "__main__":
     main()
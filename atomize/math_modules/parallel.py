@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Process-level parallelism for the numerical modules.
+====================================================
+
+Ensemble simulations (:mod:`spin_dynamics`, :mod:`pulse_excitation`) split
+their members into contiguous shards, one per worker process. Large arrays
+travel through :mod:`multiprocessing.shared_memory` rather than being pickled:
+:class:`SharedArrays` packs named arrays into one block that the workers map.
+Two kinds of workers:
+
+* :func:`executor` / :func:`submit` -- a persistent ``ProcessPoolExecutor``
+  per worker count, for stateless per-shard functions; a pool broken by a
+  crashed worker is replaced on the next call;
+* :class:`WorkerGroup` -- one long-lived process per shard holding a state
+  object (e.g. a shard Engine with its propagator cache), driven by method
+  calls over a Pipe.
+
+Every member of a shard is computed exactly as it would be in one process,
+so a caller that reduces over the members in the parent gets results
+bit-identical to the serial path.
+
+Workers are started with the 'spawn' method: the callers include Qt windows
+whose worker threads must not fork a multithreaded process.
+
+    import atomize.math_modules.parallel as par
+"""
+
+import os
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Byte alignment of the arrays inside a shared block.
+_ALIGN = 64
+
+_EXECUTORS = {}
+
+# no fork: the parent may be a multithreaded Qt process
+_CONTEXT = multiprocessing.get_context('spawn')
+
+
+def resolve_workers(workers, n=None):
+    """Number of worker processes for ``workers`` over ``n`` items.
+
+    ``None``, 0 and 1 mean serial (1); a negative value counts back from the
+    number of CPUs (-1 = all of them). Never more than ``n``.
+    """
+    if not workers:
+        return 1
+    workers = int(workers)
+    if workers < 0:
+        workers = max(1, (os.cpu_count() or 1) + 1 + workers)
+    if n is not None:
+        workers = min(workers, max(1, int(n)))
+    return max(1, workers)
+
+
+def split(n, workers):
+    """Contiguous ``(lo, hi)`` bounds of ``workers`` near-equal shards of n."""
+    edges = [(n * i) // workers for i in range(workers + 1)]
+    return [(edges[i], edges[i + 1]) for i in range(workers)]
+
+
+def _discard(workers):
+    ex = _EXECUTORS.pop(workers, None)
+    if ex is not None:
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+def executor(workers):
+    """Persistent process pool with ``workers`` processes (created once, and
+    again after a worker crash broke it)."""
+    ex = _EXECUTORS.get(workers)
+    if ex is not None and getattr(ex, '_broken', False):
+        _discard(workers)
+        ex = None
+    if ex is None:
+        ex = _EXECUTORS[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                       mp_context=_CONTEXT)
+    return ex
+
+
+def submit(workers, fn, *args):
+    """``executor(workers).submit(fn, *args)``; a pool found broken at submit
+    time is replaced and the submit retried once."""
+    try:
+        return executor(workers).submit(fn, *args)
+    except BrokenProcessPool:
+        _discard(workers)
+        return executor(workers).submit(fn, *args)
+
+
+class SharedArrays:
+    """Named NumPy arrays in one shared-memory block.
+
+    :meth:`create` allocates the block in the owning process, :meth:`attach`
+    maps it in a worker from the picklable ``spec``. ``arrays`` holds the
+    views; :meth:`close` drops them, closes the mapping and, in the owner,
+    frees the block.
+    """
+
+    def __init__(self, shm, spec, owner):
+        self.shm = shm
+        self.spec = spec
+        self.owner = owner
+        self.arrays = {key: np.ndarray(shape, dtype=dt, buffer=shm.buf, offset=off)
+                       for key, dt, shape, off in spec[1]}
+
+    @classmethod
+    def create(cls, arrays=None, empty=None):
+        """Block holding copies of ``arrays`` ({key: ndarray}) plus
+        uninitialised ``empty`` arrays ({key: (shape, dtype)})."""
+        arrays = {k: np.ascontiguousarray(a) for k, a in (arrays or {}).items()}
+        items = [(k, a.dtype, a.shape) for k, a in arrays.items()]
+        items += [(k, np.dtype(dt), tuple(shape)) for k, (shape, dt) in (empty or {}).items()]
+        layout, size = [], 0
+        for key, dt, shape in items:
+            layout.append((key, dt.str, shape, size))
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dt.itemsize
+            size += -(-nbytes // _ALIGN) * _ALIGN
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        blk = cls(shm, (shm.name, layout), owner=True)
+        for key, a in arrays.items():
+            blk.arrays[key][...] = a
+        return blk
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(shared_memory.SharedMemory(name=spec[0]), spec, owner=False)
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+
+def _serve(conn, factory, args):
+    """Worker loop of a WorkerGroup: build the state object, answer calls."""
+    try:
+        obj, error = factory(*args), None
+    except Exception as e:
+        obj, error = None, e
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        if msg is None:
+            break
+        method, margs = msg
+        try:
+            if error is not None:
+                raise error
+            reply = ('ok', getattr(obj, method)(*margs))
+        except Exception as e:
+            reply = ('err', e)
+        try:
+            conn.send(reply)
+        except Exception as e:                # unpicklable result / exception
+            conn.send(('err', RuntimeError(repr(e))))
+
+
+def _stop(procs, conns):
+    for conn in conns:
+        try:
+            conn.send(None)
+            conn.close()
+        except (OSError, ValueError):
+            pass
+    for p in procs:
+        p.join(timeout=5)
+        if p.is_alive():
+            p.terminate()
+
+
+class WorkerGroup:
+    """One long-lived process per entry of ``args``, each holding
+    ``factory(*args[i])``; :meth:`call` runs a method on all of them at once.
+
+    The processes are stopped by :meth:`close` or when the group is garbage
+    collected. ``factory`` and the call arguments must be picklable.
+    """
+
+    def __init__(self, factory, args):
+        self._procs, self._conns = [], []
+        for a in args:
+            parent, child = _CONTEXT.Pipe()
+            p = _CONTEXT.Process(target=_serve, args=(child, factory, tuple(a)),
+                                 daemon=True)
+            p.start()
+            child.close()
+            self._procs.append(p)
+            self._conns.append(parent)
+        self._finalizer = weakref.finalize(self, _stop, self._procs, self._conns)
+
+    def __len__(self):
+        return len(self._conns)
+
+    def call(self, method, args):
+        """``method(*args[i])`` on worker i, for all workers in parallel;
+        returns the results in worker order. The first worker error is
+        re-raised here once every worker has answered."""
+        for conn, a in zip(self._conns, args):
+            conn.send((method, tuple(a)))
+        out, error = [], None
+        for conn in self._conns:
+            status, value = conn.recv()
+            if status == 'err' and error is None:
+                error = value
+            out.append(value)
+        if error is not None:
+            raise error
+        return out
+
+    def close(self):
+        self._finalizer()
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import sys
+from collections import OrderedDict
 import numpy as np
 
 # scipy.signal is an optional dependency (pip install -e .[math]) and slow to
@@ -129,6 +130,73 @@ def echo_center(envelope, window=0):
     return int(min(max(round(com), 0), n - 1))
 
 
+class Demodulator():
+    """IQ demodulation + phase correction of digitizer / oscilloscope records.
+
+    Shared by the digitizer_demodulate / oscilloscope_demodulate methods of
+    the device modules. A record (I, Q) with the time axis first is rotated
+    by the phasor exp(-i(2π f t + ph + ph1 t + ph2 t²)), t = k/fs. The phasor
+    depends only on the record length and the settings, which stay fixed
+    over a scan, so it is built once per (length, fs, freq, ph, ph1, ph2) and
+    kept in a small LRU. The windowed integral is fused: the I and Q rows of
+    the integration window are contracted with the real and imaginary parts
+    of the phasor, so neither the corrected record nor any complex array is
+    built, and the cost scales with the window rather than the record.
+    """
+
+    # phasors kept (one per distinct record length / setting)
+    CACHE_SIZE = 8
+
+    def __init__(self):
+        self._phasors = OrderedDict()
+
+    def phasor(self, n, fs, freq, ph=0.0, ph1=0.0, ph2=0.0):
+        """(cos, sin) parts of the n-point correction phasor, read-only.
+
+        fs is the sampling frequency in Hz, freq the offset in MHz; ph, ph1
+        and ph2 are the zero/first/second order terms (rad, rad/s, rad/s²).
+        """
+        key = (int(n), float(fs), float(freq), float(ph), float(ph1), float(ph2))
+        parts = self._phasors.get(key)
+        if parts is not None:
+            self._phasors.move_to_end(key)
+            return parts
+        t = np.arange(key[0]) / key[1]
+        phase = 2 * np.pi * key[2] * 1e6 * t + key[3] + key[4] * t + key[5] * t**2
+        # exp(-i phase) = cos(phase) - i sin(phase)
+        parts = (np.cos(phase), -np.sin(phase))
+        for a in parts:
+            a.flags.writeable = False
+        self._phasors[key] = parts
+        if len(self._phasors) > self.CACHE_SIZE:
+            self._phasors.popitem(last=False)
+        return parts
+
+    def demodulate(self, arr_i, arr_q, fs, freq, ph=0.0, ph1=0.0, ph2=0.0,
+                   window=None, scale=1.0):
+        """Demodulated (I, Q) of a record (time axis first, 1D or 2D).
+
+        With window = (left, right) the record must be 2D (points x delays)
+        and the result is the per-column integral over rows [left:right]
+        times `scale`; otherwise the full corrected record is returned.
+        """
+        arr_i = np.asarray(arr_i)
+        arr_q = np.asarray(arr_q)
+        c, s = self.phasor(arr_i.shape[0], fs, freq, ph, ph1, ph2)
+        if window is None:
+            shape = (arr_i.shape[0],) + (1,) * (arr_i.ndim - 1)
+            c, s = c.reshape(shape), s.reshape(shape)
+            return arr_i * c - arr_q * s, arr_i * s + arr_q * c
+        if arr_i.ndim != 2:
+            raise ValueError("Incorrect dimension of the array")
+        rows = slice(*window)
+        c, s = c[rows], s[rows]
+        win_i, win_q = arr_i[rows], arr_q[rows]
+        res_i = (c @ win_i - s @ win_q) * scale
+        res_q = (s @ win_i + c @ win_q) * scale
+        return res_i, res_q
+
+
 class Signal_Processing():
     """Lightweight 1D signal-processing helpers (smoothing, baseline, scaling).
 
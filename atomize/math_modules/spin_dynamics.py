@@ -98,6 +98,7 @@ Mims ESEEM formulas by ``tests/test_spin_dynamics.py`` in this package.
 
 import numpy as np
 
+import atomize.math_modules.parallel as par
 import atomize.math_modules.pulse_excitation as pex
 
 
@@ -315,6 +316,14 @@ class Engine:
     relaxation : dict or None
         ``{'T1': ns, 'Tm': ns}`` (either optional). Phenomenological, applied
         in the H0 eigenbasis during delays and detection windows only.
+    workers : int or None
+        Opt-in multi-core runs: split the ensemble into this many contiguous
+        shards, each propagated by its own long-lived worker process (-1 =
+        one per CPU). H0 and its eigenbasis are shared with the workers and
+        the per-member signals come back through shared memory; the weighted
+        ensemble sum is done here, so results are bit-identical to the
+        serial path. Worth it for large ensembles; :meth:`close` stops the
+        workers (so does garbage collection).
 
     The static Hamiltonian of every member is diagonalized once at
     construction; pulse propagators are cached per Pulse object, so sweeping
@@ -324,7 +333,8 @@ class Engine:
     evaluates observables on it.
     """
 
-    def __init__(self, system, offsets=0.0, b1=1.0, weights=None, relaxation=None):
+    def __init__(self, system, offsets=0.0, b1=1.0, weights=None, relaxation=None,
+                 workers=None):
         self.sys = system
         off = np.atleast_1d(np.asarray(offsets, dtype=float))
         b1v = np.atleast_1d(np.asarray(b1, dtype=float))
@@ -349,14 +359,21 @@ class Engine:
 
         # Static Hamiltonian per member, diagonalized once: delays become
         # O(dim) phase factors and relaxation acts in this eigenbasis.
-        self.H0 = system.H_int[None, :, :] + self.offsets[:, None, None] * system.Sz_e[None, :, :]
-        self.w0, self.V0 = np.linalg.eigh(self.H0)
+        H0 = system.H_int[None, :, :] + self.offsets[:, None, None] * system.Sz_e[None, :, :]
+        self._set_static(H0, *np.linalg.eigh(H0))
+        self.workers = par.resolve_workers(workers, self.n)
+        self._shards = None
+        self._shared = None
+        self._pulse_ids = {}
+
+    def _set_static(self, H0, w0, V0):
+        s = self.sys
+        self.H0, self.w0, self.V0 = H0, w0, V0
         self.V0h = self.V0.conj().swapaxes(-1, -2)
-        self.Sp_eig = self.V0h @ system.Sp_e @ self.V0
-        self.eq_pop = np.real(np.einsum('nij,jk,nki->ni', self.V0h,
-                                        system.Sz_e, self.V0))
+        self.Sp_eig = self.V0h @ s.Sp_e @ self.V0
+        self.eq_pop = np.real(np.einsum('nij,jk,nki->ni', self.V0h, s.Sz_e, self.V0))
         # Sz_e is diagonal in the product basis -> Rz phase shifts are diagonal.
-        self.mz_e = np.real(np.diag(system.Sz_e))
+        self.mz_e = np.real(np.diag(s.Sz_e))
         self._ucache = {}
         self.rho_last = None
 
@@ -381,48 +398,232 @@ class Engine:
         (plus ``'vm'`` if requested). ``self.rho_last`` is set to the final
         density matrix of the last cycle step (N, dim, dim).
         """
+        cycle = self._check_cycle(events, phase_cycle)
+        if self.workers > 1:
+            return self._run_sharded('run', events, (), {'phase_cycle': phase_cycle},
+                                     (), keep_members)
+        acc_t, acc_v = None, None
+        rho = None
+        for shifts, recv in cycle:
+            rho = np.tile(self.sys.Sz_e, (self.n, 1, 1))
+            rho, _, _, wins = self._propagate(rho, events, shifts, 0.0, 0)
+            acc_t, acc_v = self._accumulate(acc_t, acc_v, wins, recv, len(cycle))
+        self.rho_last = rho
+        return self._records(acc_t, acc_v, keep_members)
+
+    def run_sweep(self, events, sweep_delay_index, taus, phase_cycle=None,
+                  keep_members=False, max_bytes=256 * 2**20):
+        """:meth:`run` for every length of one swept :class:`Delay`.
+
+        The events before ``events[sweep_delay_index]`` are propagated once
+        per phase-cycle step; the swept delay is then applied to all ``taus``
+        at once as a diagonal phase (+ relaxation) in the H0 eigenbasis. The
+        events after it are an affine map of the density matrix, so instead
+        of pushing every tau through them the engine propagates the d*d
+        eigenbasis matrices |i><j| (and the zero matrix) once and combines
+        their detected responses with the swept eigenbasis density matrices;
+        short sweeps (n_tau <= d*d + 1) push the (n_tau, N, d, d) batch
+        through directly. A 3-pulse ESEEM T axis or an inversion-recovery
+        delay thus costs about one propagation instead of one per point. The
+        swept density matrices are processed in chunks of at most
+        ``max_bytes``.
+
+        Parameters
+        ----------
+        events : sequence of Pulse / Delay / Detect
+        sweep_delay_index : int
+            Index into ``events`` of the swept Delay (its own ``tau`` is
+            ignored).
+        taus : array_like
+            Delay lengths (ns), one per sweep point (at least one).
+        phase_cycle, keep_members
+            As in :meth:`run`.
+        max_bytes : int
+            Memory bound of one chunk of the batched density matrix.
+
+        Returns
+        -------
+        list of dict, one per Detect event, as :meth:`run` but with a leading
+        sweep axis: ``'t'`` and ``'v'`` are (n_tau, nt), ``'vm'`` is
+        (n_tau, N, nt). Equal to calling :meth:`run` once per tau (to
+        round-off). ``self.rho_last`` is the final density matrix of the last
+        tau.
+        """
+        k = int(sweep_delay_index)
+        if not 0 <= k < len(events) or not isinstance(events[k], Delay):
+            raise ValueError("events[%d] is not a Delay" % k)
+        taus = np.maximum(np.atleast_1d(np.asarray(taus, dtype=float)), 0.0)
+        if taus.ndim != 1:
+            raise ValueError("taus must be one-dimensional")
+        if taus.size == 0:
+            raise ValueError("taus is empty")
+        cycle = self._check_cycle(events, phase_cycle)
+        if self.workers > 1:
+            return self._run_sharded('run_sweep', events, (k, taus),
+                                     {'phase_cycle': phase_cycle, 'max_bytes': max_bytes},
+                                     (taus.size,), keep_members)
+        prefix, suffix = events[:k], events[k + 1:]
+        ip0 = sum(1 for ev in prefix if isinstance(ev, Pulse))
+        d = self.sys.dim
+        # ~4 live (chunk, N, d, d) complex arrays per step of the suffix
+        chunk = max(1, int(max_bytes) // (4 * 16 * self.n * d * d))
+
+        response = taus.size > d * d + 1
+        if response:
+            # |i><j| in the eigenbasis (+ the zero matrix), in the product basis
+            basis = np.zeros((d * d + 1, self.n, d, d), dtype=complex)
+            q = np.arange(d * d)
+            basis[q, :, q // d, q % d] = 1.0
+            basis = self.V0 @ basis @ self.V0h
+
+        acc_t, acc_v = None, None
+        for shifts, recv in cycle:
+            rho0 = np.tile(self.sys.Sz_e, (self.n, 1, 1))
+            rho0, t0, _, wins0 = self._propagate(rho0, prefix, shifts, 0.0, 0)
+            r0 = self.V0h @ rho0 @ self.V0
+            if response:
+                _, _, _, resp = self._propagate(basis, suffix, shifts, 0.0, ip0)
+                # detected signal = sum_ij r_ij * G_ij + g0 (the map is affine)
+                # G per member as (N, d*d, n_t) so each chunk is one matmul
+                resp = [(tt, np.ascontiguousarray((sig[:-1] - sig[-1]).transpose(1, 0, 2)),
+                         sig[-1]) for tt, sig in resp]
+            parts = []
+            for c in range(0, taus.size, chunk):
+                tc = taus[c:c + chunk]
+                ph = np.exp(-2j * np.pi * self.w0[None, :, :] * tc[:, None, None])
+                r = (ph[..., :, None] * ph.conj()[..., None, :]) * r0[None]
+                if self._relaxing:
+                    r = self._relax(r, tc)
+                if response:
+                    rq = r.reshape(tc.size, self.n, d * d).transpose(1, 0, 2)
+                    parts.append([(t0 + tc[:, None] + tt,
+                                   (rq @ G).transpose(1, 0, 2) + g0)
+                                  for tt, G, g0 in resp])
+                else:
+                    rho = self.V0 @ r @ self.V0h
+                    parts.append(self._propagate(rho, suffix, shifts, t0 + tc, ip0)[3])
+            # prefix windows do not depend on tau: repeat them along the sweep
+            wins = [(np.broadcast_to(tt, (taus.size,) + tt.shape),
+                     np.broadcast_to(v, (taus.size,) + v.shape)) for tt, v in wins0]
+            wins += [(np.concatenate([p[j][0] for p in parts]),
+                      np.concatenate([p[j][1] for p in parts]))
+                     for j in range(len(parts[0]))]
+            acc_t, acc_v = self._accumulate(acc_t, acc_v, wins, recv, len(cycle))
+        # final state of the last tau (last cycle step), as run() leaves it
+        r = (ph[-1][:, :, None] * ph[-1].conj()[:, None, :]) * r0
+        if self._relaxing:
+            r = self._relax(r, tc[-1])
+        self.rho_last = self._propagate(self.V0 @ r @ self.V0h, suffix, shifts, 0.0, ip0)[0]
+        return self._records(acc_t, acc_v, keep_members)
+
+    def close(self):
+        """Stop the shard workers of a ``workers=`` Engine (no-op otherwise)."""
+        if self._shards is not None:
+            self._shards.close()
+            self._shared.close()
+            self._shards = self._shared = None
+
+    def _run_sharded(self, method, events, args, kwargs, lead, keep_members):
+        """:meth:`run` / :meth:`run_sweep` over the shard workers.
+
+        Each worker runs ``method`` on its members and writes the per-member
+        signals and final rho into one shared block; the weighted sum over
+        the members happens here, exactly as in the serial path. Pulses are
+        sent with a stable number per Pulse object so the workers' propagator
+        caches survive across calls, like ``_ucache`` does here.
+        """
+        if self._shards is None:
+            self._shared = par.SharedArrays.create({
+                'offsets': self.offsets, 'b1': self.b1,
+                'H0': self.H0, 'w0': self.w0, 'V0': self.V0})
+            relax = {'T1': self.T1, 'Tm': self.Tm}
+            self._shards = par.WorkerGroup(
+                _shard_engine, [(self._shared.spec, lo, hi, self.sys, relax)
+                                for lo, hi in par.split(self.n, self.workers)])
+        tokens = []
+        for ev in events:
+            if isinstance(ev, Pulse):
+                # pin the Pulse (as _ucache does): id() is reused after GC
+                tokens.append(self._pulse_ids.setdefault(id(ev), (ev, len(self._pulse_ids)))[1])
+            else:
+                tokens.append(None)
+        d = self.sys.dim
+        empty = {'rho': ((self.n, d, d), complex)}
+        for j, ev in enumerate(ev for ev in events if isinstance(ev, Detect)):
+            empty['vm%d' % j] = (lead + (self.n, _window_points(ev)), complex)
+        out = par.SharedArrays.create(empty=empty)
+        try:
+            call = (method, list(events), tokens, args, kwargs, out.spec)
+            times = self._shards.call('_shard_call', [call] * len(self._shards))[0]
+            acc_v = [out.arrays['vm%d' % j].copy() for j in range(len(times))]
+            self.rho_last = out.arrays['rho'].copy()
+        finally:
+            out.close()
+        return self._records(times, acc_v, keep_members)
+
+    def _shard_call(self, method, events, tokens, args, kwargs, spec):
+        """Worker side of :meth:`_run_sharded`; returns the window times."""
+        events = [ev if tok is None else self._pulses.setdefault(tok, ev)
+                  for ev, tok in zip(events, tokens)]
+        recs = getattr(self, method)(events, *args, keep_members=True, **kwargs)
+        lo, hi = self._members
+        out = par.SharedArrays.attach(spec)
+        try:
+            for j, rec in enumerate(recs):
+                out.arrays['vm%d' % j][..., lo:hi, :] = rec['vm']
+            out.arrays['rho'][lo:hi] = self.rho_last
+        finally:
+            out.close()
+        return [rec['t'] for rec in recs]
+
+    def _check_cycle(self, events, phase_cycle):
         npulse = sum(1 for ev in events if isinstance(ev, Pulse))
         cycle = list(phase_cycle) if phase_cycle else [(None, 0.0)]
         for shifts, _ in cycle:
             if shifts is not None and len(shifts) < npulse:
                 raise ValueError("phase-cycle step has %d shifts for %d pulses"
                                  % (len(shifts), npulse))
-        acc_t, acc_v = None, None
-        rho = None
-        for shifts, recv in cycle:
-            rho = np.tile(self.sys.Sz_e, (self.n, 1, 1))
-            t = 0.0
-            ip = 0
-            wins = []
-            for ev in events:
-                if isinstance(ev, Pulse):
-                    U, dur = self._propagator(ev)
-                    if shifts is not None and shifts[ip] != 0.0:
-                        rz = np.exp(-1j * float(shifts[ip]) * self.mz_e)
-                        U = U * (rz[:, None] * rz.conj()[None, :])
-                    rho = U @ rho @ U.conj().swapaxes(-1, -2)
-                    t += dur
-                    ip += 1
-                elif isinstance(ev, Delay):
-                    rho = self._free(rho, ev.tau)
-                    t += ev.tau
-                elif isinstance(ev, Detect):
-                    rho, times, sig = self._detect(rho, ev, t)
-                    t = float(times[-1])
-                    wins.append((times, sig))
-                else:
-                    raise TypeError("unknown sequence event: %r" % (ev,))
-            scale = np.exp(-1j * float(recv)) / len(cycle)
-            if acc_v is None:
-                acc_t = [w[0] for w in wins]
-                acc_v = [w[1] * scale for w in wins]
+        return cycle
+
+    def _propagate(self, rho, events, shifts, t, ip):
+        """Apply ``events`` to ``rho`` (..., N, d, d) from time ``t`` (ns,
+        scalar or one per leading batch index) and pulse number ``ip``;
+        returns (rho, t, ip, [(times, sig) per Detect])."""
+        wins = []
+        for ev in events:
+            if isinstance(ev, Pulse):
+                U, dur = self._propagator(ev)
+                if shifts is not None and shifts[ip] != 0.0:
+                    rz = np.exp(-1j * float(shifts[ip]) * self.mz_e)
+                    U = U * (rz[:, None] * rz.conj()[None, :])
+                rho = U @ rho @ U.conj().swapaxes(-1, -2)
+                t = t + dur
+                ip += 1
+            elif isinstance(ev, Delay):
+                rho = self._free(rho, ev.tau)
+                t = t + ev.tau
+            elif isinstance(ev, Detect):
+                rho, times, sig = self._detect(rho, ev, t)
+                t = times[..., -1]
+                wins.append((times, sig))
             else:
-                for k, w in enumerate(wins):
-                    acc_v[k] = acc_v[k] + w[1] * scale
-        self.rho_last = rho
+                raise TypeError("unknown sequence event: %r" % (ev,))
+        return rho, t, ip, wins
+
+    @staticmethod
+    def _accumulate(acc_t, acc_v, wins, recv, nsteps):
+        """Add one phase-cycle step's windows (receiver phase ``recv``)."""
+        scale = np.exp(-1j * float(recv)) / nsteps
+        if acc_v is None:
+            return [w[0] for w in wins], [w[1] * scale for w in wins]
+        for k, w in enumerate(wins):
+            acc_v[k] = acc_v[k] + w[1] * scale
+        return acc_t, acc_v
+
+    def _records(self, acc_t, acc_v, keep_members):
         out = []
         for tt, vm in zip(acc_t, acc_v):
-            rec = {'t': tt, 'v': np.einsum('n,nt->t', self.weights, vm)}
+            rec = {'t': tt, 'v': np.einsum('n,...nt->...t', self.weights, vm)}
             if keep_members:
                 rec['vm'] = vm
             out.append(rec)
@@ -479,7 +680,10 @@ class Engine:
             return rho
         r = self.V0h @ rho @ self.V0
         ph = np.exp(-2j * np.pi * self.w0 * tau)
-        r = r * (ph[:, :, None] * ph.conj()[:, None, :])
+        # Temporary on the left: NumPy computes large temporaries in place and
+        # would swap the operands of a complex product, which rounds
+        # differently -- the workers= shards would then not be bit-identical.
+        r = (ph[:, :, None] * ph.conj()[:, None, :]) * r
         if self._relaxing:
             r = self._relax(r, tau)
         return self.V0 @ r @ self.V0h
@@ -488,40 +692,67 @@ class Engine:
         """Phenomenological relaxation; ``r`` MUST be in the H0 eigenbasis.
 
         Coherences damp with Tm; populations (diagonal) recover towards the
-        thermal equilibrium populations with T1 and never see Tm.
+        thermal equilibrium populations with T1 and never see Tm. ``tau`` is a
+        scalar or one value per leading batch index of ``r`` (..., N, d, d).
         """
         idx = np.arange(r.shape[-1])
-        pops = r[:, idx, idx]
-        r = r * (np.exp(-tau / self.Tm) if np.isfinite(self.Tm) else 1.0)
+        tau = np.asarray(tau, dtype=float)[..., None, None]
+        pops = r[..., idx, idx]
+        r = r * (np.exp(-tau[..., None] / self.Tm) if np.isfinite(self.Tm) else 1.0)
         if np.isfinite(self.T1):
             pops = self.eq_pop + (pops - self.eq_pop) * np.exp(-tau / self.T1)
-        r[:, idx, idx] = pops               # r is a fresh array (the product above)
+        r[..., idx, idx] = pops             # r is a fresh array (the product above)
         return r
 
     def _detect(self, rho, ev, t0):
         """Sample the detection window; returns (rho_after, times, sig (N, nt))."""
-        n = 1 if ev.length <= 0 else int(round(ev.length / ev.dt)) + 1
+        n = _window_points(ev)
         r = self.V0h @ rho @ self.V0
-        sig = np.empty((self.n, n), dtype=complex)
+        sig = np.empty(r.shape[:-2] + (n,), dtype=complex)
         if n > 1:
             ph = np.exp(-2j * np.pi * self.w0 * ev.dt)
             P = ph[:, :, None] * ph.conj()[:, None, :]
         for k in range(n):
-            sig[:, k] = np.einsum('nij,nji->n', r, self.Sp_eig) / self.sys.det_norm
+            sig[..., k] = np.einsum('...ij,...ji->...', r, self.Sp_eig) / self.sys.det_norm
             if k < n - 1:
                 r = r * P
                 if self._relaxing:
                     r = self._relax(r, ev.dt)
         rho = self.V0 @ r @ self.V0h
-        times = t0 + ev.dt * np.arange(n)
+        times = np.asarray(t0, dtype=float)[..., None] + ev.dt * np.arange(n)
         return rho, times, sig
 
 
+def _window_points(ev):
+    """Samples in a Detect window (both ends included)."""
+    return 1 if ev.length <= 0 else int(round(ev.length / ev.dt)) + 1
+
+
+def _shard_engine(spec, lo, hi, system, relaxation):
+    """Engine over members ``lo:hi`` of a ``workers=`` Engine, built in a
+    worker process from the shared H0 and eigenbasis (no re-diagonalization)."""
+    shared = par.SharedArrays.attach(spec)
+    a = {k: v[lo:hi].copy() for k, v in shared.arrays.items()}
+    shared.close()
+    eng = Engine.__new__(Engine)
+    eng.sys = system
+    eng.offsets, eng.b1 = a['offsets'], a['b1']
+    eng.n = hi - lo
+    eng.weights = np.full(eng.n, 1.0 / eng.n)       # the parent does the sum
+    eng.T1, eng.Tm = relaxation['T1'], relaxation['Tm']
+    eng._relaxing = np.isfinite(eng.T1) or np.isfinite(eng.Tm)
+    eng._set_static(a['H0'], a['w0'], a['V0'])
+    eng.workers = 1
+    eng._members = (lo, hi)
+    eng._pulses = {}
+    return eng
+
+
 # --------------------------------------------------------------------------- #
 # Conveniences
 # --------------------------------------------------------------------------- #
 def run(system, events, offsets=0.0, b1=1.0, weights=None, relaxation=None,
-        phase_cycle=None, keep_members=False):
+        phase_cycle=None, keep_members=False, workers=None):
     """One-shot wrapper: build an :class:`Engine` and :meth:`Engine.run` it.
 
     For sweeps (ESEEM tau/T axes, DEER traces, ...) build the Engine once and
@@ -529,8 +760,11 @@ def run(system, events, offsets=0.0, b1=1.0, weights=None, relaxation=None,
     pulse propagators are then computed only once.
     """
     eng = Engine(system, offsets=offsets, b1=b1, weights=weights,
-                 relaxation=relaxation)
-    return eng.run(events, phase_cycle=phase_cycle, keep_members=keep_members)
+                 relaxation=relaxation, workers=workers)
+    try:
+        return eng.run(events, phase_cycle=phase_cycle, keep_members=keep_members)
+    finally:
+        eng.close()
 
 
 def gaussian_weights(offsets, sigma, center=0.0):
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ensemble-sharding benchmark: wall time of a shaped 3-pulse ESEEM run on
+spin_dynamics.Engine and of a WURST excitation profile from
+pulse_excitation.propagate_pulse, serial against workers = 1..N processes,
+with a bit-for-bit check of every sharded result against the serial one.
+The Engine times are for a repeat run (propagators cached in the workers);
+the first run, which also builds them, is printed separately:
+
+    python atomize/math_modules/tests/bench_ensemble_workers.py
+        [--offsets 4001] [--max-workers N] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import numpy as np
+
+import atomize.math_modules.pulse_excitation as pex
+import atomize.math_modules.spin_dynamics as sd
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--offsets', type=int, default=4001)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    offsets = np.linspace(-0.1, 0.1, args.offsets)
+    system = sd.SpinSystem((0.5, 0.5))
+    system.zeeman(1, 0.0148)
+    system.hyperfine(0, 1, A=0.002, B=0.003)
+    kw = dict(offsets=offsets, weights=sd.gaussian_weights(offsets, 0.03),
+              relaxation={'Tm': 900.0})
+    pulses = [sd.Pulse('gaussian', 16.0, 0.03, {'sigma': 4.0}) for _ in range(3)]
+    events = [pulses[0], sd.Delay(120.0), pulses[1], sd.Delay(300.0), pulses[2],
+              sd.Delay(120.0), sd.Detect(40.0, 1.0)]
+    M0 = np.tile([0.0, 0.0, 1.0], (offsets.size, 1))
+    wurst = (M0, 'WURST', 400.0, 0.02, offsets, {'n': 20.0, 'bw': 200.0})
+
+    print("%d offsets, %d CPUs" % (offsets.size, os.cpu_count() or 1))
+    ref_v = ref_m = None
+    base_e = base_p = None
+    for workers in [None] + list(range(1, args.max_workers + 1)):
+        eng = sd.Engine(system, workers=workers, **kw)
+        t0 = time.perf_counter()
+        eng.run(events)
+        first = time.perf_counter() - t0
+        t_e, rec = best_of(args.repeat, lambda: eng.run(events)[0])
+        eng.close()
+        t_p, M = best_of(args.repeat, lambda: pex.propagate_pulse(*wurst, workers=workers))
+        if ref_v is None:
+            ref_v, ref_m, base_e, base_p = rec['v'], M, t_e, t_p
+        same = np.array_equal(rec['v'], ref_v) and np.array_equal(M, ref_m)
+        print("%-9s Engine first %7.3f s  repeat %7.3f s (%5.2fx)   "
+              "propagate_pulse %7.3f s (%5.2fx)   %s"
+              % ('serial' if workers is None else 'workers=%d' % workers,
+                 first, t_e, base_e / t_e, t_p, base_p / t_p,
+                 'identical' if same else 'DIFFERENT'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validation suite for :mod:`atomize.math_modules.deer`.
+
+Run directly (``python test_deer.py``) or via pytest. Needs scipy (the
+``math`` extra). Traces come from :func:`deer.simulate` on the self-test
+geometry (bimodal P(r), 3D background, Gaussian noise), inverted with the
+default ``deer_invert`` settings:
+
+1. **Regularization scan** -- the fast ``l_curve`` (warm-started NNLS along
+   the grid, dof traces from one generalized SVD) must pick the same alpha
+   as the per-alpha reference scan (``fast=False``) for both selection
+   methods, with the same P(r), residual and GCV curves; the process-pool
+   scan (``workers=``) must equal the serial fast scan.
+2. **Kernel provider** -- the universal-table kernel must match the Fresnel
+   closed form to 1e-9 (also past the table range); the memoized kernel is
+   returned read-only from the in-memory LRU, and round-trips through the
+   on-disk .npy cache unchanged.
+3. **Validation sweep** -- ``deer_validate`` with ``n_jobs`` worker processes
+   must return the serial ensemble (per-trial seeding), and the streamed
+   ``progress`` band must end on the final one.
+4. **Multi-Gaussian 'mc'** -- the analytic mixture Jacobian against central
+   differences, the batched mixture against the per-vector one, and the
+   multi-start with ``n_jobs`` against the serial result on a bimodal trace.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+import atomize.math_modules.deer as deer
+
+
+def _traces():
+    """(K, F, L) for simulated traces at three noise levels."""
+    r = deer.default_r_axis(1.5, 8.0, 200)
+    t = np.linspace(-0.1, 3.0, 400)
+    P = np.exp(-0.5*((r - 3.5)/0.25)**2) + 0.6*np.exp(-0.5*((r - 4.6)/0.3)**2)
+    out = []
+    for seed, noise in ((0, 0.005), (1, 0.02), (2, 0.05)):
+        V = deer.simulate(t, r, P, lam=0.35, k=0.1, noise=noise, seed=seed)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            res = deer.deer_invert(t, V, r=r, bg_start=1.2)
+        out.append((res['kernel'], res['form_factor'],
+                    deer.regularization_matrix(len(r), 2, include_edges=True)))
+    return out
+
+
+# --------------------------------------------------------------------------- #
+# Rung 1: regularization scan
+# --------------------------------------------------------------------------- #
+def test_l_curve_fast_matches_reference():
+    alphas = np.logspace(-4, 3, 40)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for K, F, L in _traces():
+            for method in ('gcv', 'curvature'):
+                ref = deer.l_curve(K, F, alphas, L, method=method, fast=False)
+                new = deer.l_curve(K, F, alphas, L, method=method)
+                assert new['index'] == ref['index'], (method, new['index'], ref['index'])
+                assert new['alpha_opt'] == ref['alpha_opt']
+                assert new['corner_ok'] == ref['corner_ok']
+                assert np.allclose(new['P'], ref['P'], rtol=0, atol=1e-7*ref['P'].max())
+                assert np.allclose(new['rho'], ref['rho'], rtol=1e-9)
+                assert np.allclose(new['gcv'], ref['gcv'], rtol=1e-5)
+
+
+def test_l_curve_workers_equal_serial():
+    K, F, L = _traces()[1]
+    alphas = np.logspace(-4, 3, 24)
+    serial = deer.l_curve(K, F, alphas, L)
+    pooled = deer.l_curve(K, F, alphas, L, workers=3)
+    assert pooled['index'] == serial['index']
+    assert np.allclose(pooled['P'], serial['P'], rtol=0, atol=1e-7*serial['P'].max())
+    assert np.allclose(pooled['gcv'], serial['gcv'], rtol=1e-9)
+
+
+# --------------------------------------------------------------------------- #
+# Rung 2: kernel provider
+# --------------------------------------------------------------------------- #
+def test_kernel_table_matches_fresnel():
+    for t, r in ((np.linspace(-0.1, 3.0, 400), deer.default_r_axis(1.5, 8.0, 200)),
+                 (np.linspace(0.0, 40.0, 120), np.linspace(0.8, 1.5, 40))):
+        K = deer.dipolar_kernel(t, r, cache=False)
+        assert np.abs(K - deer.dipolar_kernel(t, r, exact=True)).max() < 1e-9
+        assert np.all(K[np.abs(t) == 0] == 1.0)
+
+
+def test_kernel_cache_memory_and_disk():
+    t = np.linspace(0.0, 2.0, 150)
+    r = deer.default_r_axis(2.0, 6.0, 90)
+    deer.clear_kernel_cache()
+    K = deer.dipolar_kernel(t, r)
+    assert deer.dipolar_kernel(t.copy(), r.copy()) is K
+    assert not K.flags.writeable
+    assert deer.dipolar_kernel(t, r, nu_dd=52.0) is not K
+    with tempfile.TemporaryDirectory() as d:
+        try:
+            deer.set_kernel_disk_cache(directory=d)
+            deer.clear_kernel_cache()
+            K1 = deer.dipolar_kernel(t, r)
+            assert len(os.listdir(d)) == 1
+            deer.clear_kernel_cache()
+            K2 = deer.dipolar_kernel(t, r)
+            assert isinstance(K2, np.memmap) and np.array_equal(K1, K2)
+            deer.clear_kernel_cache(disk=True)
+            assert os.listdir(d) == []
+        finally:
+            deer.set_kernel_disk_cache(False)
+
+
+# --------------------------------------------------------------------------- #
+# Rung 3: validation sweep
+# --------------------------------------------------------------------------- #
+def test_validate_jobs_deterministic():
+    r = deer.default_r_axis(2.0, 6.0, 150)
+    t = np.linspace(0.0, 2.5, 256)
+    V = deer.simulate(t, r, np.exp(-0.5*((r - 3.5)/0.25)**2), lam=0.35, k=0.1,
+                      noise=0.01, seed=1)
+    kw = dict(r=r, bg_start=1.0, noise=0.01, n_noise=2, seed=2)
+    seen = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        serial = deer.deer_validate(t, V, **kw)
+        pooled = deer.deer_validate(t, V, n_jobs=2,
+                                    progress=lambda *a: seen.append(a), **kw)
+    assert pooled['n_trials'] == serial['n_trials'] == 27
+    assert np.allclose(pooled['ensemble'], serial['ensemble'], rtol=1e-9, atol=1e-12)
+    assert [a[0] for a in seen] == list(range(1, 28))
+    band = seen[-1][2]
+    assert band['n_trials'] == 27
+    assert np.allclose(band['P_lower'], pooled['P_lower'])
+    assert np.allclose(band['P_upper'], pooled['P_upper'])
+
+
+# --------------------------------------------------------------------------- #
+# Rung 4: multi-Gaussian 'mc'
+# --------------------------------------------------------------------------- #
+def test_gauss_mixture_jacobian():
+    r = np.linspace(2.0, 6.0, 120)
+    p = np.array([0.8, 3.4, 0.25, 0.5, 4.6, 0.4])
+    J = deer._gauss_mixture_jac(p, r)
+    h = 1e-6
+    for j in range(p.size):
+        dp = np.zeros_like(p); dp[j] = h
+        fd = (deer._gauss_mixture(p + dp, r) - deer._gauss_mixture(p - dp, r))/(2*h)
+        assert np.allclose(J[:, j], fd, atol=1e-6), j
+    batch = np.vstack([p, p*1.1])
+    assert np.allclose(deer._gauss_mixture(batch, r)[1], deer._gauss_mixture(p*1.1, r))
+
+
+def test_gauss_mc_jobs_equal_serial():
+    r = deer.default_r_axis(1.5, 8.0, 150)
+    t = np.linspace(-0.1, 3.0, 300)
+    P = np.exp(-0.5*((r - 3.5)/0.25)**2) + 0.6*np.exp(-0.5*((r - 4.6)/0.3)**2)
+    V = deer.simulate(t, r, P, lam=0.35, k=0.1, noise=0.01, seed=1)
+    kw = dict(r=r, bg_start=1.2, method='mc', max_gauss=3)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        serial = deer.deer_invert_gauss(t, V, **kw)
+        pooled = deer.deer_invert_gauss(t, V, n_jobs=2, **kw)
+    assert serial['n_gauss'] == pooled['n_gauss']
+    assert abs(r[np.argmax(serial['P_density'])] - 3.5) < 0.1
+    assert np.allclose(pooled['P_density'], serial['P_density'], rtol=1e-7, atol=1e-9)
+
+
+TESTS = [
+    test_l_curve_fast_matches_reference,
+    test_l_curve_workers_equal_serial,
+    test_kernel_table_matches_fresnel,
+    test_kernel_cache_memory_and_disk,
+    test_validate_jobs_deterministic,
+    test_gauss_mixture_jacobian,
+    test_gauss_mc_jobs_equal_serial,
+]
+
+
+def main():
+    failed = 0
+    for fn in TESTS:
+        t0 = time.time()
+        try:
+            fn()
+            print("PASS  %-38s (%.2f s)" % (fn.__name__, time.time() - t0))
+        except Exception as exc:
+            failed += 1
+            print("FAIL  %-38s %s" % (fn.__name__, exc))
+    print("-" * 60)
+    print("%d/%d passed" % (len(TESTS) - failed, len(TESTS)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
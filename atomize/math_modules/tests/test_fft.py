@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validation suite for the batch path of :mod:`atomize.math_modules.fft`.
+
+Run directly (``python test_fft.py``) or via pytest. The reference is the
+former per-call recipe: window, ``np.fft.fft`` with zero-fill, ``argsort`` of
+``fftfreq``:
+
+1. **Legacy fft()** -- the fftshift reordering must return exactly the
+   argsort result, 1D and 2D, for even and odd lengths.
+2. **fft_batch / spectrum** -- every zero-fill choice and window, complex and
+   real input (half-length transform + conjugate fill), along either axis,
+   must match the reference; float32 output within single precision.
+3. **Caches** -- the window and frequency axis are built once per geometry
+   and shared read-only.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import atomize.math_modules.fft as fft_module
+import atomize.math_modules.signal_processing as sigproc
+
+FFT = fft_module.Fast_Fourier()
+DT = 2.0                                     # ns -> MHz axis
+
+
+def _reference(data, n, window='None', axis=-1):
+    """Windowed, zero-filled, argsort-ordered spectrum and frequency axis."""
+    data = np.moveaxis(data, axis, -1)
+    w = sigproc.apodization_window(data.shape[-1], window)
+    sp = np.fft.fft(data*w, n, axis=-1)
+    freq = np.fft.fftfreq(n, DT*1e-3)
+    order = np.argsort(freq)
+    return freq[order], np.moveaxis(sp[..., order], -1, axis)
+
+
+def _traces(n0, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((3, n0)), rng.standard_normal((3, n0))
+
+
+# --------------------------------------------------------------------------- #
+# Rung 1: legacy fft()
+# --------------------------------------------------------------------------- #
+def test_fft_matches_argsort():
+    for n0 in (7, 8, 255, 256):
+        I, Q = _traces(n0)
+        x = np.arange(n0)*DT
+        for data_i, data_q in ((I[0], Q[0]), (I, Q)):
+            freq, re, im = FFT.fft(x, data_i, data_q, DT, re='True')
+            rf, rs = _reference(data_i + 1j*data_q, n0)
+            assert np.array_equal(freq, rf)
+            assert np.array_equal(re + 1j*im, rs)
+        freq, mag = FFT.fft(x, I[0], Q[0], DT)
+        assert np.array_equal(mag, np.abs(_reference(I[0] + 1j*Q[0], n0)[1]))
+
+
+# --------------------------------------------------------------------------- #
+# Rung 2: fft_batch / spectrum
+# --------------------------------------------------------------------------- #
+def test_fft_batch_matches_reference():
+    for n0 in (7, 8, 255, 256):
+        I, Q = _traces(n0, seed=n0)
+        for zf in ('None', '×2', 'Next pow₂'):
+            n = sigproc.zerofill_length(n0, zf)
+            for win in ('None', 'Hann', 'Kaiser'):
+                for data_q in (Q, None):
+                    data = I if data_q is None else I + 1j*Q
+                    rf, rs = _reference(data, n, win)
+                    freq, re, im = FFT.fft_batch(I, data_q, DT, zerofill=zf, window=win)
+                    assert np.allclose(freq, rf, rtol=1e-14)
+                    assert np.allclose(re + 1j*im, rs, rtol=0, atol=1e-12), (n0, zf, win)
+                    freq, re, im = FFT.fft_batch(I, data_q, DT, zerofill=zf, window=win,
+                                                 workers=2, float32=True)
+                    assert freq.dtype == re.dtype == im.dtype == np.float32
+                    assert np.allclose(re + 1j*im, rs, rtol=0, atol=1e-4)
+    nan_i = np.full(16, np.nan)
+    assert all(np.isnan(a).all() for a in FFT.fft_batch(nan_i, nan_i, DT))
+
+
+def test_spectrum_along_axis0():
+    I, Q = _traces(50)
+    Z = (I + 1j*Q).T                          # (50, 3): transform the columns
+    for data in (Z, Z.real):
+        sp = FFT.spectrum(data, 64, axis=0, window='Hann')
+        assert sp.shape == (64, 3)
+        assert np.allclose(sp, _reference(data, 64, 'Hann', axis=0)[1], atol=1e-12)
+
+
+# --------------------------------------------------------------------------- #
+# Rung 3: caches
+# --------------------------------------------------------------------------- #
+def test_window_and_axis_cached_read_only():
+    f1 = FFT.freq_axis(512, 2e-3)
+    assert FFT.freq_axis(512, 2e-3) is f1 and not f1.flags.writeable
+    w1 = fft_module._window(300, 'Hann', 8.6)
+    assert fft_module._window(300, 'Hann', 8.6) is w1 and not w1.flags.writeable
+    I, _ = _traces(300)
+    before = I.copy()
+    FFT.spectrum(I, 512, window='Hann')
+    assert np.array_equal(I, before)          # input never overwritten
+
+
+TESTS = [
+    test_fft_matches_argsort,
+    test_fft_batch_matches_reference,
+    test_spectrum_along_axis0,
+    test_window_and_axis_cached_read_only,
+]
+
+
+def main():
+    failed = 0
+    for fn in TESTS:
+        t0 = time.time()
+        try:
+            fn()
+            print("PASS  %-38s (%.2f s)" % (fn.__name__, time.time() - t0))
+        except Exception as exc:
+            failed += 1
+            print("FAIL  %-38s %s" % (fn.__name__, exc))
+    print("-" * 60)
+    print("%d/%d passed" % (len(TESTS) - failed, len(TESTS)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
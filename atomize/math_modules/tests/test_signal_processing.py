@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validation suite for :class:`atomize.math_modules.signal_processing.Demodulator`.
+
+Run directly (``python test_signal_processing.py``) or via pytest. The
+reference is the former per-call recipe of the digitizer / oscilloscope
+``*_demodulate`` methods: complex record times ``np.exp(-1j*phase)``, then
+the real / imaginary sums over the integration window:
+
+1. **Full record** -- 1D and 2D records, with and without the first / second
+   order phase terms, must match the reference.
+2. **Windowed integral** -- the fused contraction over [left:right] times the
+   scale must match the summed window; 1D input is refused.
+3. **Phasor cache** -- the phasor is built once per setting, returned
+   read-only, and the LRU stays bounded.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import atomize.math_modules.signal_processing as sigproc
+
+FS = 2.5e9/4                                 # Hz
+FREQ = 30.0                                  # MHz
+
+
+def _reference(arr_i, arr_q, ph, ph1, ph2, window=None, scale=1.0):
+    signal = arr_i + 1j*arr_q
+    t = np.arange(signal.shape[0])/FS
+    corr = np.exp(-1j*(2*np.pi*FREQ*1e6*t + ph + ph1*t + ph2*t**2))
+    out = signal*corr.reshape((signal.shape[0],) + (1,)*(signal.ndim - 1))
+    if window is None:
+        return out.real, out.imag
+    out = out[window[0]:window[1]]
+    return np.sum(out.real, axis=0)*scale, np.sum(out.imag, axis=0)*scale
+
+
+def _record(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(shape), rng.standard_normal(shape)
+
+
+# --------------------------------------------------------------------------- #
+# Rung 1: full record
+# --------------------------------------------------------------------------- #
+def test_full_record_matches_reference():
+    dem = sigproc.Demodulator()
+    for shape in ((512,), (512, 40)):
+        arr_i, arr_q = _record(shape)
+        for ph1, ph2 in ((0.0, 0.0), (1e6, 3e13)):
+            res = dem.demodulate(arr_i, arr_q, FS, FREQ, 0.4, ph1, ph2)
+            ref = _reference(arr_i, arr_q, 0.4, ph1, ph2)
+            assert all(np.allclose(a, b, rtol=0, atol=1e-12) for a, b in zip(res, ref))
+
+
+# --------------------------------------------------------------------------- #
+# Rung 2: windowed integral
+# --------------------------------------------------------------------------- #
+def test_window_integral_matches_reference():
+    dem = sigproc.Demodulator()
+    arr_i, arr_q = _record((512, 40), seed=1)
+    for ph1, ph2 in ((0.0, 0.0), (1e6, 3e13)):
+        for window in ((100, 300), (0, 512), (500, 600)):
+            res = dem.demodulate(arr_i, arr_q, FS, FREQ, 0.4, ph1, ph2,
+                                 window=window, scale=1.6)
+            ref = _reference(arr_i, arr_q, 0.4, ph1, ph2, window, 1.6)
+            assert res[0].shape == (40,)
+            assert all(np.allclose(a, b, rtol=0, atol=1e-10) for a, b in zip(res, ref))
+    try:
+        dem.demodulate(arr_i[:, 0], arr_q[:, 0], FS, FREQ, window=(0, 10))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("1D record accepted for the windowed integral")
+
+
+# --------------------------------------------------------------------------- #
+# Rung 3: phasor cache
+# --------------------------------------------------------------------------- #
+def test_phasor_cached_read_only():
+    dem = sigproc.Demodulator()
+    c, s = dem.phasor(256, FS, FREQ, 0.4)
+    assert dem.phasor(256, FS, FREQ, 0.4)[0] is c
+    assert not c.flags.writeable and not s.flags.writeable
+    assert dem.phasor(256, FS, FREQ, 0.5)[0] is not c
+    for n in range(dem.CACHE_SIZE + 4):
+        dem.phasor(16 + n, FS, FREQ)
+    assert len(dem._phasors) == dem.CACHE_SIZE
+
+
+TESTS = [
+    test_full_record_matches_reference,
+    test_window_integral_matches_reference,
+    test_phasor_cached_read_only,
+]
+
+
+def main():
+    failed = 0
+    for fn in TESTS:
+        t0 = time.time()
+        try:
+            fn()
+            print("PASS  %-38s (%.2f s)" % (fn.__name__, time.time() - t0))
+        except Exception as exc:
+            failed += 1
+            print("FAIL  %-38s %s" % (fn.__name__, exc))
+    print("-" * 60)
+    print("%d/%d passed" % (len(TESTS) - failed, len(TESTS)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
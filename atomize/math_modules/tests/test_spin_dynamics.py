@@ -7,7 +7,8 @@ Run directly (``python test_spin_dynamics.py``) or via pytest. The ladder:
 
 1. **Bloch limit** -- a bare S = 1/2 must reproduce the independent Bloch-
    vector module :mod:`pulse_excitation` to ~machine precision, for single
-   shaped pulses (incl. resonator + ring-down) and a pulse-delay-pulse chain.
+   shaped pulses (incl. resonator + ring-down) and a pulse-delay-pulse chain;
+   the Bloch module's cached composite propagator must act on any M.
 2. **Hahn echo** -- echo position, phase and shape against the analytic
    result for a Gaussian inhomogeneous line; flip-angle scaling
    ``E ~ sin(b1) sin^2(b2/2)``; phenomenological Tm and T1 against their
@@ -17,7 +18,11 @@ Run directly (``python test_spin_dynamics.py``) or via pytest. The ladder:
    8-step pathway-selective phase cycle, so it also validates the
    phase-cycling machinery (and asserts that *without* the cycle the
    single-packet signal is contaminated -- the cycle really does the work).
+   The batched delay sweep (``Engine.run_sweep``) must equal the per-point
+   loop.
 +  dt-convergence (2nd-order step error) and unitarity/purity checks.
++  ``workers=`` ensemble sharding (Engine and the Bloch module) must be
+   bit-identical to the serial path; ``bench_ensemble_workers.py`` times it.
 """
 
 import sys
@@ -93,6 +98,24 @@ def test_bloch_limit_sequence():
     assert err < 1e-9, "sequence: engine vs Bloch mismatch %.3e" % err
 
 
+def test_bloch_cached_propagator():
+    offsets = np.linspace(-0.1, 0.1, 101)
+    args = ('WURST', 200.0, 0.02, offsets, {'n': 20.0, 'bw': 200.0})
+    pex.clear_propagator_cache()
+    q = pex.pulse_propagator(*args, phi0=0.3)
+    assert pex.pulse_propagator(*args, phi0=0.3) is q, "cache miss on equal key"
+    assert pex.pulse_propagator(*args, phi0=0.4) is not q
+    # A rotation: linear in M, orthonormal columns, |q| = 1
+    E = [pex.rotate(np.tile(e, (offsets.size, 1)), q) for e in np.eye(3)]
+    M = np.random.default_rng(3).normal(size=(offsets.size, 3))
+    lin = sum(M[:, [i]] * E[i] for i in range(3))
+    assert np.max(np.abs(pex.propagate_pulse(M, *args, phi0=0.3) - lin)) < 1e-12
+    R = np.stack(E, axis=2)
+    err = np.max(np.abs(np.einsum('nki,nkj->nij', R, R) - np.eye(3)))
+    assert err < 1e-12, "composite propagator not orthogonal: %.3e" % err
+    assert np.max(np.abs(np.sum(q * q, axis=1) - 1.0)) < 1e-14
+
+
 # --------------------------------------------------------------------------- #
 # Rung 2: Hahn echo physics
 # --------------------------------------------------------------------------- #
@@ -261,6 +284,42 @@ def test_3p_eseem_mims_phase_cycle():
     assert np.max(np.abs(Vnc - want)) > 1e-3, "no-cycle run suspiciously clean"
 
 
+def test_run_sweep_matches_point_loop():
+    # Shaped pulses on a broad line with relaxation, the 8-step cycle, a
+    # transient window, and a prefix Detect that must repeat along the sweep.
+    offsets = np.linspace(-0.05, 0.05, 41)
+    eng = sd.Engine(_eseem_system(B_HF), offsets=offsets,
+                    weights=sd.gaussian_weights(offsets, 0.02),
+                    relaxation={'T1': 3000.0, 'Tm': 900.0})
+    p = [sd.Pulse('gaussian', 16.0, 0.03, {'sigma': 4.0}, dt=0.5) for _ in range(3)]
+    Ts = np.arange(0.0, 400.0, 16.0)
+    ev = [p[0], sd.Delay(120.0), p[1], sd.Detect(8.0, 2.0), sd.Delay(0.0),
+          p[2], sd.Delay(110.0), sd.Detect(20.0, 1.0)]
+    for max_bytes in (256 * 2**20, 1):             # one batch / one tau per chunk
+        out = eng.run_sweep(ev, 4, Ts, phase_cycle=CYCLE_3P, keep_members=True,
+                            max_bytes=max_bytes)
+        for i, T in enumerate(Ts):
+            ev[4] = sd.Delay(T)
+            want = eng.run(ev, phase_cycle=CYCLE_3P, keep_members=True)
+            for got, w in zip(out, want):
+                assert np.allclose(got['t'][i], w['t'], rtol=0, atol=1e-9)
+                err = np.max(np.abs(got['vm'][i] - w['vm']))
+                assert err < 1e-12, "run_sweep vs run at T=%g: %.3e" % (T, err)
+                assert np.max(np.abs(got['v'][i] - w['v'])) < 1e-12
+        ev[4] = sd.Delay(0.0)
+    # A short sweep goes through the direct (n_tau, N, d, d) batch instead of
+    # the |i><j| response of the events after the delay.
+    short = eng.run_sweep(ev, 4, Ts[:3], phase_cycle=CYCLE_3P, keep_members=True)
+    for got, w in zip(short, out):
+        assert np.max(np.abs(got['vm'] - w['vm'][:3])) < 1e-12
+    try:
+        eng.run_sweep(ev, 4, [])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("run_sweep accepted an empty taus")
+
+
 # --------------------------------------------------------------------------- #
 # Convergence / unitarity
 # --------------------------------------------------------------------------- #
@@ -293,18 +352,52 @@ def test_purity_conserved():
     assert abs(purity - want) < 1e-10, "Tr(rho^2) drifted: %r vs %r" % (purity, want)
 
 
+# --------------------------------------------------------------------------- #
+# Multi-core ensemble sharding
+# --------------------------------------------------------------------------- #
+def test_workers_bit_identical():
+    offsets = np.linspace(-0.05, 0.05, 61)
+    kw = dict(offsets=offsets, weights=sd.gaussian_weights(offsets, 0.02),
+              relaxation={'T1': 3000.0, 'Tm': 900.0})
+    p = [sd.Pulse('gaussian', 16.0, 0.03, {'sigma': 4.0}) for _ in range(3)]
+    ev = [p[0], sd.Delay(120.0), p[1], sd.Delay(80.0), p[2], sd.Delay(110.0),
+          sd.Detect(20.0, 1.0)]
+    serial = sd.Engine(_eseem_system(B_HF), **kw)
+    sharded = sd.Engine(_eseem_system(B_HF), workers=3, **kw)
+    try:
+        for _ in range(2):                         # 2nd call: workers' caches
+            want = serial.run(ev, phase_cycle=CYCLE_3P, keep_members=True)[0]
+            got = sharded.run(ev, phase_cycle=CYCLE_3P, keep_members=True)[0]
+            for key in ('t', 'v', 'vm'):
+                assert np.array_equal(got[key], want[key]), "run: %s differs" % key
+        assert np.array_equal(sharded.rho_last, serial.rho_last)
+        Ts = np.arange(0.0, 200.0, 8.0)
+        want = serial.run_sweep(ev, 3, Ts, phase_cycle=CYCLE_3P)[0]
+        got = sharded.run_sweep(ev, 3, Ts, phase_cycle=CYCLE_3P)[0]
+        assert np.array_equal(got['v'], want['v']), "run_sweep differs"
+    finally:
+        sharded.close()
+    M = np.tile([0.0, 0.0, 1.0], (offsets.size, 1))
+    args = (M, 'WURST', 200.0, 0.02, offsets, {'n': 20.0, 'bw': 200.0})
+    assert np.array_equal(pex.propagate_pulse(*args, workers=2),
+                          pex.propagate_pulse(*args))
+
+
 # --------------------------------------------------------------------------- #
 TESTS = [
     test_bloch_limit_single_pulses,
     test_bloch_limit_sequence,
+    test_bloch_cached_propagator,
     test_hahn_echo_shape_phase_position,
     test_hahn_flip_angle_scaling,
     test_relaxation_tm_hahn,
     test_relaxation_t1_recovery,
     test_2p_eseem_mims,
     test_3p_eseem_mims_phase_cycle,
+    test_run_sweep_matches_point_loop,
     test_dt_convergence,
     test_purity_conserved,
+    test_workers_bit_identical,
 ]
 
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+append_y benchmark for the LivePlot receiver: cost of appending N points to
+one curve of a CrosshairDock through the GrowableCurve store, against the
+former path (raw data -> Python list -> append -> np.linspace -> full replot).
+Rendering is left to the event loop, which this benchmark does not run, so the
+numbers are the per-point bookkeeping cost the receiver pays.
+
+    QT_QPA_PLATFORM=offscreen python tests/bench_append.py [--points 100000]
+        [--legacy-points 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import numpy as np
+
+STYLE = {'xname': 'X', 'xscale': 's', 'yname': 'Y', 'yscale': 'V',
+         'scatter': 'False', 'timeaxis': 'False', 'vline': 'False'}
+
+
+def legacy_append(pw, label, value, start_step):
+    xs, ys = pw.get_raw_data(label)
+    new_ys = list(ys)
+    new_ys.append(value)
+    x0, dx = start_step
+    nx = len(new_ys)
+    xs = np.linspace(x0, x0 + (nx - 1)*dx, nx)
+    pw.plot(xs, new_ys, name=label, **STYLE)
+
+
+def report(name, n, total):
+    print("%-34s %8d pts  %8.3f s  %8.2f us/pt" % (name, n, total, 1e6 * total / n))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=100_000)
+    parser.add_argument('--legacy-points', type=int, default=20_000)
+    args = parser.parse_args()
+
+    import atomize.main.local_config as lconf
+    lconf.copy_config(os.path.join(_REPO_ROOT, 'atomize', 'config.ini'),
+                      os.path.join(_REPO_ROOT, 'atomize', 'device_modules', 'config'))
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    from atomize.main import widgets
+
+    store = widgets.GrowableCurve()
+    t0 = time.perf_counter()
+    for i in range(args.points):
+        store.append(0.5 * i, float(i))
+    report('GrowableCurve.append', args.points, time.perf_counter() - t0)
+
+    pw = widgets.CrosshairDock(name='bench')
+    t0 = time.perf_counter()
+    for i in range(args.points):
+        pw.append_point('new', float(i), start_step=(0, 0.5), **STYLE)
+    report('CrosshairDock.append_point', args.points, time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for i in range(args.legacy_points):
+        legacy_append(pw, 'old', float(i), (0, 0.5))
+    report('legacy list + linspace replot', args.legacy_points, time.perf_counter() - t0)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AWG buffer benchmark for Spectrum_M4I_6631_X8: time to fill the page-aligned
+DMA buffer with one pulse per shape (SINE, GAUSS, SINC, WURST, SECH/TANH),
+the former per-sample loop (math.sin / exp / np.sinc + int() into the ctypes
+pointer, reproduced below) against the vectorized pulse_samples() written
+through a numpy view of the buffer. The device is created in test mode, but
+the module still needs the Spectrum driver files (pyspcm, spcm_tools) on the
+header_dir path of its config, as on the measurement PC:
+
+    python tests/bench_awg_buffer.py [--lengths 1000 5000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from math import sin, pi, exp
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import numpy as np
+
+# (name, function code, frequency in MHz, sigma in ns)
+SHAPES = (('SINE', 0, 100, 0), ('GAUSS', 1, 100, 200), ('SINC', 2, 100, 100),
+          ('WURST', 4, [50, 150], 0), ('SECH/TANH', 5, [50, 150], 0))
+
+
+def legacy_fill(dev, pnBuffer, element, memsize):
+    """Former per-sample 'Single' mode loop for one channel."""
+    mid_point = int(element[4] / 2)
+    for i in range(0, memsize, 1):
+        if i > element[4]:
+            break
+        if element[1] == 0:
+            pnBuffer[i] = int(dev.maxCAD / element[8] * sin(2*pi*i*element[2] / dev.sample_rate + element[3]))
+        elif element[1] == 1:
+            pnBuffer[i] = int(dev.maxCAD / element[8] * exp(-((i - mid_point)**2)*(1/(2*element[5]**2))) *
+                              sin(2*pi*i*element[2] / dev.sample_rate + element[3]))
+        elif element[1] == 2:
+            pnBuffer[i] = int(dev.maxCAD / element[8] * np.sinc(2*(i - mid_point) / element[5]) *
+                              sin(2*pi*i*element[2] / dev.sample_rate + element[3]))
+        elif element[1] == 4:
+            pnBuffer[i] = int(dev.maxCAD / element[8] * (1 - abs(sin(pi*(i - mid_point) / element[4]))**element[9]) *
+                              sin(2*pi*(i*element[2][0] / dev.sample_rate + 0.5*(element[2][1] - element[2][0]) *
+                                        i**2 / element[4] / dev.sample_rate) + element[3]))
+        elif element[1] == 5:
+            freq_cen = (element[2][1] + element[2][0]) / 2
+            pnBuffer[i] = int(dev.maxCAD / element[8] * (1 / np.cosh(element[10] * element[4] * 2**(element[9] - 1) *
+                              ((i - mid_point) / element[4])**element[9])) *
+                              sin(2*pi*(element[2][1] - element[2][0]) / dev.sample_rate / element[10] *
+                                  np.log(np.cosh(element[10]*(i - mid_point))) / 2 / np.tanh(element[10]*mid_point) +
+                                  element[3] + 2*pi*i*freq_cen / dev.sample_rate))
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lengths', type=float, nargs='+', default=[1000, 5000],
+                        help='pulse lengths in ns')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sys.argv[1:] = ['test']
+    from atomize.device_modules.Spectrum_M4I_6631_X8 import Spectrum_M4I_6631_X8
+    from ctypes import cast, POINTER, c_int16
+    from spcm_tools import pvAllocMemPageAligned
+
+    dev = Spectrum_M4I_6631_X8()
+    ns = dev.sample_rate / 1000
+    for length_ns in args.lengths:
+        length = int(length_ns * ns)
+        memsize = dev.round_to_closest(length, 32)
+        dev.pvBuffer = pvAllocMemPageAligned(2 * memsize)
+        pnBuffer = cast(dev.pvBuffer, POINTER(c_int16))
+        for name, func, freq, sigma_ns in SHAPES:
+            # [channel, function, frequency, phase, length, sigma, start, delta_start, amp, n_wurst, b_sech]
+            element = (0, func, freq, 0.3, length, int(sigma_ns * ns), 0, 0, 1.0, 6.0, 0.02)
+            t_old = best_of(args.repeat, lambda: legacy_fill(dev, pnBuffer, element, memsize))
+            reference = dev.buffer_view(memsize).copy()
+
+            def vectorized():
+                buf = dev.buffer_view(memsize)
+                t = np.arange(min(length, memsize - 1) + 1)
+                buf[:len(t)] = dev.pulse_samples(element, t, t)
+
+            t_new = best_of(args.repeat, vectorized)
+            diff = np.abs(dev.buffer_view(memsize).astype(np.int64) - reference).max()
+            print("%-10s %7d ns  loop %9.2f ms   vectorized %7.3f ms   %7.1fx   max diff %d"
+                  % (name, length_ns, 1e3 * t_old, 1e3 * t_new, t_old / t_new, diff))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LivePlot transport benchmark: sustained frames/s and p99 send latency of
+LivePlotClient for 1D and 2D (float64 and native int16) frames, and for three
+plots per point sent one by one or as one batch; protocol version 1 (320-byte
+JSON meta, one frame in flight) against version 2 binary meta headers with the
+one-frame handshake (slots=1) and with the multi-slot ring.
+
+The receiver is a headless copy of MainWindow's LivePlot server (the real
+accept / read_from, with rendering replaced by an optional fixed sleep that
+stands in for the GUI), started in a subprocess. --work-ms adds a fixed
+"acquisition" pause between sends on the client side:
+
+    QT_QPA_PLATFORM=offscreen python tests/bench_liveplot.py [--frames 300]
+        [--render-ms 2] [--work-ms 0] [--slots 8]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import numpy as np
+
+
+def serve(render_ms):
+    from PyQt6.QtCore import QCoreApplication
+    from PyQt6.QtNetwork import QLocalServer
+    from atomize.main.main_window import MainWindow
+
+    class HeadlessReceiver:
+        accept = MainWindow.accept
+        read_from = MainWindow.read_from
+        do_batch = MainWindow.do_batch
+
+        def __init__(self):
+            self.server = QLocalServer()
+            self.server.removeServer('LivePlot')
+            self.server.listen('LivePlot')
+            self.server.newConnection.connect(self.accept)
+            self.conns = []
+            self.shared_mems = []
+            self.recv_buffers = {}
+            self.ring_conns = set()
+            self.decoders = {}
+            self.meta = None
+
+        def do_operation(self, arr=None):
+            if render_ms:
+                time.sleep(render_ms / 1000.0)
+
+    app = QCoreApplication([])
+    receiver = HeadlessReceiver()
+    print('ready', flush=True)
+    app.exec()
+
+
+def run(name, client, send, frames, work_ms):
+    lat = np.empty(frames)
+    t0 = time.perf_counter()
+    for i in range(frames):
+        if work_ms:
+            time.sleep(work_ms / 1000.0)
+        t = time.perf_counter()
+        send(i)
+        lat[i] = time.perf_counter() - t
+    client.flush()
+    total = time.perf_counter() - t0
+    print("%-32s %8.1f frames/s   p50 %7.3f ms   p99 %7.3f ms"
+          % (name, frames / total, 1e3 * np.percentile(lat, 50),
+             1e3 * np.percentile(lat, 99)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--serve', action='store_true')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--render-ms', type=float, default=2.0)
+    parser.add_argument('--work-ms', type=float, default=0.0)
+    parser.add_argument('--slots', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.render_ms)
+        return 0
+
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve',
+                             '--render-ms', str(args.render_ms)],
+                            stdout=subprocess.PIPE, text=True)
+    try:
+        proc.stdout.readline()
+        from atomize.main.client import LivePlotClient
+
+        x = np.linspace(0, 1, 4096)
+        y = np.random.default_rng(0).standard_normal(4096)
+        z = np.random.default_rng(1).standard_normal((512, 2048))
+        z16 = (1000 * z).astype(np.int16)
+        for version, slots in ((1, 1), (2, 1), (2, args.slots)):
+            client = LivePlotClient(slots=slots, version=version)
+            tag = 'v%d slots=%d' % (version, client.slots)
+            run('1D 4096 pts, ' + tag, client,
+                lambda i: client.plot_xy('bench 1D', x, y), args.frames,
+                args.work_ms)
+            run('2D 512x2048, ' + tag, client,
+                lambda i: client.plot_z('bench 2D', z), max(1, args.frames // 5),
+                args.work_ms)
+            run('2D 512x2048 int16, ' + tag, client,
+                lambda i: client.plot_z('bench 2D', z16), max(1, args.frames // 5),
+                args.work_ms)
+
+            def three_plots(i):
+                client.plot_xy('bench 1D', x, y)
+                client.plot_xy('bench 1D b', x, y)
+                client.label('bench 1D', 'point %d' % i)
+
+            def three_plots_batched(i):
+                with client.batch():
+                    three_plots(i)
+
+            run('3 plots/point, ' + tag, client, three_plots, args.frames,
+                args.work_ms)
+            run('3 plots/point batched, ' + tag, client, three_plots_batched,
+                args.frames, args.work_ms)
+            client.close()
+    finally:
+        proc.terminate()
+        proc.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
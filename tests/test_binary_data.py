@@ -0,0 +1,84 @@
+"""Unit tests for the chunked binary data container (binary_data) and its
+transparent use by Saver_Opener (no Qt window)."""
+import numpy as np
+import pytest
+
+import atomize.general_modules.binary_data as binary
+
+HEADER = 'Date: today\nHorizontal Resolution: 2 ns\nTime (ns), I (V), Q (V)'
+
+
+def _opener():
+    openfile = pytest.importorskip('atomize.general_modules.csv_opener_saver')
+    opener = openfile.Saver_Opener.__new__(openfile.Saver_Opener)   # skip the config
+    opener.test_flag = 'None'
+    return opener
+
+
+def test_round_trip_2d_keeps_header_axes_and_precision(tmp_path):
+    path = str(tmp_path / 'data.atd')
+    data = np.random.default_rng(0).standard_normal((50, 3))
+    axes = [{'name': 'Time', 'unit': 'ns', 'start': 0.0, 'step': 2.0}]
+    binary.write(path, data, header=HEADER, axes=axes)
+    assert binary.is_binary(path) and binary.wants_binary(path)
+    res = binary.read(path)
+    assert np.array_equal(res['data'], data)
+    assert res['header'] == HEADER and res['axes'] == axes and not res['frames']
+    assert res['header_lines'][-1] == 'Time (ns), I (V), Q (V)'
+
+
+def test_append_chunks_and_torn_tail(tmp_path):
+    path = str(tmp_path / 'scan.atd')
+    open(path, 'w').close()                  # as create_file_dialog leaves it
+    rows = [np.full((2, 4), k, dtype=float) for k in range(3)]
+    for r in rows:
+        binary.write(path, r, header=HEADER, mode='a')
+    res = binary.read(path)
+    assert res['chunks'] == 3 and np.array_equal(res['data'], np.vstack(rows))
+    with open(path, 'ab') as fh:             # a crash in the middle of an append
+        fh.write(b'CHNK' + np.uint32(2).tobytes() + np.array([2, 4], '<u8').tobytes())
+        fh.write(b'\0'*10)
+    assert np.array_equal(binary.read(path)['data'], np.vstack(rows))
+    with pytest.raises(ValueError):
+        binary.write(path, np.zeros(4), mode='a')
+    with pytest.raises(ValueError):                  # other column count
+        binary.write(path, np.zeros((2, 5)), mode='a')
+    assert binary.read(path)['chunks'] == 3
+
+
+def test_append_frames_checks_the_frame_shape(tmp_path):
+    path = str(tmp_path / 'raw.atd')
+    binary.write(path, np.zeros((2, 6, 5)))
+    binary.write(path, np.ones((2, 6, 5)), mode='a')
+    with pytest.raises(ValueError):
+        binary.write(path, np.ones((3, 6, 5)), mode='a')
+    assert binary.read(path)['data'].shape[0] == 2
+
+
+def test_frames_match_csv_layout_and_convert(tmp_path):
+    data = np.random.default_rng(1).standard_normal((2, 6, 5))
+    path = str(tmp_path / 'raw.atd')
+    binary.write(path, data, header=HEADER)
+    res = binary.read(path)
+    assert res['frames'] and res['data'].shape == (2, 5, 6)
+    written = binary.to_csv(path)
+    assert [p.rsplit('/', 1)[1] for p in written] == ['raw.csv', 'raw_1.csv']
+    for k, name in enumerate(written):
+        assert np.allclose(np.genfromtxt(name, delimiter=','), data[k].T, rtol=1e-6)
+        with open(name) as fh:
+            assert fh.readline() == '# Date: today\n'
+
+
+def test_saver_opener_detects_binary(tmp_path):
+    opener = _opener()
+    data = np.column_stack([np.arange(8.0), np.sin(np.arange(8.0)), np.cos(np.arange(8.0))])
+    csv_path, bin_path = str(tmp_path / 'a.csv'), str(tmp_path / 'a.atd')
+    opener.save_data(csv_path, data, header=HEADER)
+    opener.save_data(bin_path, data, header=HEADER)
+    h_csv, d_csv = opener.open_1d(csv_path, header=2)
+    h_bin, d_bin = opener.open_1d(bin_path, header=2)
+    assert h_bin == h_csv
+    assert np.allclose(d_bin, d_csv, rtol=1e-6) and np.array_equal(d_bin, data.T)
+    assert np.array_equal(opener.open_2d(bin_path)[1], data)
+    parts = opener.open_2d_appended(bin_path, chunk_size=2)[1]
+    assert len(parts) == 2 and np.array_equal(np.vstack(parts), data)
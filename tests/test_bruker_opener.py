@@ -0,0 +1,64 @@
+"""Unit tests for the lazy (memory-mapped) mode of bruker_opener against the
+eager reader, on synthetic BES3T and WinEPR files."""
+import numpy as np
+import pytest
+
+import atomize.general_modules.bruker_opener as bruker
+
+
+def _bes3t(tmp_path, values, fmt='D', code='f8', cplx=True, bseq='BIG', ypts=4):
+    base = tmp_path / f'hyscore_{fmt}_{bseq}'
+    xpts = values.shape[-1]
+    (base.with_suffix('.DSC')).write_text(
+        f"#DESC\nBSEQ {bseq}\nIKKF {'CPLX' if cplx else 'REAL'}\nIRFMT {fmt}\n"
+        f"XPTS {xpts}\nXMIN 0\nXWID {xpts - 1}\nYPTS {ypts}\nYMIN 100\nYWID 30\n")
+    endian = '>' if bseq == 'BIG' else '<'
+    raw = np.stack([values.real, values.imag], axis=-1) if cplx else values
+    raw.astype(endian + code).tofile(base.with_suffix('.DTA'))
+    return str(base.with_suffix('.DSC'))
+
+
+def _values(shape, cplx=True, seed=0):
+    rng = np.random.default_rng(seed)
+    v = np.round(rng.standard_normal(shape)*100)
+    return v + 1j*np.round(rng.standard_normal(shape)*100) if cplx else v
+
+
+@pytest.mark.parametrize('fmt, code, bseq', [('D', 'f8', 'BIG'), ('F', 'f4', 'LIT'),
+                                             ('I', 'i4', 'BIG'), ('S', 'i2', 'LIT')])
+def test_lazy_bes3t_matches_eager(tmp_path, fmt, code, bseq):
+    values = _values((4, 6))
+    path = _bes3t(tmp_path, values, fmt, code, bseq=bseq)
+    reader = bruker.Bruker_Opener()
+    eager, lazy = reader.open(path), reader.open(path, lazy=True)
+    assert isinstance(lazy['data'], np.memmap) and lazy['data'].shape == (4, 6)
+    assert np.array_equal(bruker.materialize(lazy['data']), eager['data'])
+    assert np.array_equal(bruker.materialize(lazy['data'], 2), values[2])
+    i, q = bruker.split_iq(lazy['data'], np.s_[1:3])
+    assert i.dtype == np.float64 and np.array_equal(i + 1j*q, values[1:3])
+    assert np.array_equal(lazy['y'], eager['y'])
+    if fmt in 'DF':                          # a complex view of the file, no copy
+        assert lazy['data'].dtype.kind == 'c'
+        assert np.shares_memory(lazy['data'].real, lazy['data'])
+
+
+def test_lazy_1d_real_and_winepr(tmp_path):
+    values = _values((8,), cplx=False)
+    reader = bruker.Bruker_Opener()
+    path = _bes3t(tmp_path, values, cplx=False, ypts=1)
+    lazy = reader.open(path, lazy=True)
+    assert lazy['ndim'] == 1 and np.array_equal(lazy['channels'][0][1], values)
+    par = tmp_path / 'cw.par'
+    par.write_text('DOS  Format\nSSX 4\nSSY 2\nHCF 3400\nHSW 100\n')
+    values.astype('<f4').tofile(tmp_path / 'cw.spc')
+    eager, lazy = reader.open(str(par)), reader.open(str(par), lazy=True)
+    assert lazy['data'].shape == (2, 4)
+    assert np.array_equal(bruker.materialize(lazy['data']), eager['data'])
+
+
+def test_lazy_short_file_raises(tmp_path):
+    path = _bes3t(tmp_path, _values((4, 6)))
+    with open(path[:-4] + '.DTA', 'r+b') as fh:
+        fh.truncate(100)
+    with pytest.raises(ValueError):
+        bruker.Bruker_Opener().open(path, lazy=True)
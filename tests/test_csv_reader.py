@@ -0,0 +1,61 @@
+"""Unit tests for the fast CSV reader (csv_reader) against np.genfromtxt, the
+parser it replaces, and its use by Saver_Opener (no Qt window)."""
+import numpy as np
+import pytest
+
+import atomize.general_modules.csv_reader as csv_reader
+
+HEADER = 'Date: today\nTime Resolution: 2 µs\nTime (ns), I (V), Q (V)'
+
+CASES = [
+    '1,2,3\n',                               # one row
+    '1\n2\n3\n',                             # one column
+    '# h\n1,2\n3,4\n',
+    '1,2,\n3,4,\n',                          # trailing comma of a pyqtgraph export
+    '1,2 # c\n\n3,4\n',
+    '# a: b\n# c\n1.5e-3,nan,2\n3,inf,-4\n',
+]
+
+
+@pytest.mark.parametrize('text', CASES)
+def test_matches_genfromtxt(tmp_path, text):
+    path = tmp_path / 'data.csv'
+    path.write_text(text)
+    ref = np.genfromtxt(str(path), dtype=float, delimiter=',', encoding='latin1')
+    header, data = csv_reader.read(str(path))
+    assert data.shape == ref.shape and np.array_equal(data, ref, equal_nan=True)
+    assert header == [line + '\n' for line in text.split('\n') if line.startswith('#')]
+    for parts in (1, 2, 3, 5):
+        got = list(csv_reader.iter_parts(str(path), parts))
+        want = np.array_split(ref, parts)
+        assert len(got) == len(want)
+        assert all(a.shape == b.shape and np.array_equal(a, b, equal_nan=True)
+                   for a, b in zip(got, want))
+
+
+def test_saved_file_and_skip_header(tmp_path):
+    data = np.random.default_rng(0).standard_normal((300, 3))
+    path = str(tmp_path / 'saved.csv')
+    np.savetxt(path, data, fmt='%.6e', delimiter=',', header=HEADER, comments='# ',
+               encoding='utf-8')
+    header, got = csv_reader.read(path)
+    assert header[1] == '# Time Resolution: 2 µs\n'
+    assert np.array_equal(got, np.genfromtxt(path, delimiter=','))
+    assert np.array_equal(csv_reader.load(path, skip_header=1), got)
+    blocks = list(csv_reader.iter_rows(path, 128))
+    assert [len(b) for b in blocks] == [128, 128, 44]
+    assert np.array_equal(np.vstack(blocks), got)
+
+
+def test_saver_opener_appended_is_streamed(tmp_path):
+    openfile = pytest.importorskip('atomize.general_modules.csv_opener_saver')
+    opener = openfile.Saver_Opener.__new__(openfile.Saver_Opener)   # skip the config
+    opener.test_flag = 'None'
+    data = np.arange(40.0).reshape(20, 2)
+    path = str(tmp_path / 'appended.csv')
+    opener.save_data(path, data, header=HEADER)
+    header, parts = opener.iter_2d_appended(path, header=1, chunk_size=3)
+    assert header == [['# Date', ' today\n']] and not isinstance(parts, list)
+    assert [len(p) for p in parts] == [7, 7, 6]
+    assert np.array_equal(np.vstack(opener.open_2d_appended(path, chunk_size=3)[1]), data)
+    assert np.array_equal(opener.open_2d(path)[1], data)
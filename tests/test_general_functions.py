@@ -1,8 +1,11 @@
 """Unit tests for the pure helpers in general_functions (no Qt, no LivePlot)."""
+import threading
+
 import numpy as np
 import pytest
 
 import atomize.general_modules.general_functions as general
+from atomize.main.client import LivePlotClient
 
 
 def test_round_to_closest():
@@ -56,3 +59,119 @@ def test_to_infinity_test_mode_is_bounded(monkeypatch):
 def test_scans_test_mode_runs_once(monkeypatch):
     monkeypatch.setattr(general, 'test_flag', 'test')
     assert list(general.scans(5)) == [1]
+
+
+class _RecordingClient(LivePlotClient):
+    """LivePlotClient without a socket: send_batch records what it is given."""
+
+    def __init__(self):
+        self.is_connected = True
+        self.float32 = False
+        self._batch_local = threading.local()
+        self.batches = []
+
+    def send_batch(self, items):
+        self.batches.append(items)
+
+
+class _PackingClient(LivePlotClient):
+    """LivePlotClient without a socket: records the frames as they would be
+    written to the shared block."""
+
+    def __init__(self, float32):
+        self.is_connected = True
+        self.float32 = float32
+        self._batch_local = threading.local()
+        self.shared_mem = type('Block', (), {'size': lambda self: 2**28})()
+        self.frames = []
+
+    def send_to_plotter(self, meta, arr=None):
+        self.frames.append(self._pack_frame(meta, arr))
+
+
+def test_float32_mode_keeps_the_x_axis():
+    client = _PackingClient(float32=True)
+    t = 1.7e9 + np.arange(10)*0.5                 # epoch seconds of a time axis
+    client.plot_xy('T', t, np.linspace(0, 1, 10), timeaxis='True')
+    client.plot_z('Z', np.zeros((4, 4)))
+    (meta, arr), (meta_z, arr_z) = client.frames
+    assert arr.dtype == np.float64 and np.array_equal(arr[0], t)
+    assert meta['dtype'] == 'float64'
+    assert arr_z.dtype == np.float32                  # data frames are still halved
+
+
+def test_plot_batch_sends_one_frame(monkeypatch):
+    client = _RecordingClient()
+    monkeypatch.setattr(general, '_plotter_instance', client)
+    monkeypatch.setattr(general, '_async_default', True)
+    with general.plot_batch():
+        general.plot_1d('A', [0, 1], [2, 3])
+        general.plot_2d('B', np.zeros((2, 2)))
+        general.text_label('A', 'Scan: ', 1)
+    general._get_plot_worker().flush()
+    assert len(client.batches) == 1
+    ops = [meta['operation'] for meta, _ in client.batches[0]]
+    assert ops == ['plot_xy', 'plot_z', 'label']
+
+
+def test_plot_batch_nested_joins_outer(monkeypatch):
+    client = _RecordingClient()
+    monkeypatch.setattr(general, '_plotter_instance', client)
+    with general.plot_batch():
+        general.plot_1d('A', [0, 1], [2, 3])
+        with general.plot_batch():
+            general.plot_1d('B', [0, 1], [2, 3])
+    assert [len(b) for b in client.batches] == [2]
+
+
+def _spiky(n=100_003):
+    y = np.sin(np.linspace(0, 20, n))
+    y[12_345] = 9.0
+    y[54_321] = -7.0
+    return np.arange(n) * 0.5, y
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_downsample_1d_keeps_spikes(method):
+    x, y = _spiky()
+    xd, yd, step = general._downsample_1d(x, y, 1000, method)
+    assert step > 1 and len(yd) <= 1000
+    assert yd.max() == 9.0 and yd.min() == -7.0
+    assert np.all(np.diff(xd) >= 0)
+    # kept samples are real samples, at their own x
+    np.testing.assert_array_equal(yd, y[(xd / 0.5).astype(int)])
+
+
+def test_downsample_1d_two_curves_share_x():
+    x, y = _spiky()
+    xd, yd, _ = general._downsample_1d(x, np.vstack([y, -y]), 1000)
+    assert yd.shape[0] == 2 and yd.shape[1] == xd.shape[-1] <= 1000
+    assert yd[0].max() == 9.0 and yd[1].max() == 7.0
+
+
+def test_downsample_1d_stride_and_small_input():
+    x, y = _spiky()
+    xd, yd, step = general._downsample_1d(x, y, 1000, 'stride')
+    np.testing.assert_array_equal(yd, y[::step])
+    assert general._downsample_1d(x, y, len(y))[1] is y
+
+
+def test_downsample_2d_keeps_extremes():
+    z = np.zeros((301, 299))
+    z[150, 77] = 5.0
+    z[3, 290] = -4.0
+    zd, ss, factor = general._downsample_2d(z, ((1, 0.5), (2, 1)), 10_000)
+    assert factor == 3 and zd.shape == (101, 100)
+    assert zd.max() == 5.0 and zd.min() == -4.0
+    assert ss == ((1, 1.5), (2, 3))
+    frames, _, _ = general._downsample_2d(np.stack([z, -z]), None, 10_000)
+    assert frames.shape == (2, 101, 100) and frames[1].max() == 4.0
+
+
+def test_set_plot_decimation(monkeypatch):
+    monkeypatch.setattr(general, '_plot_decimation', {None: ('minmax', None)})
+    general.set_plot_decimation('lttb', 'A', max_points=500)
+    assert general._decimation_for('A', 10) == ('lttb', 500)
+    assert general._decimation_for('B', 10) == ('minmax', 10)
+    with pytest.raises(ValueError):
+        general.set_plot_decimation('mean')
@@ -0,0 +1,146 @@
+import json
+
+import numpy as np
+import pytest
+
+from atomize.main import protocol
+
+
+def _roundtrip(metas):
+    encoder = protocol.FrameEncoder()
+    decoder = protocol.FrameDecoder()
+    buf = bytearray(b''.join(encoder.encode(m) for m in metas))
+    out = []
+    while True:
+        meta = decoder.next_frame(buf)
+        if meta is None:
+            break
+        out.append(meta)
+    assert not buf
+    return out
+
+
+def test_plot_xy_roundtrip_matches_json():
+    meta = {'name': 'Ch A', 'operation': 'plot_xy', 'rank': 1, 'label': 'curve',
+            'X': 's', 'Y': 'V', 'Xname': 'Time', 'Yname': 'Signal',
+            'Scatter': 'False', 'TimeAxis': 'False', 'Vline': 'False',
+            'value': 'Scan 3 ' * 200, 'arrsize': 65536, 'dtype': 'float64',
+            'shape': (2, 4096), 'slot': 0, 'offset': 128}
+    decoded, = _roundtrip([meta])
+    expected = json.loads(json.dumps(meta))
+    assert decoded == expected
+
+
+def test_plot_z_start_step_and_update_z_fields():
+    metas = [
+        {'name': '2D', 'operation': 'plot_z', 'rank': 2,
+         'start_step': ((0, 0.5), (10, 2)), 'value': '', 'arrsize': 8,
+         'dtype': 'int16', 'shape': (2, 2)},
+        {'name': '2D', 'operation': 'update_z', 'rank': 2, 'start_step': None,
+         'index': 3, 'full_shape': [64, 128], 'value': 'x', 'arrsize': 8,
+         'dtype': 'complex64', 'shape': (1, 1)},
+    ]
+    plot_z, update_z = _roundtrip(metas)
+    assert plot_z['start_step'] == [[0.0, 0.5], [10.0, 2.0]]
+    assert plot_z['dtype'] == 'int16' and plot_z['shape'] == [2, 2]
+    assert 'slot' not in plot_z
+    assert update_z['full_shape'] == [64, 128]
+    assert all(type(n) is int for n in update_z['full_shape'])
+    assert update_z['start_step'] is None
+
+
+def test_scalar_values_and_unknown_keys():
+    metas = [
+        {'name': 'p', 'operation': 'append_y', 'value': np.float64(1.5),
+         'start_step': (0, 1), 'arrsize': 0},
+        {'name': 'p', 'operation': 'append_xy', 'value': (np.int64(2), 3.25),
+         'arrsize': 0},
+        {'name': '*', 'operation': 'custom_op', 'flag': True, 'extra': {'a': 1},
+         'arrsize': 0},
+    ]
+    append_y, append_xy, custom = _roundtrip(metas)
+    assert append_y['value'] == 1.5 and append_y['start_step'] == [0, 1]
+    assert append_xy['value'] == [2.0, 3.25]
+    assert custom['operation'] == 'custom_op'
+    assert custom['flag'] is True and custom['extra'] == {'a': 1}
+
+
+def test_strings_are_interned():
+    encoder = protocol.FrameEncoder()
+    meta = {'name': 'a long plot name', 'operation': 'label', 'value': 't',
+            'arrsize': 0}
+    first = encoder.encode(dict(meta))
+    second = encoder.encode(dict(meta))
+    assert len(second) < len(first)
+    decoder = protocol.FrameDecoder()
+    assert decoder.next_frame(bytearray(first))['name'] == 'a long plot name'
+    assert decoder.next_frame(bytearray(second))['name'] == 'a long plot name'
+
+
+def test_rollback_forgets_unsent_strings():
+    encoder = protocol.FrameEncoder()
+    mark = encoder.mark()
+    encoder.encode({'name': 'lost', 'operation': 'clear', 'arrsize': 0})
+    encoder.rollback(mark)
+    frame = encoder.encode({'name': 'lost', 'operation': 'clear', 'arrsize': 0})
+    assert protocol.FrameDecoder().next_frame(bytearray(frame))['name'] == 'lost'
+
+
+def test_partial_frame_waits_for_the_rest():
+    frame = protocol.FrameEncoder().encode({'name': 'n', 'operation': 'clear', 'arrsize': 0})
+    decoder = protocol.FrameDecoder()
+    buf = bytearray(frame[:7])
+    assert decoder.next_frame(buf) is None
+    buf += frame[7:]
+    assert decoder.next_frame(buf)['operation'] == 'clear'
+
+
+def test_unknown_string_reference_is_an_error():
+    encoder = protocol.FrameEncoder()
+    encoder.encode({'name': 'n', 'operation': 'clear', 'arrsize': 0})
+    frame = encoder.encode({'name': 'n', 'operation': 'clear', 'arrsize': 0})
+    buf = bytearray(frame)
+    with pytest.raises(protocol.ProtocolError):
+        protocol.FrameDecoder().next_frame(buf)
+    assert not buf
+
+
+def test_hello():
+    frame = protocol.hello_frame()
+    assert len(frame) == protocol.LEGACY_FRAME
+    assert json.loads(frame)['version'] == protocol.PROTOCOL_VERSION
+    assert protocol.parse_hello_reply(protocol.hello_reply(2)) == 2
+    assert protocol.parse_hello_reply(b'ok') == 1
+
+
+def test_broken_batch_items_are_skipped():
+    main_window = pytest.importorskip('atomize.main.main_window')
+
+    class Receiver:
+        do_batch = main_window.MainWindow.do_batch
+
+        def __init__(self):
+            self.applied = []
+
+        def do_operation(self, arr=None):
+            self.applied.append((self.meta['name'], None if arr is None else arr.sum()))
+
+    good = np.arange(4.0)
+    items = [{'name': 'bad', 'operation': 'plot_z', 'arrsize': 32, 'dtype': 'float64',
+              'shape': (3, 3), 'offset': 0},
+             {'name': 'bad size', 'operation': 'plot_z', 'arrsize': 32,
+              'dtype': 'int16', 'shape': (5,), 'offset': 0},
+             {'name': 'good', 'operation': 'plot_z', 'arrsize': 32, 'dtype': 'float64',
+              'shape': (4,), 'offset': 0},
+             {'name': 'label', 'operation': 'label', 'arrsize': 0}]
+    encoder, decoder = protocol.FrameEncoder(), protocol.FrameDecoder()
+    index = b''.join(encoder.encode(m) for m in items)
+    payload = np.frombuffer(good.tobytes() + index, dtype=np.uint8).copy()
+    receiver = Receiver()
+    receiver.meta = {'operation': 'batch', 'index_offset': 32, 'index_size': len(index)}
+    receiver.do_batch(payload, decoder)
+    assert receiver.applied == [('good', 6.0), ('label', None)]
+    receiver.meta = {'operation': 'batch', 'index_offset': 0, 'index_size': 8}
+    receiver.do_batch(None, decoder)                  # memory.data() gave nothing
+    receiver.do_batch(payload, decoder)               # garbage index
+    assert len(receiver.applied) == 2
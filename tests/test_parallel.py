@@ -0,0 +1,18 @@
+"""Unit tests for the process pools of math_modules.parallel: the start
+method and the recovery from a crashed worker."""
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import atomize.math_modules.parallel as par
+
+
+def test_pool_spawns_and_recovers_from_a_crash():
+    ex = par.executor(2)
+    assert ex._mp_context.get_start_method() == 'spawn'
+    with pytest.raises(BrokenProcessPool):
+        par.submit(2, os._exit, 1).result(timeout=60)
+    assert par.submit(2, abs, -3).result(timeout=60) == 3    # a fresh pool
+    assert par.executor(2) is not ex
+    par._discard(2)
@@ -0,0 +1,42 @@
+"""Unit tests for the LivePlot receiver's append stores (no Qt window)."""
+import numpy as np
+import pytest
+
+widgets = pytest.importorskip('atomize.main.widgets')
+
+
+def test_growable_curve_appends_past_capacity():
+    store = widgets.GrowableCurve(capacity=4)
+    for i in range(10):
+        store.append(i, 2 * i)
+    xs, ys = store.view()
+    assert np.array_equal(xs, np.arange(10))
+    assert np.array_equal(ys, 2 * np.arange(10))
+
+
+def test_growable_curve_continues_existing_data():
+    store = widgets.GrowableCurve([0, 1], [5, 6])
+    store.append(2, 7)
+    assert np.array_equal(store.view()[1], [5, 6, 7])
+
+
+def test_growable_curve_restep_regenerates_x():
+    store = widgets.GrowableCurve([0, 1, 2], [1, 1, 1])
+    store.restep((10, 0.5))
+    assert np.allclose(store.view()[0], [10, 10.5, 11])
+
+
+def test_growable_image_rows_and_running_levels():
+    store = widgets.GrowableImage(3, capacity=2)
+    for i in range(5):
+        store.append(np.array([i, i + 1, i + 2], dtype=np.int16))
+    assert store.view().shape == (5, 3)
+    assert np.array_equal(store.view()[:, 0], np.arange(5))
+    assert store.levels() == (0.0, 6.0)
+
+
+def test_growable_image_upcasts_and_ignores_nan():
+    store = widgets.GrowableImage(2, rows=np.zeros((1, 2), dtype=np.int16))
+    store.append([np.nan, 2.5])
+    assert store.view().dtype == np.float64
+    assert store.levels() == (0.0, 2.5)
@@ -0,0 +1,101 @@
+"""Unit tests for the crash-safe per-scan journal (scan_writer.ScanWriter)."""
+import os
+
+import numpy as np
+import pytest
+
+import atomize.general_modules.binary_data as binary
+from atomize.general_modules.scan_writer import ScanWriter
+
+
+def _scans(n, shape=(2, 16), seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.standard_normal(shape) for _ in range(n)]
+
+
+def test_resume_returns_last_checkpoint(tmp_path):
+    writer = ScanWriter(str(tmp_path), 'DEER', header='Test Header',
+                        axes=[{'name': 'Time', 'unit': 'ns', 'start': 0.0, 'step': 2.0}])
+    mean = np.zeros((2, 16))
+    for k, y in enumerate(_scans(5), start=1):
+        mean = (mean*(k - 1) + y)/k
+        writer.append(k, mean, count=2*k)
+    assert writer.close() is None
+    assert ScanWriter.pending(str(tmp_path)) == [writer.path]
+    res = ScanWriter.resume(writer.path)
+    assert res['scans'] == 5 and res['count'] == 10
+    assert np.array_equal(res['data'], mean) and np.allclose(res['sum'], mean*10)
+    assert res['header'] == 'Test Header' and res['axes'][0]['step'] == 2.0
+
+
+def test_append_copies_the_running_mean(tmp_path):
+    writer = ScanWriter(str(tmp_path), 'cw')
+    data = np.ones(8)
+    writer.append(1, data)
+    data[:] = 5.0                            # the worker keeps averaging in place
+    writer.close()
+    assert np.array_equal(ScanWriter.resume(writer.path)['data'], np.ones(8))
+
+
+def test_compaction_keeps_the_journal_bounded(tmp_path):
+    writer = ScanWriter(str(tmp_path), 'tr')
+    for k in range(1, 3*ScanWriter.MAX_CHUNKS):
+        writer._write(k, k, np.full(4, float(k)))     # one chunk per scan, no coalescing
+    writer.close()
+    journals = [n for n in os.listdir(tmp_path) if n.endswith(binary.EXT)]
+    assert len(journals) == 1
+    assert binary.read(str(tmp_path / journals[0]))['chunks'] <= ScanWriter.MAX_CHUNKS
+    res = ScanWriter.resume(writer.path)
+    assert res['scans'] == 3*ScanWriter.MAX_CHUNKS - 1
+    assert np.array_equal(res['data'], np.full(4, res['scans'], dtype=float))
+
+
+def test_torn_chunk_falls_back_to_the_index(tmp_path):
+    writer = ScanWriter(str(tmp_path), 'awg')
+    scans = _scans(2)
+    for k, y in enumerate(scans, start=1):
+        writer._write(k, k, y)
+    writer.close()
+    with open(writer._journal(writer._gen), 'ab') as fh:     # power cut mid-append
+        fh.write(b'CHNK' + np.uint32(1).tobytes() + np.array([32], '<u8').tobytes() + b'\0'*9)
+    res = ScanWriter.resume(writer.path)
+    assert res['scans'] == 2 and np.array_equal(res['data'], scans[1])
+
+
+def test_finish_removes_the_journal(tmp_path):
+    writer = ScanWriter(str(tmp_path), 'DEER')
+    writer.append(1, np.zeros(3))
+    assert writer.finish() is None
+    assert os.listdir(tmp_path) == [] and ScanWriter.pending(str(tmp_path)) == []
+
+
+def test_inert_writer_and_test_run(tmp_path):
+    writer = ScanWriter(None, 'DEER')
+    writer.append(1, np.zeros(3))
+    assert writer.close() is None and writer.finish() is None and writer.path is None
+    openfile = pytest.importorskip('atomize.general_modules.csv_opener_saver')
+    opener = openfile.Saver_Opener.__new__(openfile.Saver_Opener)   # skip the config
+    opener.test_flag = 'test'
+    assert opener.create_scan_writer('DEER').path is None
+
+
+def test_unwritable_directory_disables_the_journal(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    writer = ScanWriter(str(blocker / 'autosave'), 'DEER')
+    writer.append(1, np.zeros(3))
+    assert isinstance(writer.error, OSError) and writer.path is None
+    assert writer.finish() is writer.error
+
+
+def test_worker_dry_run_is_not_journaled(tmp_path, monkeypatch):
+    openfile = pytest.importorskip('atomize.general_modules.csv_opener_saver')
+    general = pytest.importorskip('atomize.general_modules.general_functions')
+    monkeypatch.setattr(openfile.lconf, 'load_autosave', lambda: str(tmp_path))
+    monkeypatch.setattr(general, 'test_flag', 'test')     # script_test of a worker
+    opener = openfile.Saver_Opener.__new__(openfile.Saver_Opener)
+    opener.test_flag = 'None'
+    writer = opener.create_scan_writer('DEER')
+    writer.append(1, np.zeros(3))
+    writer.close()
+    assert writer.path is None and os.listdir(tmp_path) == []
@@ -0,0 +1,125 @@
+"""Unit tests for the shared-memory "Send to Data Treatment" mailbox
+(treatment_mailbox); the Qt notification is skipped without QtNetwork."""
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+import atomize.general_modules.treatment_mailbox as mailbox
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PREFIX = f'atz_t{os.getpid()}'
+
+
+@pytest.fixture(autouse=True)
+def private_names(monkeypatch):
+    # never touch the mailbox of an Atomize session running on this machine
+    monkeypatch.setattr(mailbox, 'block_name', lambda kind: f'{PREFIX}_{kind}')
+    yield
+    for kind in list(mailbox._OWNED):
+        mailbox._release(kind)
+    for shm in mailbox._POINTERS.values():
+        shm.close()
+    mailbox._POINTERS.clear()
+    for kind in (mailbox.KIND_1D, mailbox.KIND_2D):          # the pointer blocks
+        try:
+            mailbox._unlink(mailbox._attach(mailbox.block_name(kind)))
+        except FileNotFoundError:
+            pass
+
+
+def _python(code, **kw):
+    code = (f'import atomize.general_modules.treatment_mailbox as m\n'
+            f'm.block_name = lambda kind: "{PREFIX}_" + kind\n' + textwrap.dedent(code))
+    return subprocess.Popen([sys.executable, '-c', code], text=True,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, env=dict(os.environ, PYTHONPATH=ROOT),
+                            **kw)
+
+
+def test_round_trip_is_exact_and_one_shot():
+    rng = np.random.default_rng(0)
+    i, q = rng.standard_normal((40, 30)), rng.standard_normal((40, 30)).astype(np.float32)
+    assert mailbox.receive(mailbox.KIND_2D) is None
+    mailbox.send(mailbox.KIND_2D, {'i': i, 'q': q}, geom=[0.0, 2e-9, 1.0, 0.5],
+                 labels=['Time', 's', 'Field', 'G'])
+    assert mailbox.pending(mailbox.KIND_2D)
+    res = mailbox.receive(mailbox.KIND_2D)
+    assert np.array_equal(res['arrays']['i'], i)          # no text round trip
+    assert res['arrays']['q'].dtype == np.float32 and np.array_equal(res['arrays']['q'], q)
+    assert res['meta'] == {'geom': [0.0, 2e-9, 1.0, 0.5], 'labels': ['Time', 's', 'Field', 'G']}
+    assert mailbox.receive(mailbox.KIND_2D) is None and not mailbox.pending(mailbox.KIND_2D)
+    mailbox.send(mailbox.KIND_2D, {'i': i[:2]})               # a new send replaces it
+    assert mailbox.receive(mailbox.KIND_2D)['arrays']['i'].shape == (2, 30)
+
+
+def test_curves_keep_lengths_labels_and_colours():
+    x = np.linspace(0, 1, 7)
+    curves = [('ch|a', x, np.sin(x)), ('ch_1', x[:3], x[:3]**2)]
+    mailbox.send_curves(curves, colors=['255,0,0', ''], xname='Time (s)')
+    got, meta = mailbox.receive_curves()
+    assert [c[0] for c in got] == ['ch|a', 'ch_1']
+    assert all(np.array_equal(a[1], b[1]) and np.array_equal(a[2], b[2])
+               for a, b in zip(got, curves))
+    assert meta['colors'] == ['255,0,0', ''] and meta['xname'] == 'Time (s)'
+    mailbox.send_curves(curves)
+    mailbox.discard(mailbox.KIND_1D)
+    assert mailbox.receive_curves() is None
+
+
+def test_other_process_reads_the_block():
+    mailbox.send(mailbox.KIND_1D, {'x0': np.arange(5.0), 'y0': np.arange(5.0)**2},
+                 labels=['sq'])
+    out, err = _python('''
+        res = m.receive_curves()
+        print(res[0][0][0], res[0][0][2].sum())
+        ''').communicate(timeout=60)
+    assert out.split() == ['sq', '30.0'], err
+    assert 'leaked' not in err and 'Traceback' not in err
+    assert mailbox.receive(mailbox.KIND_1D) is None           # consumed over there
+
+
+def test_two_sender_processes():
+    # the main window and the 2D tool both post 1D curves
+    senders = [_python(f'''
+        import numpy as np
+        m.send_curves([('{tag}', np.arange(3.0), np.full(3, {k}.0))])
+        print('sent', flush=True)
+        input()
+        ''') for k, tag in enumerate('AB')]
+    try:
+        assert senders[0].stdout.readline().strip() == 'sent'
+        assert senders[1].stdout.readline().strip() == 'sent'     # no FileExistsError
+        out_a = senders[0].communicate('\n', timeout=60)           # A exits first
+        assert mailbox.pending(mailbox.KIND_1D)                    # B's send survives
+        curves, _ = mailbox.receive_curves()
+        assert curves[0][0] == 'B' and np.array_equal(curves[0][2], np.ones(3))
+        out_b = senders[1].communicate('\n', timeout=60)
+        for _, err in (out_a, out_b):
+            assert 'leaked' not in err and 'Traceback' not in err, err
+    finally:
+        for p in senders:
+            if p.poll() is None:
+                p.kill()
+    assert mailbox.receive(mailbox.KIND_1D) is None                # B released it
+
+
+def test_notify_wakes_a_listener():
+    pytest.importorskip('PyQt6.QtNetwork')
+    from PyQt6.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication([])
+    calls = []
+    assert not mailbox.notify(mailbox.KIND_2D, timeout=50)    # nobody listens
+    server = mailbox.listen(mailbox.KIND_2D, lambda: calls.append(1))
+    try:
+        assert mailbox.notify(mailbox.KIND_2D)
+        for _ in range(100):
+            app.processEvents()
+            if calls:
+                break
+        assert calls
+    finally:
+        server.close()